@@ -2,33 +2,156 @@ import sys
 import os
 import re
 import logging
-import yt_dlp
+import threading
+import time
+import uuid
+import shutil
 from concurrent.futures import ThreadPoolExecutor
+from src.cookie_provider import get_provider
+from src import metrics
+from src import tracing
+from src.retry_policy import get_coordinator
+from src import file_mover
+from src import disk_space
+from src import dedup
+from src import proxy_pool
+from src import audio_pipeline
+from src import format_policy
 
 logger = logging.getLogger("UltraTube.Downloader")
 _METADATA_CACHE = {}
 
-try:
-    import browser_cookie3
-except ImportError:
-    browser_cookie3 = None
+# Signed media URLs count as expired this long before their deadline (seconds)
+INFO_EXPIRY_MARGIN = 10 * 60
+# Without an expiry in the media URLs, analyzed metadata is reused up to this age (seconds)
+INFO_MAX_AGE = 30 * 60
+# Responses to stored media URLs that mean the video must be extracted again
+STALE_URL_STATUSES = (403, 410)
+# Info dict key naming the proxy (None = direct) that extracted it
+RESOLVED_VIA_KEY = '_ut_proxy'
+_EXPIRE_PATTERN = re.compile(r"[?&/]expire[=/](\d+)")
+
+# yt-dlp's retry notices, e.g. "Retrying (2/10)..." or "Retrying fragment 7 (1/15)..."
+RETRY_PATTERN = re.compile(r"Retrying(?: [\w ]+)? \(\d+/\d+\)")
+
+# Per-request retry budgets; the pauses between them come from src.retry_policy
+METADATA_RETRIES = 10
+DOWNLOAD_RETRIES = 15
+# run_multi_download reads ahead at most this many jobs per worker
+MULTI_DOWNLOAD_BACKLOG = 2
+
+def _yt_dlp():
+    """Import yt-dlp on first use; loading its extractors dominates cold start."""
+    import yt_dlp
+    return yt_dlp
+
+def prewarm():
+    """Load yt-dlp on a background thread so the first analyze doesn't pay for it."""
+    thread = threading.Thread(target=_yt_dlp, name="yt-dlp-prewarm", daemon=True)
+    thread.start()
+    return thread
+
+def resolve_cookies(url, ydl_opts, cookie_file=None, browser=None, internal_browser=False):
+    """Get a shared, pre-loaded cookie jar for `url` from the cookie provider.
+
+    If the provider can't load the source, fall back to handing yt-dlp the raw
+    cookie options so it loads (and reports problems with) them itself.
+    """
+    try:
+        return get_provider().get_jar(url, cookie_file, browser, internal_browser)
+    except Exception as e:
+        logger.warning(f"Cookie provider failed, letting yt-dlp load cookies: {e}")
+
+    if internal_browser:
+        cookie_path = os.path.abspath(os.path.join(os.getcwd(), "browser_data", "Cookies"))
+        if os.path.exists(cookie_path):
+            ydl_opts['cookiefile'] = cookie_path
+    elif cookie_file:
+        ydl_opts['cookiefile'] = cookie_file
+    elif browser:
+        ydl_opts['cookiesfrombrowser'] = (browser,)
+    return None
+
+class YtdlpLogger:
+    """Receives yt-dlp's output instead of stdout/stderr and counts the retries it reports.
+
+    Everything is logged at debug level: failures are already logged by our own
+    code, and warnings were suppressed (no_warnings) before.
+    """
+    def _record(self, msg):
+        if RETRY_PATTERN.search(msg):
+            metrics.RETRIES.inc()
+        logger.debug(msg)
+
+    debug = warning = error = _record
+
+def info_expiry(info):
+    """Earliest expiry (epoch seconds) of the signed media URLs in an info dict, if any."""
+    deadlines = []
+    for fmt in info.get('formats') or []:
+        for key in ('url', 'manifest_url'):
+            match = _EXPIRE_PATTERN.search(fmt.get(key) or '')
+            if match:
+                deadlines.append(int(match.group(1)))
+    return min(deadlines) if deadlines else None
+
+def is_info_reusable(info, now=None):
+    """Whether an analyzed video can be downloaded without extracting it again."""
+    if not info or info.get('_type', 'video') != 'video' or not info.get('formats'):
+        return False
+    now = now or time.time()
+    expiry = info_expiry(info)
+    if expiry is not None:
+        return now < expiry - INFO_EXPIRY_MARGIN
+    return now - info.get('epoch', 0) < INFO_MAX_AGE
+
+def cached_info(url):
+    """Analyzed metadata for `url` from get_video_info, if it is still usable for a download."""
+    info = _METADATA_CACHE.get(url)
+    return info if is_info_reusable(info) else None
+
+def open_ydl(ydl_opts, cookie_jar=None):
+    """Create a YoutubeDL instance, sharing `cookie_jar` instead of loading cookies again.
+
+    Its requests wait on the shared per-host circuit breakers, and retries back
+    off exponentially with jitter.
+    """
+    coordinator = get_coordinator()
+    ydl_opts.setdefault('retry_sleep_functions', coordinator.sleep_functions())
+    ydl = _yt_dlp().YoutubeDL(ydl_opts)
+    if cookie_jar is not None:
+        ydl.cookiejar = cookie_jar
+    return coordinator.wrap(ydl)
 
 class DownloadProgress:
     """Structure to hold progress data for listeners."""
-    def __init__(self, status, percentage=0, speed="0B/s", eta="00:00", title="Unknown", filename=None):
+    def __init__(self, status, percentage=0, speed="0B/s", eta="00:00", title="Unknown", filename=None, url=None,
+                 downloaded_bytes=0, total_bytes=None):
         self.status = status
+        self.url = url
+        self.downloaded_bytes = downloaded_bytes
+        self.total_bytes = total_bytes
         self.percentage = percentage
         self.speed = speed
         self.eta = eta
         self.title = title
         self.filename = filename
 
-def create_progress_hook(external_callback=None):
+def create_progress_hook(external_callback=None, url=None):
     """Creates a hook function for yt-dlp that reports to an optional callback."""
+    last = {'downloaded': 0, 'file': None}
     def hook(d):
-        progress_data = DownloadProgress(status=d['status'])
-        
+        progress_data = DownloadProgress(status=d['status'], url=url)
+
         if d['status'] == 'downloading':
+            # Feed the byte counter with deltas; each file (video, audio, ...) restarts at 0
+            downloaded = d.get('downloaded_bytes') or 0
+            if d.get('filename') != last['file']:
+                last['file'], last['downloaded'] = d.get('filename'), 0
+            if downloaded > last['downloaded']:
+                metrics.DOWNLOADED_BYTES.inc(downloaded - last['downloaded'])
+                last['downloaded'] = downloaded
+
             p_str = d.get('_percent_str', '0%').replace('%', '').strip()
             try:
                 progress_data.percentage = float(p_str)
@@ -38,6 +161,8 @@ def create_progress_hook(external_callback=None):
             progress_data.speed = d.get('_speed_str', 'N/A').strip()
             progress_data.eta = d.get('_eta_str', 'N/A').strip()
             progress_data.title = d.get('info_dict', {}).get('title', 'Unknown')
+            progress_data.downloaded_bytes = d.get('downloaded_bytes') or 0
+            progress_data.total_bytes = d.get('total_bytes') or d.get('total_bytes_estimate')
             
             if not external_callback:
                 sys.stdout.write(f"\r🚀 [{progress_data.title[:20]}...] {progress_data.percentage}% @ {progress_data.speed} | ETA: {progress_data.eta}          ")
@@ -81,84 +206,98 @@ def get_video_info(url, cookie_file=None, browser=None, proxy=None, internal_bro
     """Fetch metadata, supports cookies for private videos and proxies."""
     # 1. Simple Cache Check
     if url in _METADATA_CACHE:
+        metrics.METADATA_REQUESTS.inc(cache="hit")
         logger.info(f"Using cached metadata for: {url}")
         return _METADATA_CACHE[url]
+    metrics.METADATA_REQUESTS.inc(cache="miss")
 
     ydl_opts = {
         'quiet': True, 
         'no_warnings': True,
         'extract_flat': 'in_playlist',
         'socket_timeout': 30,  # 30 seconds timeout
-        'retries': 10,        # Retry up to 10 times
+        'retries': METADATA_RETRIES,
+        'extractor_retries': METADATA_RETRIES,
         'allow_unplayable_formats': kwargs.get('allow_unplayable', False),
+        'logger': YtdlpLogger(),
     }
     
-    if internal_browser:
-        # Point to our embedded browser's cookie storage
-        cookie_path = os.path.abspath(os.path.join(os.getcwd(), "browser_data", "Cookies"))
-        if os.path.exists(cookie_path):
-            ydl_opts['cookiefile'] = cookie_path
-    elif cookie_file:
-        ydl_opts['cookiefile'] = cookie_file
-    elif browser:
-        ydl_opts['cookiesfrombrowser'] = (browser,)
+    cookie_jar = resolve_cookies(url, ydl_opts, cookie_file, browser, internal_browser)
     
-    if proxy:
-        ydl_opts['proxy'] = proxy
+    proxy_lease = proxy_pool.lease(proxy)
+    if proxy_lease.proxy:
+        ydl_opts['proxy'] = proxy_lease.proxy
 
+    started = time.monotonic()
     try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        with open_ydl(ydl_opts, cookie_jar) as ydl:
             res = ydl.extract_info(url, download=False)
+            proxy_lease.release()
+            if res:
+                res[RESOLVED_VIA_KEY] = proxy_lease.proxy
             _METADATA_CACHE[url] = res
+            if res and res.get('webpage_url'):
+                # Downloads are started with the canonical URL (e.g. youtu.be -> youtube.com)
+                _METADATA_CACHE.setdefault(res['webpage_url'], res)
             return res
     except Exception as e:
+        proxy_lease.release(e)
         logger.error(f"Error fetching info for {url}: {e}")
         return None
+    finally:
+        metrics.METADATA_SECONDS.observe(time.monotonic() - started)
+
+def download_item(url, format_id=None, download_dir='downloads', sub_lang=None, write_thumbnail=False, progress_callback=None, cookie_file=None, browser=None, proxy=None, internal_browser=False, allow_unplayable=False, cdm_path=None, archive_file='archive.txt', info=None, staging_dir=None, audio_codec=None, video_codec=None,
+                  on_background_failure=None):
+    """Worker function with support for high-fidelity formats (8K, HDR, 360) and DRM.
+
+    `info` is the video's analyzed info dict (looked up in the metadata cache
+    when omitted); while its media URLs are valid it is downloaded directly
+    instead of extracting the page again.
+
+    With `staging_dir`, fragments, merges and conversions happen there and the
+    finished files are handed to the background mover for `download_dir`.
 
-def download_item(url, format_id=None, download_dir='downloads', sub_lang=None, write_thumbnail=False, progress_callback=None, cookie_file=None, browser=None, proxy=None, internal_browser=False, allow_unplayable=False, cdm_path=None):
-    """Worker function with support for high-fidelity formats (8K, HDR, 360) and DRM."""
+    `video_codec` (see format_policy.VIDEO_CODECS) steers format selection
+    towards that codec and a container taking the streams without re-encoding.
+
+    With `audio_codec` (see audio_pipeline.AUDIO_POLICIES) only the audio is
+    kept: stream-copied when the source codec is acceptable, otherwise
+    re-encoded on the transcoder pool after the download slot is freed.
+
+    If a conversion or the move out of staging fails after this returns,
+    `on_background_failure(error)` is called; either way the video is taken
+    out of the download archive so that it can be downloaded again.
+
+    Returns the job record (job_id, url, bytes, duration, status, title, filename).
+    """
     
-    # Advanced logic for quality selection based on format_id
+    # Quality presets and codec/container preferences come from the format policy table;
     # format_id can be a specific ID from yt-dlp OR a descriptive string from our UI
-    if format_id == "Best Available" or not format_id:
-        selected_format = 'bestvideo+bestaudio/best'
-    elif "8K" in format_id:
-        selected_format = 'bestvideo[height<=4320]+bestaudio/best'
-    elif "4K HDR" in format_id:
-        # Prefer VP9.2 which carries HDR metadata for YouTube
-        selected_format = 'bestvideo[height<=2160][vcodec^=vp9.2]+bestaudio/best'
-    elif "4K" in format_id:
-        selected_format = 'bestvideo[height<=2160]+bestaudio/best'
-    elif "1440p" in format_id:
-        selected_format = 'bestvideo[height<=1440]+bestaudio/best'
-    elif "1080p" in format_id:
-        selected_format = 'bestvideo[height<=1080]+bestaudio/best'
-    elif "720p" in format_id:
-        selected_format = 'bestvideo[height<=720]+bestaudio/best'
-    elif "480p" in format_id:
-        selected_format = 'bestvideo[height<=480]+bestaudio/best'
-    else:
-        # Fallback for specific format IDs (e.g. from a list)
-        selected_format = format_id if '+' in format_id or '/' in format_id else f"{format_id}+bestaudio/best"
+    selection = format_policy.for_download(format_id, video_codec, audio_codec)
+    selected_format = selection['format']
 
     ydl_opts = {
         'format': selected_format,
         'outtmpl': f'{download_dir}/%(title)s.%(ext)s',
-        'progress_hooks': [create_progress_hook(progress_callback)],
+        'progress_hooks': [create_progress_hook(progress_callback, url)],
         'quiet': True,
         'no_warnings': True,
-        'merge_output_format': 'mp4',
-        'download_archive': 'archive.txt',
+        'format_sort': selection['format_sort'],
+        'merge_output_format': selection['merge_output_format'],
+        'download_archive': archive_file,
         'writesubtitles': sub_lang is not None,
         'subtitleslangs': [sub_lang] if sub_lang and sub_lang != 'all' else ['all'],
         'postprocessors': [],
         'socket_timeout': 30,
-        'retries': 15,
-        'fragment_retries': 15,
+        'retries': DOWNLOAD_RETRIES,
+        'fragment_retries': DOWNLOAD_RETRIES,
         'allow_unplayable_formats': allow_unplayable,
         'writemetadata': True,
         'xattrs': True,  # Help preserve metadata on supported filesystems
         'prefer_ffmpeg': True,
+        'logger': YtdlpLogger(),
+        'noprogress': True, # Progress goes through the hooks, not the logger
     }
     
     # Metadata preservation for 360 / VR and HDR
@@ -179,18 +318,28 @@ def download_item(url, format_id=None, download_dir='downloads', sub_lang=None,
             'devicepath': cdm_path,
         })
 
-    if internal_browser:
-        cookie_path = os.path.abspath(os.path.join(os.getcwd(), "browser_data", "Cookies"))
-        if os.path.exists(cookie_path):
-            ydl_opts['cookiefile'] = cookie_path
-    elif cookie_file:
-        ydl_opts['cookiefile'] = cookie_file
-    elif browser:
-        ydl_opts['cookiesfrombrowser'] = (browser,)
-    
-    if proxy:
-        ydl_opts['proxy'] = proxy
-    
+    # Structured per-job fields for the JSON log
+    job = {'job_id': uuid.uuid4().hex[:12], 'url': url, 'bytes': 0}
+    stage_dir = os.path.join(staging_dir, job['job_id']) if staging_dir else None
+    if stage_dir:
+        ydl_opts['outtmpl'] = f'{stage_dir}/%(title)s.%(ext)s'
+    info = info if is_info_reusable(info) else cached_info(url)
+    # A named proxy wins; otherwise the pool (if configured) assigns one, preferring
+    # the proxy that resolved `info`: signed media URLs are bound to that IP
+    resolved_via = (info or {}).get(RESOLVED_VIA_KEY)
+    proxy_lease = proxy_pool.lease(proxy, prefer=resolved_via)
+    if proxy_lease.proxy:
+        ydl_opts['proxy'] = proxy_lease.proxy
+    if info is not None and RESOLVED_VIA_KEY in info and resolved_via != proxy_lease.proxy:
+        logger.info(f"Metadata for {url} was resolved through another route; extracting again")
+        info = None
+    trace = tracing.JobTrace(attributes={'url': url, 'job_id': job['job_id'], 'format': selected_format,
+                                         'reused_info': info is not None})
+    started = time.monotonic()
+
+    with trace.phase("cookies"):
+        cookie_jar = resolve_cookies(url, ydl_opts, cookie_file, browser, internal_browser)
+
     if write_thumbnail:
         ydl_opts['writethumbnail'] = True
         ydl_opts['postprocessors'].append({
@@ -204,78 +353,225 @@ def download_item(url, format_id=None, download_dir='downloads', sub_lang=None,
             'format': 'srt',
         })
 
+    files = {}
+    archive_ids = set() # archive lines of the videos this job downloaded
+    def count_bytes(d):
+        if d['status'] == 'finished':
+            job['bytes'] += d.get('total_bytes') or d.get('downloaded_bytes') or 0
+            files['title'] = d.get('info_dict', {}).get('title')
+            files['filename'] = d.get('filename')
+            archive_ids.add(archive_id(d.get('info_dict') or {}))
+    ydl_opts['progress_hooks'] += [count_bytes, trace.progress_hook, disk_space.Preallocator()]
+    ydl_opts['postprocessor_hooks'] = [trace.postprocessor_hook]
+    final_files = []
+    ydl_opts['post_hooks'] = [final_files.append] # path of each video after postprocessing
+    transcodes = [] # audio_pipeline.Conversion for each conversion left to the transcoder
+
+    error = None
+    reservation = disk_space.Reservation() # space claimed by the preflight until the job ends
+    metrics.ACTIVE_DOWNLOADS.inc()
     try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            logger.info(f"Starting download: {url}")
-            ydl.download([url])
-            logger.info(f"Finished download: {url}")
+        trace.enter("setup")
+        with open_ydl(ydl_opts, cookie_jar) as ydl:
+            add_stage_markers(ydl, trace)
+            add_space_preflight(ydl, download_dir if stage_dir else None, reservation)
+            if audio_codec:
+                ydl.add_post_processor(audio_pipeline.make_audio_router(audio_codec, transcodes), when='post_process')
+            logger.info(f"Starting download: {url}", extra=job)
+            trace.enter("extraction")
+            if info is not None:
+                download_from_info(ydl, info, url)
+            else:
+                ydl.download([url])
+            job.update(status='finished', duration=round(time.monotonic() - started, 3))
+            logger.info(f"Finished download: {url}", extra=job)
+    except disk_space.InsufficientSpace as e:
+        # Refused before the video's files were started; it can run once space is freed
+        error = e
+        job.update(status='deferred', duration=round(time.monotonic() - started, 3), error=str(e))
+        logger.warning(f"Download deferred for {url}: {e}", extra=job)
     except Exception as e:
-        logger.error(f"Download failed for {url}: {e}")
+        error = e
+        job.update(status='failed', duration=round(time.monotonic() - started, 3), error=str(e))
+        logger.error(f"Download failed for {url}: {e}", extra=job)
+    finally:
+        metrics.ACTIVE_DOWNLOADS.dec()
+        reservation.release()
+    deduplicator = dedup.get_deduplicator()
+    converting = [conversion.future for conversion in transcodes]
+    background = BackgroundWatch(job, archive_file, on_background_failure)
+    for conversion in transcodes:
+        background.watch(conversion.future, [conversion.archive_id], "convert", conversion.source)
+    if stage_dir:
+        if error is None:
+            def move():
+                moving = file_mover.get_mover().submit(stage_dir, download_dir)
+                background.watch(moving, archive_ids, "move", stage_dir)
+                if deduplicator:
+                    moving.add_done_callback(lambda f: f.exception() or deduplicator.submit(f.result()))
+            # Conversions write into the staging folder too; move once they're done
+            audio_pipeline.when_done(converting, move)
+            files['filename'] = file_mover.staged_path(files.get('filename'), stage_dir, download_dir)
+        else:
+            audio_pipeline.when_done(converting, lambda: shutil.rmtree(stage_dir, ignore_errors=True))
+    elif deduplicator:
+        sources = {conversion.source for conversion in transcodes}
+        deduplicator.submit([path for path in final_files if path not in sources])
+        for future in converting:
+            future.add_done_callback(lambda f: f.exception() or deduplicator.submit([f.result()]))
+    summary = trace.finish(error)
+    job['phases'] = summary['phases']
+    proxy_lease.release(error, transferred=job['bytes'], seconds=summary['phases'].get('transfer', 0.0))
+    logger.info(f"Timing for {url}: {tracing.format_summary(summary)}", extra=job)
+    background.returned()
+    record_job_metrics(job)
+    return dict(job, trace_summary=tracing.format_summary(summary), **files)
 
-def run_multi_download(urls, max_workers=3, progress_callback=None, **kwargs):
-    """Run multiple concurrent downloads with shared session settings."""
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        for url in urls:
-            executor.submit(download_item, url, progress_callback=progress_callback, **kwargs)
+# Steps that can fail after download_item returns -> (ultratube_jobs_total status, description)
+BACKGROUND_STEPS = {
+    "convert": ("conversion_failed", "Audio conversion"),
+    "move": ("move_failed", "Moving to the download folder"),
+}
 
-if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python downloader.py <URL>")
-        sys.exit(1)
-    
-    url = sys.argv[1]
-    
-    print("\n� Network & Auth Options (Optional):")
-    proxy_url = input("🔗 Proxy URL (e.g. http://127.0.0.1:8080 or Enter to skip): ").strip() or None
-    auth_choice = input("👉 1: cookies.txt, 2: Get from Browser, Enter: Skip: ").strip()
-    c_file = None
-    b_name = None
-    
-    if auth_choice == "1":
-        c_file = input("📁 Enter path to cookies.txt: ").strip()
-    elif auth_choice == "2":
-        b_name = input("🌐 Browser (e.g., chrome, firefox, edge): ").strip().lower()
+class BackgroundWatch:
+    """Fails a finished job when work left running after it (audio conversions,
+    the move out of staging) fails.
 
-    info = get_video_info(url, c_file, b_name, proxy_url)
-    if not info:
-        sys.exit(1)
+    Failures before download_item returns go into the returned job record;
+    later ones to `on_failure(error)`. Either way the video is removed from
+    the download archive, so it can be downloaded again.
+    """
+    def __init__(self, job, archive_file, on_failure=None):
+        self.job = job
+        self.archive_file = archive_file
+        self.on_failure = on_failure
+        self._lock = threading.Lock()
+        self._returned = False
+        self._early = []
 
-    is_playlist = 'entries' in info
-    
-    print("\n🛠  Extra Options:")
-    subs = input("👉 Subtitles (lang code/all/Enter to skip): ").strip() or None
-    thumb = input("👉 Thumbnail? (y/n): ").strip().lower() == 'y'
-
-    settings = {
-        'sub_lang': subs,
-        'write_thumbnail': thumb,
-        'cookie_file': c_file,
-        'browser': b_name,
-        'proxy': proxy_url
-    }
+    def watch(self, future, archive_ids, step, source):
+        """Watch `future` doing a BACKGROUND_STEPS `step` on `source`; on failure
+        the `archive_ids` lines are dropped from the archive."""
+        future.add_done_callback(lambda future: self._done(future, archive_ids, step, source))
+
+    def returned(self):
+        """download_item is about to return the job record."""
+        with self._lock:
+            self._returned = True
+            if self._early and self.job['status'] == 'finished':
+                self.job.update(status='failed', error=self._early[0])
+
+    def _done(self, future, archive_ids, step, source):
+        if not future.cancelled() and future.exception() is None:
+            return
+        status, what = BACKGROUND_STEPS[step]
+        error = "cancelled" if future.cancelled() else future.exception()
+        message = f"{what} failed: {error}"
+        metrics.JOBS.inc(status=status)
+        if self.archive_file:
+            for archive_id in archive_ids:
+                if archive_id:
+                    remove_from_archive(self.archive_file, archive_id)
+        logger.error(f"{message} ({source})", extra=dict(self.job, status='failed', error=message))
+        with self._lock:
+            if not self._returned:
+                self._early.append(message)
+                return
+        if self.on_failure:
+            self.on_failure(message)
 
-    if is_playlist:
-        entries = list(info['entries'])
-        print(f"\n📂 Playlist/Channel: {info.get('title')}")
-        limit = input(f"🔢 Total {len(entries)} videos. Limit? (Enter for ALL): ").strip()
-        if limit.isdigit():
-            entries = entries[:int(limit)]
-        
-        urls = [e['url'] for e in entries if 'url' in e]
-        run_multi_download(urls, **settings)
-    else:
-        print(f"\n📺 Single Video: {info.get('title')}")
-        formats = info.get('formats', [])
-        display_formats = [f for f in formats if f.get('vcodec') != 'none' or f.get('acodec') != 'none']
-        print(f"{'ID':<10} {'EXT':<6} {'RES':<12} {'FPS':<6} {'FILESIZE':<10} {'CODEC'}")
-        print("-" * 60)
-        valid_ids = []
-        for f in display_formats:
-            fid = f.get('format_id')
-            res = f.get('resolution') or f"{f.get('width')}x{f.get('height')}" if f.get('width') else "audio only"
-            size = format_bytes(f.get('filesize') or f.get('filesize_approx'))
-            print(f"{fid:<10} {f.get('ext'):<6} {res:<12} {f.get('fps',''):<6} {size:<10} V:{f.get('vcodec','')[:5]} A:{f.get('acodec','')[:5]}")
-            valid_ids.append(fid)
-
-        choice = input("\n🔢 Enter Format ID (Enter for best): ").strip()
-        download_item(url, choice if choice in valid_ids else None, **settings)
+def archive_id(info):
+    """The download archive line yt-dlp writes for a video, None if `info` doesn't tell."""
+    extractor = info.get('extractor_key') or info.get('ie_key')
+    if not extractor or not info.get('id'):
+        return None
+    return _yt_dlp().utils.make_archive_id(extractor, info['id'])
+
+def remove_from_archive(archive_file, archive_id):
+    """Drop `archive_id` from a yt-dlp download archive, under the lock yt-dlp appends with."""
+    if not os.path.exists(archive_file):
+        return
+    # locked_file has no read-write mode; holding its exclusive append lock blocks yt-dlp's writers
+    with _yt_dlp().utils.locked_file(archive_file, 'a', encoding='utf-8'):
+        with open(archive_file, 'r+', encoding='utf-8') as f:
+            lines = f.readlines()
+            kept = [line for line in lines if line.strip() != archive_id]
+            if len(kept) != len(lines):
+                f.seek(0)
+                f.writelines(kept)
+                f.truncate()
+
+def download_from_info(ydl, info, url):
+    """Download an analyzed video, like yt-dlp's --load-info-json.
+
+    Falls back to a fresh extraction if the site rejects the stored media URLs.
+    """
+    utils = _yt_dlp().utils
+    logger.info(f"Reusing analyzed metadata for: {url}")
+    try:
+        ydl.process_ie_result(ydl.sanitize_info(info, remove_private_keys=True), download=True)
+    except (utils.DownloadError, utils.ReExtractInfo) as e:
+        if not media_urls_rejected(e):
+            raise # merge, postprocessing or disk errors: extracting again won't help
+        logger.warning(f"Stored metadata failed for {url} ({e}), extracting again")
+        ydl.download([url])
+
+def media_urls_rejected(error):
+    """Whether `error` means the stored media URLs are stale (expired, or bound to another IP)."""
+    if isinstance(error, _yt_dlp().utils.ReExtractInfo):
+        return True
+    from yt_dlp.networking.exceptions import HTTPError
+    cause = (getattr(error, 'exc_info', None) or (None, None))[1]
+    return isinstance(cause, HTTPError) and cause.status in STALE_URL_STATUSES
+
+def add_stage_markers(ydl, trace):
+    """Let `trace` know when yt-dlp moves from one stage of a video to the next."""
+    try:
+        for when in (*tracing.STAGE_PHASES, 'after_video'):
+            ydl.add_post_processor(tracing.make_stage_marker(trace, when), when=when)
+    except Exception as e:
+        logger.debug(f"Stage markers unavailable, phases will be coarser: {e}")
+
+def add_space_preflight(ydl, final_dir=None, reservation=None):
+    """Check free space against the selected formats' sizes before each video is fetched."""
+    try:
+        ydl.add_post_processor(disk_space.make_preflight(final_dir, reservation), when='before_dl')
+    except Exception as e:
+        logger.warning(f"Disk space preflight unavailable: {e}")
+
+def record_job_metrics(job):
+    metrics.JOBS.inc(status=job['status'])
+    metrics.JOB_SECONDS.observe(job['duration'])
+    if job['status'] == 'finished':
+        for phase, seconds in job['phases'].items():
+            metrics.PHASE_SECONDS.observe(seconds, phase=phase)
+
+def run_multi_download(urls, max_workers=3, progress_callback=None, result_callback=None, **kwargs):
+    """Run multiple concurrent downloads with shared session settings.
+
+    `urls` may be any iterable, e.g. lines streamed from stdin; it is read
+    only as fast as slots free up (at most 2 * max_workers jobs in flight).
+    With `result_callback`, each job record is passed to it as it completes
+    and nothing is kept; otherwise all records are returned in submission order.
+    """
+    in_flight = threading.BoundedSemaphore(max_workers * MULTI_DOWNLOAD_BACKLOG)
+    futures = []
+
+    def done(future):
+        in_flight.release()
+        if result_callback:
+            result_callback(future.result())
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for url in urls:
+            in_flight.acquire()
+            future = executor.submit(download_item, url, progress_callback=progress_callback, **kwargs)
+            future.add_done_callback(done)
+            if not result_callback:
+                futures.append(future)
+    return None if result_callback else [f.result() for f in futures]
+
+if __name__ == "__main__":
+    # Headless batch mode; see src/cli.py
+    from src.cli import main
+    sys.exit(main())
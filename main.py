@@ -2,29 +2,35 @@ import sys
 import os
 import subprocess
 import logging
-import logging.handlers
+import threading
 import traceback
-import requests
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, QWidget, 
     QPushButton, QLabel, QLineEdit, QComboBox, QListWidget, 
     QListWidgetItem, QFrame, QProgressBar, QStackedWidget,
-    QSystemTrayIcon, QGraphicsOpacityEffect, QMessageBox, QCheckBox
+    QSystemTrayIcon, QGraphicsOpacityEffect, QMessageBox, QCheckBox, QFileDialog, QProgressDialog
 )
 
 # 0. Constants
 CURRENT_VERSION = "1.0.0"
 # Replace with your actual GitHub RAW JSON URL
 UPDATE_URL = "https://raw.githubusercontent.com/username/repository/main/version.json"
-
-# 1. Setup Logging
+UPDATE_CACHE_FILE = "update_cache.json"
+UPDATE_CHECK_TTL = 24 * 3600   # seconds between network update checks
+UPDATE_RETRY_TTL = 3600        # seconds before retrying a failed check
+UPDATE_CHECK_DELAY = 5000      # ms after first paint before checking
+CONFIG_SAVE_DELAY = 2.0        # seconds of setting changes coalesced into one write
+REPORT_PREVIEW_LINES = 50
+CLIPBOARD_LOG_LINES = 1000
+CLIPBOARD_LOG_BYTES = 256 * 1024
+VISIBLE_ROWS_DELAY = 150       # ms of scrolling coalesced before re-prioritizing metadata
+
+# 1. Setup Logging (file I/O happens on a background listener thread)
+from src.log_setup import LoggingPipeline, tail_lines, log_excerpt, export_log_bundle
 log_file = "app.log"
 logger = logging.getLogger("UltraTube")
 logger.setLevel(logging.DEBUG)
-handler = logging.handlers.RotatingFileHandler(log_file, maxBytes=1024*1024*5, backupCount=3)
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-handler.setFormatter(formatter)
-logger.addHandler(handler)
+log_pipeline = LoggingPipeline(logger, log_file, json_file="app.jsonl")
 
 # 2. Global Exception Handler
 def exception_hook(exctype, value, tb):
@@ -43,14 +49,26 @@ def exception_hook(exctype, value, tb):
     sys.exit(1)
 
 sys.excepthook = exception_hook
-from PyQt6.QtCore import Qt, QSize, pyqtSignal, QThread, pyqtSlot, QPropertyAnimation, QEasingCurve, QRunnable, QThreadPool, QObject, QTimer, QTime, pyqtProperty, QPointF
+from PyQt6.QtCore import Qt, QSize, pyqtSignal, QThread, pyqtSlot, QEasingCurve, QEvent, QRunnable, QThreadPool, QObject, QTimer, QTime, pyqtProperty, QPointF, QRectF, QEventLoop
 from PyQt6.QtGui import QFont, QIcon, QPainter, QPen, QColor, QConicalGradient, QPixmap
 
 import downloader
 from downloader import DownloadProgress
 from src.config_manager import ConfigManager
+from src.state_store import StateStore, STATE_DB_FILE
+from src.http_session import get_session, close_session
+from src.update_cache import UpdateCache
+from src import theme
+from src import metrics
+from src import tracing
+from src import file_mover
+from src import audio_pipeline
+from src import format_policy
+from src import batch_scheduler
+from src import dedup
+from src import proxy_pool
+from src.animation_clock import AnimationClock
 from src.settings_dialog import SettingsDialog
-from src.browser_tab import EmbeddedBrowser
 from src.subscription_tab import SubscriptionTab
 
 class UpdateSignals(QObject):
@@ -76,27 +94,75 @@ class MetadataWorker(QThread):
         except Exception as e:
             self.error.emit(str(e))
 
+class LogTailWorker(QThread):
+    """Reads the end of the log file without touching the rest of it."""
+    finished = pyqtSignal(str, str) # preview, clipboard excerpt
+    error = pyqtSignal(str)
+
+    def __init__(self, path, preview_lines):
+        super().__init__()
+        self.path = path
+        self.preview_lines = preview_lines
+
+    def run(self):
+        try:
+            preview = "\n".join(tail_lines(self.path, self.preview_lines))
+            excerpt = log_excerpt(self.path, CLIPBOARD_LOG_LINES, CLIPBOARD_LOG_BYTES)
+            self.finished.emit(preview, excerpt)
+        except Exception as e:
+            self.error.emit(str(e))
+
+class LogExportWorker(QThread):
+    """Zips the logs (including rotated backups) in the background."""
+    finished = pyqtSignal(str)
+    error = pyqtSignal(str)
+
+    def __init__(self, dest, paths):
+        super().__init__()
+        self.dest = dest
+        self.paths = paths
+
+    def run(self):
+        try:
+            self.finished.emit(export_log_bundle(self.dest, self.paths))
+        except Exception as e:
+            self.error.emit(str(e))
+
 class UpdateWorker(QThread):
-    """Checks for updates in the background."""
+    """Checks for updates in the background, at most once per UPDATE_CHECK_TTL."""
     def __init__(self, signals):
         super().__init__()
         self.signals = signals
+        self.cache = UpdateCache(UPDATE_CACHE_FILE, ttl=UPDATE_CHECK_TTL, failure_ttl=UPDATE_RETRY_TTL)
 
     def run(self):
         try:
-            logger.info("Checking for updates...")
-            response = requests.get(UPDATE_URL, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                latest_version = data.get("version")
-                download_url = data.get("url")
-                changelog = data.get("changelog", "No changelog provided.")
-                
-                if latest_version and latest_version != CURRENT_VERSION:
-                    logger.info(f"Update found: {latest_version}")
-                    self.signals.update_found.emit(latest_version, download_url, changelog)
-                else:
-                    logger.info("Application is up to date.")
+            data = self.cache.load()
+            if data is None:
+                logger.info("Checking for updates...")
+                try:
+                    response = get_session().get(UPDATE_URL, timeout=10)
+                    response.raise_for_status()
+                    data = response.json()
+                except Exception:
+                    self.cache.save_failure()
+                    raise
+                self.cache.save(data)
+            elif not data:
+                logger.info("Skipping update check; the last one failed recently.")
+                return
+            else:
+                logger.info("Using cached update check result.")
+
+            latest_version = data.get("version")
+            download_url = data.get("url")
+            changelog = data.get("changelog", "No changelog provided.")
+
+            if latest_version and latest_version != CURRENT_VERSION:
+                logger.info(f"Update found: {latest_version}")
+                self.signals.update_found.emit(latest_version, download_url, changelog)
+            else:
+                logger.info("Application is up to date.")
         except Exception as e:
             logger.error(f"Failed to check for updates: {e}")
 
@@ -105,41 +171,66 @@ class DownloadSignals(QObject):
     progress = pyqtSignal(object)
     finished = pyqtSignal(str)
     error = pyqtSignal(str)
+    timing = pyqtSignal(str) # per-phase summary of the finished job
 
 class DownloadWorker(QRunnable):
     """Worker runnable for simultaneous downloads."""
-    def __init__(self, url, format_id=None, settings=None):
+    def __init__(self, url, format_id=None, settings=None, store=None, info=None):
         super().__init__()
         self.url = url
         self.format_id = format_id
+        self.info = info
         self.settings = settings or {}
+        self.store = store
         self.signals = DownloadSignals()
 
     def run(self):
+        last = {}
+        # May be called after run() returns and the runnable is deleted
+        url, store, signals = self.url, self.store, self.signals
+        def background_failed(error):
+            if store:
+                store.update_download_status(url, "failed")
+            signals.error.emit(error)
+
         def internal_callback(prog: DownloadProgress):
+            if prog.status == 'finished':
+                last['title'], last['filename'] = prog.title, prog.filename
             self.signals.progress.emit(prog)
 
         try:
-            downloader.download_item(
+            job = downloader.download_item(
                 self.url, 
                 format_id=self.format_id,
                 progress_callback=internal_callback,
+                info=self.info,
+                on_background_failure=background_failed,
                 **self.settings
             )
+            self.signals.timing.emit(job.get('trace_summary', ''))
+            if job['status'] != 'finished':
+                raise RuntimeError(job.get('error', 'Download failed'))
+            if self.store:
+                self.store.record_download(self.url, "finished", job.get('title') or last.get('title'),
+                                           job.get('filename') or last.get('filename'))
             self.signals.finished.emit("Complete")
         except Exception as e:
+            if self.store:
+                self.store.record_download(self.url, "failed")
             self.signals.error.emit(str(e))
 
 class CircularProgress(QWidget):
+    ANIM_DURATION = 0.6 # seconds
+    EASING = QEasingCurve(QEasingCurve.Type.OutCubic)
+
     def __init__(self, colors, size=60):
         super().__init__()
         self.setFixedSize(size, size)
         self.colors = colors
         self._value = 0
         self._target = 0
-        self.anim = QPropertyAnimation(self, b"progress_val")
-        self.anim.setDuration(600)
-        self.anim.setEasingCurve(QEasingCurve.Type.OutCubic)
+        self._start_value = 0
+        self._elapsed = 0.0
 
     @pyqtProperty(float)
     def progress_val(self): return self._value
@@ -155,9 +246,26 @@ class CircularProgress(QWidget):
         target = float(val)
         if abs(target - self._target) < 0.1: return
         self._target = target
-        self.anim.stop()
-        self.anim.setEndValue(target)
-        self.anim.start()
+        self._start_value = self._value
+        self._elapsed = 0.0
+        AnimationClock.instance().subscribe(self)
+
+    def tick(self, dt):
+        """Advance the eased sweep towards the target; driven by the shared AnimationClock."""
+        self._elapsed += dt
+        t = min(1.0, self._elapsed / self.ANIM_DURATION)
+        eased = self.EASING.valueForProgress(t)
+        self.progress_val = self._start_value + (self._target - self._start_value) * eased
+        if t >= 1.0:
+            AnimationClock.instance().unsubscribe(self)
+
+    def hideEvent(self, event):
+        # Hidden widgets are skipped by the clock, so jump straight to the target
+        clock = AnimationClock.instance()
+        if clock.is_subscribed(self):
+            clock.unsubscribe(self)
+            self._value = self._target
+        super().hideEvent(event)
 
     def paintEvent(self, event):
         painter = QPainter(self)
@@ -190,6 +298,25 @@ class CircularProgress(QWidget):
         painter.setFont(QFont("Inter", 10, QFont.Weight.Bold))
         painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, f"{int(self._value)}%")
 
+def format_duration(seconds):
+    if not seconds:
+        return "--:--"
+    mins, secs = divmod(int(seconds), 60)
+    hours, mins = divmod(mins, 60)
+    if hours > 0:
+        return f"{hours:02d}:{mins:02d}:{secs:02d}"
+    return f"{mins:02d}:{secs:02d}"
+
+def format_batch_estimate(estimate):
+    """One-line summary of batch_scheduler.plan()'s estimate."""
+    text = (f"{estimate['items']} items • ~{estimate['total_bytes'] / 2**30:.2f} GB • "
+            f"first in ~{format_duration(estimate['first_completion'] or 1)} • "
+            f"all in ~{format_duration(estimate['completion'] or 1)}")
+    unsure = estimate['guessed'] + estimate['unknown']
+    if unsure:
+        text += f" ({unsure} estimated from duration or unknown)"
+    return text
+
 class ImageLoader(QThread):
     finished = pyqtSignal(bytes)
     def __init__(self, url):
@@ -197,8 +324,7 @@ class ImageLoader(QThread):
         self.url = url
     def run(self):
         try:
-            headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
-            resp = requests.get(self.url, timeout=10, headers=headers)
+            resp = get_session().get(self.url, timeout=10)
             if resp.status_code == 200:
                 self.finished.emit(resp.content)
         except: pass
@@ -206,6 +332,7 @@ class ImageLoader(QThread):
 class ModernDownloadItem(QFrame):
     remove_requested = pyqtSignal(object)
     finished_successfully = pyqtSignal(str)
+    PULSE_SPEED = 1.0 # alpha change per second
 
     def __init__(self, url, colors, thumbnail_url=None):
         super().__init__()
@@ -213,19 +340,40 @@ class ModernDownloadItem(QFrame):
         self.colors = colors
         self.thumbnail_url = thumbnail_url
         self.file_path = None
+        self.info = None # Analyzed info dict, reused by the download while fresh
+        self.duration = None # seconds, for batch size estimates when the size is unknown
         
         self.init_ui()
         
         if self.thumbnail_url:
-            self._thumb_loader = ImageLoader(self.thumbnail_url)
-            self._thumb_loader.finished.connect(self.set_thumbnail)
-            self._thumb_loader.start()
+            self.load_thumbnail(self.thumbnail_url)
             
-        self.pulse_timer = QTimer(self)
-        self.pulse_timer.timeout.connect(self.update_pulse)
+        self.pulsing = False
         self.pulse_val = 0
         self.pulse_dir = 1
 
+    def load_thumbnail(self, url):
+        self.thumbnail_url = url
+        self._thumb_loader = ImageLoader(url)
+        self._thumb_loader.finished.connect(self.set_thumbnail)
+        self._thumb_loader.start()
+
+    def apply_metadata(self, info):
+        """Fill in what a flat playlist entry was missing once its full metadata arrives."""
+        if info.get('formats'):
+            self.info = info
+        if info.get('title'):
+            title = info['title']
+            self.title_label.setText(title if len(title) < 50 else title[:47] + "...")
+        if info.get('duration'):
+            self.duration = info['duration']
+            self.duration_label.setText(format_duration(info['duration']))
+        if not self.thumbnail_url and info.get('thumbnail'):
+            self.load_thumbnail(info['thumbnail'])
+        size = batch_scheduler.known_size(info)
+        if size:
+            self.stats_label.setText(f"~{size / (1024 * 1024):.1f} MB")
+
     def set_thumbnail(self, data):
         pix = QPixmap()
         if pix.loadFromData(data):
@@ -233,46 +381,38 @@ class ModernDownloadItem(QFrame):
             self.thumb_label.setPixmap(scaled)
         else:
             self.thumb_label.setText("🎬")
-            self.thumb_label.setStyleSheet(f"font-size: 30px; color: {self.colors['sub_text']};")
+            theme.set_style_property(self.thumb_label, "placeholder", True)
+
+    def tick(self, dt):
+        """Creates a professional 'breathing' effect during metadata fetch.
 
-    def update_pulse(self):
-        """Creates a professional 'breathing' effect during metadata fetch."""
+        Driven by the shared AnimationClock rather than a timer per item.
+        """
         if self.pbar.value() > 0:
-            self.pulse_timer.stop()
-            self.setStyleSheet(self.card_style(1.0)) # Solid state
+            self.stop_pulse() # Solid state
             return
             
-        self.pulse_val += 0.05 * self.pulse_dir
+        self.pulse_val += self.PULSE_SPEED * dt * self.pulse_dir
         if self.pulse_val >= 1.0: self.pulse_dir = -1
         if self.pulse_val <= 0.3: self.pulse_dir = 1
         
-        self.setStyleSheet(self.card_style(self.pulse_val))
+        # Only the border is repainted; the stylesheet is left untouched
+        self.update()
 
-    def card_style(self, alpha):
-        accent = self.colors['accent']
-        # Convert hex to RGBA for pulsed border
-        r = int(accent[1:3], 16)
-        g = int(accent[3:5], 16)
-        b = int(accent[5:7], 16)
-        
-        return f"""
-            ModernDownloadItem {{
-                background-color: {self.colors['card']};
-                border: 1px solid rgba({r}, {g}, {b}, {alpha});
-                border-radius: 16px;
-                margin-bottom: 8px;
-            }}
-            QPushButton {{
-                background: {self.colors['bg']};
-                border: 1px solid {self.colors['border']};
-                border-radius: 10px;
-                color: {self.colors['text']};
-            }}
-            QPushButton:hover {{
-                background: {accent};
-                color: white;
-            }}
-        """
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.pulsing:
+            return
+        # The stylesheet hides the border while pulsing, we draw it with the current alpha
+        color = QColor(self.colors['accent'])
+        color.setAlphaF(max(0.0, min(1.0, self.pulse_val)))
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        pen = QPen(color)
+        pen.setWidth(1)
+        painter.setPen(pen)
+        rect = QRectF(self.rect()).adjusted(0.5, 0.5, -0.5, -8.5) # margin-bottom: 8px
+        painter.drawRoundedRect(rect, 16, 16)
 
     def init_ui(self):
         self.setFixedHeight(110)
@@ -288,14 +428,14 @@ class ModernDownloadItem(QFrame):
         # Thumbnail with Rounded Corners Mask
         self.thumb_container = QFrame()
         self.thumb_container.setFixedSize(140, 80)
-        self.thumb_container.setStyleSheet(f"background: {self.colors['bg']}; border-radius: 10px;")
+        self.thumb_container.setObjectName("thumb_container")
         self.thumb_layout = QVBoxLayout(self.thumb_container)
         self.thumb_layout.setContentsMargins(0,0,0,0)
         
         self.thumb_label = QLabel()
         self.thumb_label.setFixedSize(140, 80)
         self.thumb_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.thumb_label.setStyleSheet("border-radius: 10px;")
+        self.thumb_label.setObjectName("thumb_label")
         self.thumb_layout.addWidget(self.thumb_label)
         layout.addWidget(self.thumb_container)
 
@@ -304,26 +444,19 @@ class ModernDownloadItem(QFrame):
         info_layout.setSpacing(4)
         
         self.title_label = QLabel(self.url if len(self.url) < 50 else self.url[:47] + "...")
-        self.title_label.setStyleSheet("font-size: 15px; font-weight: 700;")
+        self.title_label.setObjectName("item_title")
         self.title_label.setWordWrap(True)
         info_layout.addWidget(self.title_label)
 
         self.status_label = QLabel("Awaiting command...")
-        self.status_label.setStyleSheet(f"font-size: 12px; color: {self.colors['sub_text']};")
+        self.status_label.setObjectName("item_status")
         info_layout.addWidget(self.status_label)
         
         self.stats_label = QLabel("Ready for extraction")
-        self.stats_label.setStyleSheet(f"font-size: 11px; font-weight: 600; color: {self.colors['accent']};")
+        self.stats_label.setObjectName("item_stats")
         
         self.duration_label = QLabel("--:--")
-        self.duration_label.setStyleSheet(f"""
-            background-color: rgba(0, 0, 0, 0.6);
-            color: white;
-            padding: 2px 6px;
-            border-radius: 4px;
-            font-size: 10px;
-            font-weight: 800;
-        """)
+        self.duration_label.setObjectName("duration_badge")
         
         # Position duration over thumbnail
         duration_layout = QVBoxLayout()
@@ -347,6 +480,7 @@ class ModernDownloadItem(QFrame):
         actions_layout.setSpacing(5)
         
         self.btn_open = QPushButton("📂")
+        self.btn_open.setObjectName("open_btn")
         self.btn_open.setFixedSize(36, 36)
         self.btn_open.setEnabled(False)
         self.btn_open.clicked.connect(self.open_folder)
@@ -358,19 +492,17 @@ class ModernDownloadItem(QFrame):
         actions_layout.addWidget(self.btn_cancel)
         layout.addLayout(actions_layout)
 
-        self.update_style()
-
-    def update_style(self):
-        # Initial call
-        self.setStyleSheet(self.card_style(1.0))
-
     def start_pulse(self):
-        if not self.pulse_timer.isActive():
-            self.pulse_timer.start(50)
+        if not self.pulsing:
+            self.pulsing = True
+            AnimationClock.instance().subscribe(self)
+            theme.set_style_property(self, "pulsing", True)
 
     def stop_pulse(self):
-        self.pulse_timer.stop()
-        self.setStyleSheet(self.card_style(1.0))
+        if self.pulsing:
+            self.pulsing = False
+            AnimationClock.instance().unsubscribe(self)
+            theme.set_style_property(self, "pulsing", False)
 
     @pyqtSlot(object)
     def update_progress(self, prog: DownloadProgress):
@@ -388,9 +520,20 @@ class ModernDownloadItem(QFrame):
         elif prog.status == 'finished':
             self.status_label.setText("Archived 🚀")
             self.btn_open.setEnabled(True)
-            self.btn_open.setStyleSheet(f"background: {self.colors['success']}; color: white; border: none;")
+            theme.set_style_property(self.btn_open, "done", True)
             self.finished_successfully.emit(prog.title)
 
+    @pyqtSlot(str)
+    def show_error(self, message):
+        self.stop_pulse()
+        self.status_label.setText("Failed ⚠")
+        self.stats_label.setText(message if len(message) < 60 else message[:57] + "...")
+
+    @pyqtSlot(str)
+    def show_timing(self, summary):
+        if summary:
+            self.setToolTip(f"Time spent: {summary}")
+
     def open_folder(self):
         folder = os.path.abspath("downloads")
         if sys.platform == 'win32': os.startfile(folder)
@@ -399,8 +542,18 @@ class ModernDownloadItem(QFrame):
 class VideoDownloaderApp(QMainWindow):
     def __init__(self):
         super().__init__()
-        self.config_manager = ConfigManager()
+        self.config_manager = ConfigManager(save_delay=CONFIG_SAVE_DELAY)
+        if self.config_manager.config.trace_file:
+            tracing.set_exporter(tracing.JsonFileExporter(self.config_manager.config.trace_file))
+        self.state_store = StateStore(STATE_DB_FILE)
+        if self.config_manager.legacy_subscriptions:
+            # One-time move of subscriptions out of config.json
+            added = self.state_store.import_subscriptions(self.config_manager.legacy_subscriptions)
+            self.config_manager.legacy_subscriptions = []
+            self.config_manager.save()
+            logger.info(f"Migrated {added} subscriptions from config.json to {STATE_DB_FILE}.")
         self.workers = {}
+        self._prewarmed = False
         self.setWindowTitle("UltraTube Premium")
         self.setMinimumSize(1000, 750)
         
@@ -413,6 +566,21 @@ class VideoDownloaderApp(QMainWindow):
         self.sched_timer = QTimer(self)
         self.sched_timer.timeout.connect(self.process_scheduled_queue)
         self.sched_timer.start(10000) # Check every 10 seconds
+
+        self.metrics_server = None
+        self.start_metrics_server()
+        file_mover.set_mover(file_mover.FileMover(self.config_manager.config.move_workers))
+        audio_pipeline.set_transcoder(audio_pipeline.Transcoder(self.config_manager.config.transcode_workers or None))
+        if self.config_manager.config.proxies:
+            pool = proxy_pool.ProxyPool(self.config_manager.config.proxies)
+            pool.start()
+            proxy_pool.set_pool(pool)
+        if self.config_manager.config.dedup_mode != "off":
+            dedup.set_deduplicator(dedup.Deduplicator(self.state_store, self.config_manager.config.dedup_mode))
+
+        # Background metadata for flat playlist entries (created on first playlist)
+        self.metadata_resolver = None
+        self.unresolved_rows = {} # url -> ModernDownloadItem
         
         # App Icon
         self.app_icon_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "resources", "icon.ico"))
@@ -428,11 +596,39 @@ class VideoDownloaderApp(QMainWindow):
         self.center_window()
         self.init_smart_mode()
         
-        # Check for Updates
+        # Check for Updates (deferred until the window has settled)
         self.update_signals = UpdateSignals()
         self.update_signals.update_found.connect(self.show_update_dialog)
-        self.update_thread = UpdateWorker(self.update_signals)
-        self.update_thread.start()
+        self.update_thread = None
+
+    def start_metrics_server(self):
+        """Serve /metrics and /metrics.json locally when metrics_port is configured."""
+        config = self.config_manager.config
+        if not config.metrics_port:
+            return
+        from src.control_api import ControlServer
+        metrics.QUEUE_DEPTH.set_function(lambda: len(self.pending_queue))
+        server = ControlServer(None, host=config.api_host, port=config.metrics_port)
+        metrics.add_routes(server)
+        try:
+            server.start()
+            self.metrics_server = server
+        except OSError as e:
+            logger.error(f"Could not start metrics endpoint on port {config.metrics_port}: {e}")
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        AnimationClock.instance().resume()
+        if not self._prewarmed:
+            # Load yt-dlp once the first frame is up instead of at import time
+            self._prewarmed = True
+            QTimer.singleShot(0, downloader.prewarm)
+            QTimer.singleShot(UPDATE_CHECK_DELAY, self.check_for_updates)
+
+    def check_for_updates(self):
+        if self.update_thread is None:
+            self.update_thread = UpdateWorker(self.update_signals)
+            self.update_thread.start()
 
     def show_update_dialog(self, version, url, changelog):
         """Prompt the user when a new update is available."""
@@ -453,33 +649,11 @@ class VideoDownloaderApp(QMainWindow):
             logger.info(f"User accepted update v{version}. Opening: {url}")
 
     def init_theme(self):
-        is_dark = self.config_manager.config.dark_mode
-        if is_dark:
-            self.colors = {
-                'bg': '#0f0f12',         # Deep obsidian
-                'sidebar': '#16161a',    # Slightly lighter sidebar
-                'card': '#1c1c21',       # Floating cards
-                'text': '#f0f0f5',        # Near white
-                'sub_text': '#9494a5',   # Muted mauve
-                'border': '#2a2a32',     # Subtle separation
-                'accent': '#6366f1',     # Vibrant Indigo
-                'accent_light': '#818cf8',
-                'success': '#10b981',    # Emerald
-                'danger': '#ef4444'      # Rose
-            }
-        else:
-            self.colors = {
-                'bg': '#f8fafc',         # Clean slate
-                'sidebar': '#ffffff',
-                'card': '#ffffff',
-                'text': '#0f172a',       # Dark slate
-                'sub_text': '#64748b',   # Slate gray
-                'border': '#e2e8f0',     # Light dividers
-                'accent': '#4f46e5',     # Deep Indigo
-                'accent_light': '#6366f1',
-                'success': '#059669',
-                'danger': '#dc2626'
-            }
+        # Updated in place so widgets holding a reference repaint with the new palette
+        if not hasattr(self, 'colors'):
+            self.colors = {}
+        self.colors.clear()
+        self.colors.update(theme.palette(self.config_manager.config.dark_mode))
 
     def init_ui(self):
         self.central_widget = QWidget()
@@ -496,7 +670,7 @@ class VideoDownloaderApp(QMainWindow):
         self.sidebar_layout.setSpacing(10)
         
         app_title = QLabel("UltraTube")
-        app_title.setStyleSheet(f"font-size: 22px; font-weight: 900; color: {self.colors['accent']}; margin-bottom: 20px;")
+        app_title.setObjectName("app_title")
         self.sidebar_layout.addWidget(app_title)
 
         self.btn_nav_down = self.create_nav_btn("📥  Downloader", 0)
@@ -510,7 +684,7 @@ class VideoDownloaderApp(QMainWindow):
         
         self.btn_report_bug = QPushButton("🐞  Report Issue")
         self.btn_report_bug.setFixedSize(210, 45)
-        self.btn_report_bug.setStyleSheet(f"border: 1px solid {self.colors['border']}; font-weight: 600; text-align: left; padding-left: 15px;")
+        self.btn_report_bug.setObjectName("report_btn")
         self.btn_report_bug.clicked.connect(self.report_bug)
         self.sidebar_layout.addWidget(self.btn_report_bug)
         
@@ -544,10 +718,10 @@ class VideoDownloaderApp(QMainWindow):
         header_row = QHBoxLayout()
         title_vbox = QVBoxLayout()
         self.lbl_head = QLabel("UltraTube Downloader")
-        self.lbl_head.setStyleSheet("font-size: 32px; font-weight: 800;")
+        self.lbl_head.setObjectName("page_title")
         title_vbox.addWidget(self.lbl_head)
         self.lbl_sub = QLabel("Premium high-fidelity video extraction")
-        self.lbl_sub.setStyleSheet(f"font-size: 14px; color: {self.colors['sub_text']};")
+        self.lbl_sub.setObjectName("page_subtitle")
         title_vbox.addWidget(self.lbl_sub)
         header_row.addLayout(title_vbox)
         header_row.addStretch()
@@ -558,6 +732,7 @@ class VideoDownloaderApp(QMainWindow):
         header_row.addWidget(self.btn_theme)
 
         self.smart_btn = QPushButton("✨ Smart Mode")
+        self.smart_btn.setObjectName("smart_btn")
         self.smart_btn.setFixedSize(140, 40)
         self.smart_btn.clicked.connect(self.toggle_smart_mode)
         header_row.addWidget(self.smart_btn)
@@ -604,15 +779,18 @@ class VideoDownloaderApp(QMainWindow):
         # Batch Controls
         self.batch_layout = QHBoxLayout()
         self.cb_select_all = QCheckBox("Select All")
-        self.cb_select_all.setStyleSheet("font-weight: 600; font-size: 13px;")
+        self.cb_select_all.setObjectName("select_all")
         self.cb_select_all.setChecked(True)
         self.cb_select_all.clicked.connect(self.toggle_select_all)
         self.batch_layout.addWidget(self.cb_select_all)
         self.batch_layout.addStretch()
+        self.batch_estimate_label = QLabel("")
+        self.batch_estimate_label.setObjectName("item_stats")
+        self.batch_layout.addWidget(self.batch_estimate_label)
         
         self.btn_download_batch = QPushButton("Download Selected")
         self.btn_download_batch.setFixedSize(180, 36)
-        self.btn_download_batch.setStyleSheet(f"background-color: {self.colors['accent']}; color: white; border-radius: 10px; font-weight: 700;")
+        self.btn_download_batch.setObjectName("batch_btn")
         self.btn_download_batch.clicked.connect(self.start_batch_download)
         self.batch_layout.addWidget(self.btn_download_batch)
         
@@ -622,6 +800,11 @@ class VideoDownloaderApp(QMainWindow):
         self.downloads_list.setSelectionMode(QListWidget.SelectionMode.NoSelection)
         self.downloads_list.setVerticalScrollMode(QListWidget.ScrollMode.ScrollPerPixel)
         self.downloads_list.setSpacing(5)
+        self.visible_rows_timer = QTimer(self)
+        self.visible_rows_timer.setSingleShot(True)
+        self.visible_rows_timer.setInterval(VISIBLE_ROWS_DELAY)
+        self.visible_rows_timer.timeout.connect(self.prioritize_visible_rows)
+        self.downloads_list.verticalScrollBar().valueChanged.connect(lambda _: self.visible_rows_timer.start())
         
         self.stack_dl = QStackedWidget()
         
@@ -630,23 +813,23 @@ class VideoDownloaderApp(QMainWindow):
         empty_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
         
         empty_icon = QLabel("🚀")
-        empty_icon.setStyleSheet("font-size: 64px; margin-bottom: 10px;")
+        empty_icon.setObjectName("empty_icon")
         empty_icon.setAlignment(Qt.AlignmentFlag.AlignCenter)
         empty_layout.addWidget(empty_icon)
         
         empty_title = QLabel("Ready to Download")
-        empty_title.setStyleSheet("font-size: 20px; font-weight: 700;")
+        empty_title.setObjectName("empty_title")
         empty_title.setAlignment(Qt.AlignmentFlag.AlignCenter)
         empty_layout.addWidget(empty_title)
         
         empty_desc = QLabel("Paste a URL above to start your high-fidelity extraction journey.")
-        empty_desc.setStyleSheet(f"color: {self.colors['sub_text']}; font-size: 14px;")
+        empty_desc.setObjectName("empty_desc")
         empty_desc.setAlignment(Qt.AlignmentFlag.AlignCenter)
         empty_layout.addWidget(empty_desc)
         
         # Subtle Sparkle Effect (Animated Glow)
         self.sparkle_label = QLabel("✨ System Optimized & Ready")
-        self.sparkle_label.setStyleSheet(f"color: {self.colors['accent']}; font-size: 11px; font-weight: 800; opacity: 0.6;")
+        self.sparkle_label.setObjectName("sparkle")
         self.sparkle_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         empty_layout.addWidget(self.sparkle_label)
         
@@ -668,13 +851,15 @@ class VideoDownloaderApp(QMainWindow):
         """Lazy load tabs when they are first accessed."""
         if index == 1 and self.browser_view is None:
             logger.info("Lazy loading Embedded Browser...")
+            # QtWebEngine is only imported once the tab is actually opened
+            from src.browser_tab import EmbeddedBrowser
             self.browser_view = EmbeddedBrowser()
             self.stack.removeWidget(self.stack.widget(1))
             self.stack.insertWidget(1, self.browser_view)
             self.stack.setCurrentIndex(1)
         elif index == 2 and self.subscription_view is None:
             logger.info("Lazy loading Subscription Tab...")
-            self.subscription_view = SubscriptionTab(self.config_manager, self.colors)
+            self.subscription_view = SubscriptionTab(self.config_manager, self.state_store, self.colors)
             self.stack.removeWidget(self.stack.widget(2))
             self.stack.insertWidget(2, self.subscription_view)
             self.stack.setCurrentIndex(2)
@@ -684,131 +869,21 @@ class VideoDownloaderApp(QMainWindow):
     def create_nav_btn(self, text, idx):
         btn = QPushButton(text)
         btn.setFixedSize(210, 45)
-        btn.setStyleSheet("text-align: left; padding-left: 15px; font-size: 14px;")
+        btn.setObjectName("nav_btn")
         btn.clicked.connect(lambda: self.stack.setCurrentIndex(idx))
         return btn
 
     def apply_styles(self):
-        accent = self.colors['accent']
-        sidebar_bg = self.colors['sidebar']
-        self.setStyleSheet(f"""
-            QMainWindow {{ background-color: {self.colors['bg']}; }}
-            QWidget {{ color: {self.colors['text']}; font-family: 'Inter', 'Segoe UI', sans-serif; }}
-            
-            #sidebar {{ 
-                background-color: {sidebar_bg}; 
-                border-right: 1px solid {self.colors['border']}; 
-            }}
-            
-            QLineEdit {{ 
-                background-color: {self.colors['card']}; 
-                border: 2px solid {self.colors['border']}; 
-                border-radius: 12px; 
-                padding: 12px 20px; 
-                font-size: 15px;
-                color: {self.colors['text']};
-            }}
-            QLineEdit:focus {{ border-color: {accent}; background-color: {self.colors['bg']}; }}
-            
-            QComboBox {{ 
-                background-color: {self.colors['card']}; 
-                border: 2px solid {self.colors['border']}; 
-                border-radius: 12px; 
-                padding: 10px 15px; 
-                font-size: 14px;
-                color: {self.colors['text']};
-            }}
-            QComboBox::drop-down {{ border: none; }}
-            QComboBox:hover {{ border-color: {accent}; }}
-            QComboBox QAbstractItemView {{
-                background-color: {self.colors['card']};
-                border: 1px solid {self.colors['border']};
-                selection-background-color: {accent};
-                color: {self.colors['text']};
-                outline: none;
-            }}
-
-            QCheckBox {{
-                spacing: 8px;
-                color: {self.colors['text']};
-            }}
-            QCheckBox::indicator {{
-                width: 20px;
-                height: 20px;
-                background-color: {self.colors['card']};
-                border: 2px solid {self.colors['border']};
-                border-radius: 6px;
-            }}
-            QCheckBox::indicator:checked {{
-                background-color: {accent};
-                border-color: {accent};
-                image: url(data:image/svg+xml;base64,PHN2ZyB4bWxucz0iaHR0cDovL3d3dy53My5vcmcvMjAwMC9zdmciIHdpZHRoPSIyNCIgaGVpZ2h0PSIyNCIgdmlld0JveD0iMCAwIDI0IDI0IiBmaWxsPSJub25lIiBzdHJva2U9IndoaXRlIiBzdHJva2Utd2lkdGg9IjQiIHN0cm9rZS1saW5lY2FwPSJyb3VuZCIgc3Ryb2tlLWxpbmVqb2luPSJyb3VuZCI+PHBvbHlsaW5lIHBvaW50cz0iMjAgNiA5IDE3IDQgMTIiPjwvcG9seWxpbmU+PC9zdmc+);
-            }}
-            QCheckBox::indicator:hover {{ border-color: {accent}; }}
-
-            #download_btn {{ 
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 {accent}, stop:1 {self.colors['accent_light']});
-                color: white; 
-                border: none; 
-                border-radius: 12px;
-                font-size: 16px;
-                font-weight: 800;
-                min-height: 50px;
-            }}
-            #download_btn:hover {{
-                background-color: {self.colors['accent_light']};
-            }}
-
-            QProgressBar {{
-                border: none;
-                background-color: {self.colors['border']};
-                height: 8px;
-                border-radius: 4px;
-            }}
-            QProgressBar::chunk {{
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 {accent}, stop:1 {self.colors['accent_light']});
-                border-radius: 4px;
-            }}
-            
-            QListWidget {{ background: transparent; border: none; outline: none; }}
-            QListWidget::item {{ background: transparent; border: none; }}
-            QListWidget::item:selected {{ background: transparent; border: none; }}
-            QScrollBar:vertical {{
-                border: none;
-                background: transparent;
-                width: 6px;
-            }}
-            QScrollBar::handle:vertical {{
-                background: {self.colors['border']};
-                border-radius: 3px;
-                min-height: 40px;
-            }}
-        """)
+        # One cached, app-wide sheet; rows and dialogs style themselves via object names
+        theme.apply_theme(QApplication.instance(), self.config_manager.config.dark_mode)
         self.sidebar.setObjectName("sidebar")
-        if hasattr(self, 'download_btn'):
-            self.download_btn.setObjectName("download_btn")
         self.update_nav_styles()
 
     def update_nav_styles(self):
         idx = self.stack.currentIndex()
         btns = [self.btn_nav_down, self.btn_nav_web, self.btn_nav_sub]
         for i, btn in enumerate(btns):
-            is_active = (i == idx)
-            btn.setStyleSheet(f"""
-                QPushButton {{
-                    background-color: {self.colors['accent'] if is_active else 'transparent'};
-                    color: {'white' if is_active else self.colors['sub_text']};
-                    border: none;
-                    text-align: left;
-                    padding-left: 20px;
-                    font-weight: {'800' if is_active else '500'};
-                    border-radius: 10px;
-                }}
-                QPushButton:hover {{
-                    background-color: {self.colors['accent'] if is_active else self.colors['border']};
-                    color: white;
-                }}
-            """)
+            theme.set_style_property(btn, "active", i == idx)
 
     def toggle_theme(self):
         self.config_manager.update(dark_mode=not self.config_manager.config.dark_mode)
@@ -847,15 +922,7 @@ class VideoDownloaderApp(QMainWindow):
         self.btn_analyze.setEnabled(False)
         self.btn_analyze.setText("Analyzing...")
         
-        config = self.config_manager.config
-        settings = {
-            'proxy': config.proxy,
-            'cookie_file': config.cookies_file,
-            'internal_browser': config.use_internal_browser,
-            'allow_unplayable': config.experimental_drm,
-        }
-        
-        self.meta_worker = MetadataWorker(url, settings)
+        self.meta_worker = MetadataWorker(url, self.metadata_settings())
         self.meta_worker.finished.connect(self.on_metadata_fetched)
         self.meta_worker.error.connect(self.on_metadata_error)
         self.meta_worker.start()
@@ -876,6 +943,7 @@ class VideoDownloaderApp(QMainWindow):
 
         # Handle Playlist vs Single Video
         entries = info.get('entries', [info])
+        unresolved = {} # flat playlist entries still missing formats/duration
         for entry in entries:
             video_url = entry.get('url') or entry.get('webpage_url')
             if not video_url: continue
@@ -888,20 +956,13 @@ class VideoDownloaderApp(QMainWindow):
                 # Get the last (often highest resolution) thumbnail
                 thumb = entry.get('thumbnails')[-1].get('url')
             
-            duration = entry.get('duration')
-            
-            # Format duration
-            duration_text = "--:--"
-            if duration:
-                mins, secs = divmod(int(duration), 60)
-                hours, mins = divmod(mins, 60)
-                if hours > 0:
-                    duration_text = f"{hours:02d}:{mins:02d}:{secs:02d}"
-                else:
-                    duration_text = f"{mins:02d}:{secs:02d}"
+            duration_text = format_duration(entry.get('duration'))
 
             item = QListWidgetItem(self.downloads_list)
             widget = ModernDownloadItem(video_url, self.colors, thumbnail_url=thumb)
+            if entry.get('formats'):
+                widget.info = entry
+            widget.duration = entry.get('duration')
             widget.title_label.setText(title if len(title) < 50 else title[:47] + "...")
             widget.duration_label.setText(duration_text)
             widget.status_label.setText("Ready for extraction")
@@ -909,6 +970,55 @@ class VideoDownloaderApp(QMainWindow):
             item.setSizeHint(widget.sizeHint())
             self.downloads_list.addItem(item)
             self.downloads_list.setItemWidget(item, widget)
+            if 'entries' in info and not entry.get('formats'):
+                unresolved[video_url] = widget
+
+        if unresolved and self.config_manager.config.resolve_playlist_metadata:
+            self.resolve_entries(unresolved)
+
+    def metadata_settings(self):
+        config = self.config_manager.config
+        return {
+            'proxy': config.proxy,
+            'cookie_file': config.cookies_file,
+            'internal_browser': config.use_internal_browser,
+            'allow_unplayable': config.experimental_drm,
+        }
+
+    def resolve_entries(self, rows):
+        """Fetch full metadata for flat playlist rows in the background, visible rows first."""
+        if self.metadata_resolver is None:
+            from src.metadata_resolver import MetadataResolver
+            self.metadata_resolver = MetadataResolver(self.metadata_settings(),
+                                                      self.config_manager.config.metadata_workers, self)
+            self.metadata_resolver.resolved.connect(self.on_entry_resolved)
+            self.metadata_resolver.failed.connect(lambda url, error: self.unresolved_rows.pop(url, None))
+        self.unresolved_rows.update(rows)
+        self.metadata_resolver.enqueue(list(rows))
+        QTimer.singleShot(0, self.prioritize_visible_rows)
+
+    def prioritize_visible_rows(self):
+        if not self.metadata_resolver or not self.unresolved_rows:
+            return
+        viewport = self.downloads_list.viewport().rect()
+        visible = []
+        for i in range(self.downloads_list.count()):
+            item = self.downloads_list.item(i)
+            if not self.downloads_list.visualItemRect(item).intersects(viewport):
+                continue
+            widget = self.downloads_list.itemWidget(item)
+            if widget is not None and widget.url in self.unresolved_rows:
+                visible.append(widget.url)
+        self.metadata_resolver.prioritize(visible)
+
+    def on_entry_resolved(self, url, info):
+        widget = self.unresolved_rows.pop(url, None)
+        if widget is None:
+            return
+        try:
+            widget.apply_metadata(info)
+        except RuntimeError:
+            pass # Row was removed meanwhile
 
     def toggle_select_all(self, checked):
         for i in range(self.downloads_list.count()):
@@ -930,59 +1040,99 @@ class VideoDownloaderApp(QMainWindow):
             'browser': config.browser_cookies if config.browser_cookies != "None" else None,
             'internal_browser': config.use_internal_browser,
             'allow_unplayable': config.experimental_drm,
+            'archive_file': config.archive_file,
+            'staging_dir': config.staging_dir or None,
+            'audio_codec': config.audio_codec if fmt_type == "MP3 Audio" else None,
+            'video_codec': config.video_codec,
         }
 
-        count = 0
+        selected = []
         for i in range(self.downloads_list.count()):
-            item = self.downloads_list.item(i)
-            widget = self.downloads_list.itemWidget(item)
-            
+            widget = self.downloads_list.itemWidget(self.downloads_list.item(i))
             if widget.checkbox.isChecked() and widget.pbar.value() == 0:
-                worker = DownloadWorker(widget.url, format_id=engine_format, settings=settings)
-                worker.signals.progress.connect(widget.update_progress)
-                
-                widget.start_pulse()
-                if self.is_within_schedule():
-                    self.thread_pool.start(worker)
-                else:
-                    self.pending_queue.append((worker, widget))
-                    widget.status_label.setText(f"Scheduled...")
-                
-                widget.checkbox.setEnabled(False) 
-                count += 1
-        
-        if count > 0:
-            logger.info(f"Started batch download for {count} items.")
+                selected.append(widget)
+        if not selected:
+            return
 
-    def report_bug(self):
-        """Read logs and provide a way for the user to report issues."""
-        try:
-            with open("app.log", "r") as f:
-                logs = f.read()
-            
-            # Show a snippet and offer to copy
-            msg = QMessageBox(self)
-            msg.setWindowTitle("Report a Bug")
-            msg.setText("We're sorry you're having issues!")
-            msg.setInformativeText("Would you like to copy the last 50 lines of the application log to your clipboard to send to developers?")
+        # Start order and an up-front estimate for the whole batch
+        policy = config.batch_order if config.batch_order in batch_scheduler.POLICIES else "sjf"
+        start_order, estimate = batch_scheduler.plan(
+            [(widget.info, widget.duration) for widget in selected],
+            policy=policy, workers=self.thread_pool.maxThreadCount(),
+            selection=format_policy.for_download(engine_format, settings['video_codec'], settings['audio_codec']))
+        self.batch_estimate_label.setText(format_batch_estimate(estimate))
+        logger.info(f"Batch estimate ({policy}): {format_batch_estimate(estimate)}")
+
+        for index in start_order:
+            widget = selected[index]
+            worker = DownloadWorker(widget.url, format_id=engine_format, settings=settings,
+                                    store=self.state_store, info=widget.info)
+            widget.info = None
+            worker.signals.progress.connect(widget.update_progress)
+            worker.signals.timing.connect(widget.show_timing)
+            worker.signals.error.connect(widget.show_error)
             
-            last_lines = "\n".join(logs.splitlines()[-50:])
-            msg.setDetailedText(last_lines)
-            
-            copy_btn = msg.addButton("Copy Logs", QMessageBox.ButtonRole.ActionRole)
-            msg.addButton(QMessageBox.StandardButton.Close)
-            
-            msg.exec()
+            widget.start_pulse()
+            if self.is_within_schedule():
+                self.thread_pool.start(worker)
+            else:
+                self.pending_queue.append((worker, widget))
+                widget.status_label.setText(f"Scheduled...")
             
-            if msg.clickedButton() == copy_btn:
-                clipboard = QApplication.clipboard()
-                clipboard.setText(logs)
-                logger.info("User copied logs to clipboard via report_bug.")
-                QMessageBox.information(self, "Success", "Logs have been copied to your clipboard!")
-                
-        except Exception as e:
-            logger.error(f"Failed to read log file: {e}")
-            QMessageBox.warning(self, "Error", "Could not read log file.")
+            widget.checkbox.setEnabled(False) 
+        
+        logger.info(f"Started batch download for {len(selected)} items.")
+
+    def report_bug(self):
+        """Read the log tail off the GUI thread, then offer ways to report issues."""
+        self.btn_report_bug.setEnabled(False)
+        self.log_tail_worker = LogTailWorker(log_file, REPORT_PREVIEW_LINES)
+        self.log_tail_worker.finished.connect(self.show_bug_report)
+        self.log_tail_worker.error.connect(self.on_log_read_error)
+        self.log_tail_worker.start()
+
+    def on_log_read_error(self, error):
+        self.btn_report_bug.setEnabled(True)
+        logger.error(f"Failed to read log file: {error}")
+        QMessageBox.warning(self, "Error", "Could not read log file.")
+
+    def show_bug_report(self, preview, excerpt):
+        self.btn_report_bug.setEnabled(True)
+
+        # Show a snippet and offer to copy
+        msg = QMessageBox(self)
+        msg.setWindowTitle("Report a Bug")
+        msg.setText("We're sorry you're having issues!")
+        msg.setInformativeText(
+            "Would you like to copy the recent application log to your clipboard to send to developers? "
+            "For the full history, export a compressed log bundle instead."
+        )
+        msg.setDetailedText(preview)
+
+        copy_btn = msg.addButton("Copy Logs", QMessageBox.ButtonRole.ActionRole)
+        export_btn = msg.addButton("Export Bundle...", QMessageBox.ButtonRole.ActionRole)
+        msg.addButton(QMessageBox.StandardButton.Close)
+
+        msg.exec()
+
+        if msg.clickedButton() == copy_btn:
+            clipboard = QApplication.clipboard()
+            clipboard.setText(excerpt)
+            logger.info("User copied logs to clipboard via report_bug.")
+            QMessageBox.information(self, "Success", "Logs have been copied to your clipboard!")
+        elif msg.clickedButton() == export_btn:
+            self.export_log_bundle()
+
+    def export_log_bundle(self):
+        dest, _ = QFileDialog.getSaveFileName(self, "Export Log Bundle", "ultratube-logs.zip", "Zip archives (*.zip)")
+        if not dest:
+            return
+        self.log_export_worker = LogExportWorker(dest, log_pipeline.log_files())
+        self.log_export_worker.finished.connect(
+            lambda path: QMessageBox.information(self, "Success", f"Logs exported to:\n{path}"))
+        self.log_export_worker.error.connect(
+            lambda err: QMessageBox.warning(self, "Error", f"Could not export logs:\n{err}"))
+        self.log_export_worker.start()
 
     def init_smart_mode(self):
         config = self.config_manager.config
@@ -1000,7 +1150,7 @@ class VideoDownloaderApp(QMainWindow):
 
     def update_smart_ui(self, is_on):
         self.smart_btn.setText(f"✨ Smart: {'On' if is_on else 'Off'}")
-        self.smart_btn.setStyleSheet(f"background-color: {self.colors['accent'] if is_on else self.colors['card']}; color: {'white' if is_on else self.colors['text']};")
+        theme.set_style_property(self.smart_btn, "active", bool(is_on))
 
     def update_thread_limit(self):
         limit = self.config_manager.config.max_concurrent
@@ -1012,10 +1162,58 @@ class VideoDownloaderApp(QMainWindow):
             # Refresh if user changed settings
             self.update_thread_limit()
 
+    def changeEvent(self, event):
+        # Nothing is on screen while minimized, so stop driving animations entirely
+        if event.type() == QEvent.Type.WindowStateChange:
+            if self.isMinimized():
+                AnimationClock.instance().pause()
+            else:
+                AnimationClock.instance().resume()
+        super().changeEvent(event)
+
+    def hideEvent(self, event):
+        AnimationClock.instance().pause()
+        super().hideEvent(event)
+
+    def finish_background_work(self):
+        """Wait for running conversions and staged moves without freezing the window.
+
+        Conversions that have not started are cancelled: their downloads stay
+        as they are and leave the archive, so the next run picks them up again.
+        """
+        done = threading.Event()
+
+        def finish():
+            try:
+                audio_pipeline.shutdown(cancel_queued=True)
+                file_mover.shutdown()
+                dedup.shutdown()
+            finally:
+                done.set()
+
+        threading.Thread(target=finish, name="shutdown").start()
+        if done.wait(0.2):
+            return
+        logger.info("Waiting for audio conversions and staged downloads to finish...")
+        dialog = QProgressDialog("Finishing audio conversions and moving downloads...", None, 0, 0, self)
+        dialog.setWindowTitle("Closing UltraTube")
+        dialog.setWindowModality(Qt.WindowModality.ApplicationModal)
+        dialog.setMinimumDuration(0)
+        dialog.show()
+        loop = QEventLoop()
+        poll = QTimer()
+        poll.timeout.connect(lambda: done.is_set() and loop.quit())
+        poll.start(100)
+        loop.exec()
+        poll.stop()
+        dialog.close()
+
     def closeEvent(self, event):
         """Graceful shutdown for all background processes."""
         logger.info("Shutting down UltraTube Premium...")
         self.sched_timer.stop()
+        if self.metadata_resolver:
+            self.metadata_resolver.stop()
         
         # Stop internal browser if active
         if self.browser_view:
@@ -1038,7 +1236,14 @@ class VideoDownloaderApp(QMainWindow):
                 event.ignore()
                 return
         
+        self.config_manager.flush()
         self.tray_icon.hide()
+        close_session()
+        self.finish_background_work()
+        proxy_pool.set_pool(None)
+        if self.metrics_server:
+            self.metrics_server.stop()
+        log_pipeline.stop()
         event.accept()
 
 if __name__ == "__main__":
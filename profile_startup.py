@@ -1,36 +1,180 @@
 import cProfile
 import pstats
 import io
+import os
 import sys
-from PyQt6.QtCore import QTimer
-from PyQt6.QtWidgets import QApplication
-import main
+import json
+import time
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+METRICS = ("import_time", "first_paint", "interactive")
+
+def stub_network(main):
+    """Keep update checks and HTTP out of the measurement."""
+    main.UpdateWorker.run = lambda self: None
+    main.ImageLoader.run = lambda self: None
 
 def profile_startup():
+    from PyQt6.QtCore import QTimer
+    from PyQt6.QtWidgets import QApplication
+    import main
+
     # Patch main to exit after a few seconds
     app = QApplication.instance() or QApplication(sys.argv)
-    
+
     profiler = cProfile.Profile()
     profiler.enable()
-    
+
     window = main.VideoDownloaderApp()
     window.show()
-    
+
     # Close after 5 seconds
     QTimer.singleShot(5000, lambda: QApplication.quit())
-    
+
     app.exec()
-    
+
     profiler.disable()
-    
+
     s = io.StringIO()
     ps = pstats.Stats(profiler, stream=s).sort_stats('cumulative')
     ps.print_stats(50)
-    
+
     with open("profile_results.txt", "w", encoding="utf-8") as f:
         f.write(s.getvalue())
-    
+
     print("Profiling complete. Results saved to profile_results.txt")
 
+def measure_once():
+    """Child process: time one cold start and print the timings as JSON (seconds)."""
+    t0 = time.perf_counter()
+    from PyQt6.QtCore import QObject, QEvent, QTimer
+    from PyQt6.QtWidgets import QApplication
+    import main
+    timings = {"import_time": time.perf_counter() - t0}
+    stub_network(main)
+
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    class FirstPaint(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Type.Paint and "first_paint" not in timings:
+                timings["first_paint"] = time.perf_counter() - t0
+                # The next pass of the event loop means the window can take input
+                QTimer.singleShot(0, on_interactive)
+            return False
+
+    def on_interactive():
+        timings["interactive"] = time.perf_counter() - t0
+        app.quit()
+
+    window = main.VideoDownloaderApp()
+    paint_filter = FirstPaint()
+    window.installEventFilter(paint_filter)
+    window.show()
+    QTimer.singleShot(30000, app.quit) # Safety net
+    app.exec()
+
+    print(json.dumps(timings))
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+def summarize(runs):
+    """Reduce per-run timings to median/p95 per metric."""
+    summary = {}
+    for metric in METRICS:
+        values = [r[metric] for r in runs if metric in r]
+        if values:
+            summary[metric] = {
+                "median": statistics.median(values),
+                "p95": percentile(values, 95),
+                "samples": len(values),
+            }
+    return summary
+
+def compare(summary, baseline, tolerance=0.2):
+    """Return the metrics whose median regressed by more than `tolerance` vs the baseline.
+
+    A baseline metric that this run didn't measure at all counts as regressed.
+    """
+    regressions = []
+    for metric, base in baseline.items():
+        if not base:
+            continue
+        stats = summary.get(metric)
+        if stats is None or stats["median"] > base["median"] * (1 + tolerance):
+            regressions.append(metric)
+    return regressions
+
+def incomplete_metrics(summary, runs):
+    """Metrics missing from some successful run (e.g. a start that hit the safety net before painting)."""
+    return [metric for metric in METRICS
+            if summary.get(metric, {}).get("samples", 0) < max(1, len(runs))]
+
+def run_benchmark(iterations, output=None, baseline=None, tolerance=0.2):
+    env = dict(os.environ, PYTHONPATH=ROOT, QT_QPA_PLATFORM="offscreen")
+    runs, failed = [], 0
+    for i in range(iterations):
+        # Fresh interpreter and empty working dir: cold imports, default config
+        with tempfile.TemporaryDirectory() as workdir:
+            result = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child"],
+                cwd=workdir, env=env, capture_output=True, text=True, timeout=120
+            )
+        if result.returncode != 0:
+            print(f"Run {i + 1} failed:\n{result.stderr}")
+            failed += 1
+            continue
+        runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+
+    summary = summarize(runs)
+    for metric, stats in summary.items():
+        print(f"{metric:<12} median {stats['median'] * 1000:8.1f} ms   p95 {stats['p95'] * 1000:8.1f} ms")
+
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump({"iterations": iterations, "metrics": summary, "runs": runs}, f, indent=4)
+        print(f"Results saved to {output}")
+
+    # A broken startup must fail the gate, not shrink the sample
+    status = 0
+    if failed:
+        print(f"{failed} of {iterations} runs failed.")
+        status = 1
+    incomplete = incomplete_metrics(summary, runs)
+    if incomplete:
+        print(f"Not measured in every run: {', '.join(incomplete)}")
+        status = 1
+    if baseline:
+        with open(baseline, "r", encoding="utf-8") as f:
+            base = json.load(f).get("metrics", {})
+        regressions = compare(summary, base, tolerance)
+        if regressions:
+            print(f"Regression vs baseline in: {', '.join(regressions)}")
+            return 1
+        print("No regression vs baseline.")
+    return status
+
 if __name__ == "__main__":
-    profile_startup()
+    parser = argparse.ArgumentParser(description="Profile or benchmark UltraTube startup.")
+    parser.add_argument("--bench", action="store_true", help="Run the headless startup benchmark instead of cProfile")
+    parser.add_argument("-n", "--iterations", type=int, default=10)
+    parser.add_argument("--json", dest="output", default="startup_bench.json", help="Where to write the JSON results")
+    parser.add_argument("--baseline", help="Previous JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed median slowdown vs baseline (0.2 = 20%%)")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        measure_once()
+    elif args.bench:
+        sys.exit(run_benchmark(args.iterations, args.output, args.baseline, args.tolerance))
+    else:
+        profile_startup()
@@ -0,0 +1,70 @@
+import time
+import weakref
+from PyQt6.QtCore import QObject, QTimer
+
+class AnimationClock(QObject):
+    """One app-wide ticker that drives every running widget animation.
+
+    Widgets subscribe while they animate and implement ``tick(dt)``. A single
+    QTimer fans out to them, skipping widgets that are hidden or scrolled out
+    of view, and stops entirely when nothing is subscribed or the app is
+    paused (e.g. minimized to the tray).
+    """
+    _instance = None
+
+    def __init__(self, interval=33):
+        super().__init__()
+        self._subscribers = weakref.WeakSet()
+        self._paused = False
+        self._last = None
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self._on_tick)
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def subscribe(self, widget):
+        self._subscribers.add(widget)
+        self._update_timer()
+
+    def unsubscribe(self, widget):
+        self._subscribers.discard(widget)
+        self._update_timer()
+
+    def is_subscribed(self, widget):
+        return widget in self._subscribers
+
+    def pause(self):
+        self._paused = True
+        self._update_timer()
+
+    def resume(self):
+        self._paused = False
+        self._update_timer()
+
+    def _update_timer(self):
+        should_run = bool(self._subscribers) and not self._paused
+        if should_run and not self.timer.isActive():
+            self._last = time.monotonic()
+            self.timer.start()
+        elif not should_run and self.timer.isActive():
+            self.timer.stop()
+
+    def _on_tick(self):
+        now = time.monotonic()
+        dt = now - self._last if self._last is not None else 0.0
+        self._last = now
+
+        for widget in list(self._subscribers):
+            try:
+                if not widget.isVisible() or widget.visibleRegion().isEmpty():
+                    continue
+                widget.tick(dt)
+            except RuntimeError:
+                # Underlying C++ object already deleted
+                self._subscribers.discard(widget)
+        self._update_timer()
@@ -0,0 +1,183 @@
+import logging
+import os
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from src import metrics
+
+logger = logging.getLogger("UltraTube.Audio")
+
+# yt-dlp's default --audio-quality (VBR 5, ~130 kbit/s for mp3)
+AUDIO_QUALITY = "5"
+
+# audio_codec setting -> source codecs kept bit-for-bit (only the container
+# changes), the codec anything else is converted to, and the formats to ask
+# for so that a copy is likely
+AUDIO_POLICIES = {
+    "mp3": {"keep": ("mp3",), "convert": "mp3",
+            "format": "bestaudio[acodec=mp3]/bestaudio/best"},
+    "aac": {"keep": ("aac",), "convert": "m4a",
+            "format": "bestaudio[acodec^=mp4a]/bestaudio/best"},
+    "m4a": {"keep": ("aac",), "convert": "m4a",
+            "format": "bestaudio[acodec^=mp4a]/bestaudio/best"},
+    "opus": {"keep": ("opus",), "convert": "opus",
+             "format": "bestaudio[acodec=opus]/bestaudio/best"},
+    "original": {"keep": ("aac", "opus", "vorbis", "mp3", "flac"), "convert": "m4a",
+                 "format": "bestaudio/best"},
+}
+AUDIO_CODECS = tuple(AUDIO_POLICIES)
+
+def policy(audio_codec) -> dict:
+    try:
+        return AUDIO_POLICIES[audio_codec]
+    except KeyError:
+        raise ValueError(f"Unknown audio codec {audio_codec!r}; expected one of {', '.join(AUDIO_CODECS)}")
+
+def format_for(audio_codec) -> str:
+    """yt-dlp format spec for an audio-only download with this policy."""
+    return policy(audio_codec)["format"]
+
+def normalize_codec(acodec) -> Optional[str]:
+    """yt-dlp/ffprobe codec name ('mp4a.40.2', 'opus', 'none') -> ACODECS key, None if unknown."""
+    if not acodec or acodec == "none":
+        return None
+    acodec = acodec.lower()
+    if acodec in ("mp4a.6b", "mp4a.69") or acodec.startswith("mp3"):
+        return "mp3"
+    if acodec.startswith("mp4a"):
+        return "aac"
+    return acodec.split(".")[0]
+
+def copy_target(codec) -> str:
+    """FFmpegExtractAudioPP codec to remux `codec` into its natural container."""
+    return "m4a" if codec == "aac" else codec
+
+# A conversion left to the transcoder; `archive_id` is the video's download archive line
+Conversion = namedtuple("Conversion", "source future archive_id")
+
+def default_workers() -> int:
+    return max(1, (os.cpu_count() or 2) // 2)
+
+class Transcoder:
+    """Runs audio re-encodes on a bounded pool, off the download slots.
+
+    Encoding is CPU-bound; capping it at about half the cores keeps a batch
+    of audio downloads from starving the GUI and the network threads.
+    """
+    def __init__(self, max_workers=None, quality=AUDIO_QUALITY):
+        self.quality = quality
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or default_workers(),
+                                            thread_name_prefix="transcode")
+        self._lock = threading.Lock()
+        self._pending = 0
+        metrics.PENDING_TRANSCODES.set_function(self.pending)
+
+    def submit(self, info, target):
+        """Convert the file of `info` to `target`; returns a Future of the new path."""
+        with self._lock:
+            self._pending += 1
+        future = self._executor.submit(self._convert, dict(info), target)
+        future.add_done_callback(self._finished)
+        return future
+
+    def pending(self) -> int:
+        with self._lock:
+            return self._pending
+
+    def shutdown(self, wait=True, cancel_queued=False):
+        """Stop the pool; with `cancel_queued`, conversions not yet started are
+        cancelled and their downloaded sources are left in place."""
+        self._executor.shutdown(wait=wait, cancel_futures=cancel_queued)
+
+    def _finished(self, _):
+        with self._lock:
+            self._pending -= 1
+
+    def _convert(self, info, target):
+        from yt_dlp.postprocessor import FFmpegExtractAudioPP
+        source = info["filepath"]
+        try:
+            files_to_delete, info = FFmpegExtractAudioPP(
+                preferredcodec=target, preferredquality=self.quality).run(info)
+            for path in files_to_delete:
+                os.remove(path)
+            logger.info(f"Converted {os.path.basename(source)} to {target}")
+            return info["filepath"]
+        except Exception as e:
+            logger.error(f"Could not convert {source} to {target}: {e}")
+            raise
+
+def make_audio_router(audio_codec, deferred, transcoder=None):
+    """A yt-dlp postprocessor extracting audio the cheapest way `audio_codec` allows.
+
+    Sources already in an accepted codec are stream-copied into an audio
+    container (no re-encode). Others go to the transcoder; a Conversion for
+    each is appended to `deferred`.
+    """
+    from yt_dlp.postprocessor import FFmpegExtractAudioPP
+    from yt_dlp.postprocessor.ffmpeg import ACODECS
+    rules = policy(audio_codec)
+
+    class AudioRouterPP(FFmpegExtractAudioPP):
+        def run(self, info):
+            codec = normalize_codec(info.get("acodec"))
+            if codec is None:
+                codec = normalize_codec(self.get_audio_codec(info["filepath"]))
+            if codec in rules["keep"]:
+                self.mapping = copy_target(codec)
+                if ACODECS.get(self.mapping, ("",))[0] == info.get("ext"):
+                    return [], info # already in its audio container
+                return super().run(info)
+            future = (transcoder or get_transcoder()).submit(info, rules["convert"])
+            make_archive_id = getattr(self._downloader, "_make_archive_id", None)
+            deferred.append(Conversion(info["filepath"], future, make_archive_id and make_archive_id(info)))
+            self.to_screen(f"Queued conversion of {info['filepath']} ({codec}) to {rules['convert']}")
+            return [], info
+
+    return AudioRouterPP()
+
+def when_done(futures, callback):
+    """Call `callback()` once every future is done (right away if there are none)."""
+    if not futures:
+        callback()
+        return
+    lock = threading.Lock()
+    remaining = [len(futures)]
+
+    def done(_):
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            callback()
+
+    for future in futures:
+        future.add_done_callback(done)
+
+_transcoder: Optional[Transcoder] = None
+_transcoder_lock = threading.Lock()
+
+def set_transcoder(transcoder):
+    """Install the transcoder used for audio conversions (e.g. with a configured worker count)."""
+    global _transcoder
+    with _transcoder_lock:
+        _transcoder = transcoder
+
+def get_transcoder() -> Transcoder:
+    global _transcoder
+    if _transcoder is None:
+        with _transcoder_lock:
+            if _transcoder is None:
+                _transcoder = Transcoder()
+    return _transcoder
+
+def shutdown(wait=True, cancel_queued=False):
+    """Finish (or cancel the not yet started) conversions; call before the
+    mover and the deduplicator shut down."""
+    global _transcoder
+    with _transcoder_lock:
+        transcoder, _transcoder = _transcoder, None
+    if transcoder is not None:
+        transcoder.shutdown(wait, cancel_queued)
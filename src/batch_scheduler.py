@@ -0,0 +1,118 @@
+import heapq
+import statistics
+from typing import Optional
+
+from src import metrics
+
+POLICIES = ("sjf", "largest", "fifo")
+
+# Per-download transfer rate assumed before any download has been measured
+DEFAULT_THROUGHPUT = 2 * 1024 * 1024 # bytes/s
+# Bytes per second of video assumed when a batch has no item with a known size
+DEFAULT_BYTERATE = 512 * 1024
+
+def known_size(info) -> Optional[int]:
+    """Bytes of the formats yt-dlp picked, from filesize or filesize_approx; None if unknown."""
+    if not info:
+        return None
+    requested = info.get('requested_formats') or [info]
+    sizes = [f.get('filesize') or f.get('filesize_approx') for f in requested]
+    return sum(sizes) if all(sizes) else None
+
+def format_picker(selection):
+    """Function info -> the info yt-dlp's format selector produces for `selection`
+    (format_policy.for_download() options), or None if nothing matches.
+
+    Only picks among the formats already in `info`; nothing is fetched.
+    """
+    from yt_dlp import YoutubeDL
+    ydl = YoutubeDL({'format': selection['format'], 'format_sort': selection['format_sort'],
+                     'quiet': True, 'no_warnings': True, 'simulate': True})
+
+    def pick(info):
+        try:
+            return ydl.process_ie_result(ydl.sanitize_info(info, remove_private_keys=True), download=False)
+        except Exception:
+            return None
+    return pick
+
+def measured_throughput() -> Optional[float]:
+    """Average per-download transfer rate of this session's finished jobs."""
+    seconds = metrics.PHASE_SECONDS.sum(phase="transfer")
+    downloaded = metrics.DOWNLOADED_BYTES.value()
+    return downloaded / seconds if seconds > 0 and downloaded > 0 else None
+
+def estimate_sizes(items, selection=None):
+    """Sizes for (info, duration) pairs, and how many of them had to be guessed.
+
+    With `selection`, sizes are those of the formats the download will
+    request rather than the ones picked when the info was extracted.
+    Unknown sizes are guessed from the duration at the batch's median
+    bytes per second of video, or failing that, as the median known size.
+    """
+    if selection and any(info and info.get('formats') for info, _ in items):
+        pick = format_picker(selection)
+        infos = [pick(info) if info and info.get('formats') else info for info, _ in items]
+    else:
+        infos = [info for info, _ in items]
+    sizes = [known_size(info) for info in infos]
+    rates = [size / duration for size, (_, duration) in zip(sizes, items) if size and duration]
+    byterate = statistics.median(rates) if rates else DEFAULT_BYTERATE
+    known = [size for size in sizes if size]
+    fallback = int(statistics.median(known)) if known else None
+
+    guessed = 0
+    for i, (size, (_, duration)) in enumerate(zip(sizes, items)):
+        if size:
+            continue
+        sizes[i] = int(duration * byterate) if duration else fallback
+        guessed += sizes[i] is not None
+    return sizes, guessed
+
+def order(sizes, policy="sjf") -> list:
+    """Indices of the items in the order they should start.
+
+    "sjf" runs the smallest first (the first files finish soonest), "largest"
+    the biggest first (an overnight window ends with short jobs, not one long
+    one still running), "fifo" keeps the list order. Sizes of None go last;
+    ties keep list order.
+    """
+    indices = list(range(len(sizes)))
+    if policy == "fifo":
+        return indices
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown batch order {policy!r}; expected one of {', '.join(POLICIES)}")
+    sign = -1 if policy == "largest" else 1
+    return sorted(indices, key=lambda i: (sizes[i] is None, sign * (sizes[i] or 0), i))
+
+def estimate(sizes, workers, throughput=None) -> dict:
+    """Total bytes and expected finish times of a batch run in the given order on `workers` slots."""
+    throughput = throughput or measured_throughput() or DEFAULT_THROUGHPUT
+    slots = [0.0] * max(1, workers)
+    finishes = []
+    for size in sizes:
+        start = heapq.heappop(slots)
+        finish = start + (size or 0) / throughput
+        finishes.append(finish)
+        heapq.heappush(slots, finish)
+    return {
+        "items": len(sizes),
+        "total_bytes": sum(size or 0 for size in sizes),
+        "unknown": sum(1 for size in sizes if size is None),
+        "first_completion": min(finishes) if finishes else 0.0,
+        "completion": max(finishes) if finishes else 0.0,
+        "throughput": throughput,
+    }
+
+def plan(items, policy="sjf", workers=3, throughput=None, selection=None):
+    """Order a batch of (info, duration) pairs and estimate it up front.
+
+    `selection` is the batch's format_policy.for_download() options.
+    Returns (start order as indices into `items`, estimate dict with
+    `guessed` items whose size came from their duration or the median).
+    """
+    sizes, guessed = estimate_sizes(items, selection)
+    indices = order(sizes, policy)
+    summary = estimate([sizes[i] for i in indices], workers, throughput)
+    summary["guessed"] = guessed
+    return indices, summary
@@ -0,0 +1,251 @@
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import threading
+
+import downloader
+from src.config_manager import ConfigManager
+from src.job_queue import JobQueue
+from src.control_api import ControlServer
+from src import metrics
+from src import tracing
+from src import file_mover
+from src import dedup
+from src import proxy_pool
+from src import audio_pipeline
+from src import format_policy
+from src.state_store import StateStore, STATE_DB_FILE
+
+# Minimum seconds between progress lines for the same URL
+PROGRESS_INTERVAL = 1.0
+
+def iter_urls(sources, stdin=None):
+    """Yield URLs from positional args and batch files ('-' = stdin), lazily and deduplicated.
+
+    Blank lines and lines starting with '#' or ';' are skipped, as in yt-dlp batch files.
+    """
+    seen = set()
+    for source in sources:
+        if isinstance(source, str):
+            lines = [source]
+        elif source is None:
+            lines = stdin or sys.stdin
+        else:
+            lines = source
+        for line in lines:
+            url = line.strip()
+            if not url or url.startswith(('#', ';')) or url in seen:
+                continue
+            seen.add(url)
+            yield url
+
+class JsonLinesReporter:
+    """Writes progress and results as one JSON object per line; safe to call from worker threads."""
+    def __init__(self, stream=None, interval=PROGRESS_INTERVAL):
+        self.stream = stream or sys.stdout
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._last_progress = {}
+        self.results = []
+
+    def emit(self, event, **fields):
+        line = json.dumps(dict(event=event, ts=round(time.time(), 3), **fields), ensure_ascii=False, default=str)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+    def progress(self, prog):
+        if prog.status != 'downloading':
+            return
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_progress.get(prog.url, 0) < self.interval:
+                return
+            self._last_progress[prog.url] = now
+        self.emit("progress", url=prog.url, title=prog.title, percent=prog.percentage, speed=prog.speed, eta=prog.eta)
+
+    def result(self, job):
+        with self._lock:
+            self.results.append(job)
+            self._last_progress.pop(job.get('url'), None)
+        self.emit("result", **job)
+
+    def summary(self):
+        finished = sum(1 for r in self.results if r.get('status') == 'finished')
+        self.emit("summary", total=len(self.results), finished=finished, failed=len(self.results) - finished)
+        return finished == len(self.results)
+
+def build_parser(config, state_db=None):
+    parser = argparse.ArgumentParser(
+        prog="downloader.py",
+        description="Download URLs without the GUI, reporting progress as JSON lines on stdout.")
+    parser.add_argument("urls", nargs="*", help="URLs to download")
+    parser.add_argument("-a", "--batch-file", action="append", default=[], metavar="FILE",
+                        help="File with one URL per line ('-' for stdin); may be repeated")
+    parser.add_argument("-f", "--format", dest="format_id", help="Quality (e.g. 1080p, 4K) or yt-dlp format spec")
+    parser.add_argument("-j", "--concurrency", type=int, default=config.max_concurrent,
+                        help=f"Simultaneous downloads (default: {config.max_concurrent})")
+    parser.add_argument("-o", "--output-dir", default=config.download_folder,
+                        help=f"Download folder (default: {config.download_folder})")
+    parser.add_argument("--archive", default=config.archive_file,
+                        help=f"Download archive file (default: {config.archive_file})")
+    parser.add_argument("--proxy", default=config.proxy)
+    parser.add_argument("--proxy-pool", dest="proxies", action="append", default=None, metavar="PROXY",
+                        help="Spread jobs over these proxies (repeatable; used when --proxy isn't set)")
+    parser.add_argument("--cookies", default=config.cookies_file, help="cookies.txt file")
+    browser = config.browser_cookies if config.browser_cookies != "None" else None
+    parser.add_argument("--cookies-from-browser", default=browser, metavar="BROWSER")
+    parser.add_argument("--staging-dir", default=config.staging_dir, metavar="DIR",
+                        help="Download and postprocess in this local folder, then move files to the output dir")
+    parser.add_argument("--dedup", choices=dedup.MODES, default=config.dedup_mode,
+                        help="Link downloads identical to files already downloaded "
+                             f"(default: {config.dedup_mode}; needs a state database)")
+    parser.add_argument("--state-db", default=state_db, metavar="FILE",
+                        help="Download history used by --dedup (default: the GUI's database next to the "
+                             f"config file, if there is one{f': {state_db}' if state_db else ''})")
+    parser.add_argument("--video-codec", choices=format_policy.VIDEO_CODECS, default=config.video_codec,
+                        help=f"Preferred video codec; its container is used when merging (default: {config.video_codec})")
+    parser.add_argument("-x", "--extract-audio", action="store_true",
+                        help="Keep only the audio, stream-copied when its codec is acceptable")
+    parser.add_argument("--audio-codec", choices=audio_pipeline.AUDIO_CODECS, default=config.audio_codec,
+                        help=f"Audio codec for --extract-audio; 'original' never re-encodes (default: {config.audio_codec})")
+    parser.add_argument("--subs", dest="sub_lang", help="Subtitle language code or 'all'")
+    parser.add_argument("--thumbnail", action="store_true", help="Save the thumbnail as jpg")
+    parser.add_argument("--trace-file", default=config.trace_file,
+                        help=f"Append per-phase timing spans (OTLP JSON) to this file (default: {config.trace_file})")
+    parser.add_argument("--config", default="config.json", help="Config file providing the defaults")
+    parser.add_argument("--serve", nargs="?", const=f"{config.api_host}:{config.api_port}", metavar="ADDR",
+                        help="Keep running and accept jobs over the local control API "
+                             f"(host:port or unix:/path, default {config.api_host}:{config.api_port})")
+    return parser
+
+def parse_address(addr):
+    """'host:port', ':port' or 'unix:/path' -> ControlServer keyword arguments."""
+    if addr.startswith("unix:"):
+        return {"unix_path": addr[len("unix:"):]}
+    host, _, port = addr.rpartition(":")
+    return {"host": host or "127.0.0.1", "port": int(port)}
+
+def serve(args, settings, sources, stdout=None, stdin=None):
+    """Daemon mode: run a JobQueue behind the control API until interrupted."""
+    queue = JobQueue(max_workers=max(1, args.concurrency), **settings)
+    queue.start()
+    server = ControlServer(queue, **parse_address(args.serve))
+    metrics.add_routes(server)
+    server.start()
+    JsonLinesReporter(stdout).emit("listening", address=server.address)
+    try:
+        for url in iter_urls(sources, stdin):
+            queue.submit(url, format_id=args.format_id)
+        server.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        queue.stop(timeout=5)
+    return 0
+
+def finish_background_work(store=None):
+    """Wait for audio conversions, staged files to reach the output dir, then deduplication."""
+    audio_pipeline.shutdown()
+    file_mover.shutdown()
+    dedup.shutdown()
+    proxy_pool.set_pool(None)
+    if store is not None:
+        store.close()
+
+def default_state_db(config_file):
+    """The GUI keeps its database next to config.json; use it only when that setup exists,
+    so a bare CLI run doesn't leave a database in the working directory."""
+    if not os.path.exists(config_file):
+        return None
+    return os.path.join(os.path.dirname(os.path.abspath(config_file)), STATE_DB_FILE)
+
+def main(argv=None, stdout=None, stdin=None):
+    argv = sys.argv[1:] if argv is None else argv
+    # Defaults come from the same config.json the GUI uses
+    pre = argparse.ArgumentParser(add_help=False)
+    pre.add_argument("--config", default="config.json")
+    config_file = pre.parse_known_args(argv)[0].config
+    config = ConfigManager(config_file).config
+    args = build_parser(config, default_state_db(config_file)).parse_args(argv)
+
+    # Keep stdout machine-readable; diagnostics go to stderr
+    logging.basicConfig(level=logging.WARNING, stream=sys.stderr,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    tracing.set_exporter(tracing.JsonFileExporter(args.trace_file) if args.trace_file else None)
+
+    settings = dict(
+        download_dir=args.output_dir,
+        archive_file=args.archive,
+        sub_lang=args.sub_lang,
+        write_thumbnail=args.thumbnail,
+        cookie_file=args.cookies,
+        browser=args.cookies_from_browser,
+        proxy=args.proxy,
+        internal_browser=config.use_internal_browser,
+        allow_unplayable=config.experimental_drm,
+        cdm_path=config.cdm_path,
+        staging_dir=args.staging_dir,
+        audio_codec=args.audio_codec if args.extract_audio else None,
+        video_codec=args.video_codec,
+    )
+    if args.extract_audio:
+        audio_pipeline.set_transcoder(audio_pipeline.Transcoder(config.transcode_workers or None))
+    if args.staging_dir:
+        file_mover.set_mover(file_mover.FileMover(config.move_workers))
+    proxies = args.proxies if args.proxies is not None else config.proxies
+    if proxies and not args.proxy:
+        pool = proxy_pool.ProxyPool(proxies)
+        pool.start()
+        proxy_pool.set_pool(pool)
+    store = None
+    if args.dedup != "off" and args.state_db:
+        store = StateStore(args.state_db)
+        dedup.set_deduplicator(dedup.Deduplicator(store, args.dedup))
+
+    sources = list(args.urls)
+    batch_files = []
+    for path in args.batch_file:
+        if path == '-':
+            sources.append(None)
+        else:
+            f = open(path, 'r', encoding='utf-8')
+            batch_files.append(f)
+            sources.append(f)
+    if args.serve:
+        try:
+            return serve(args, settings, sources, stdout, stdin)
+        finally:
+            finish_background_work(store)
+            for f in batch_files:
+                f.close()
+
+    if not sources:
+        if (stdin or sys.stdin).isatty():
+            build_parser(config, args.state_db).print_usage(sys.stderr)
+            return 2
+        sources.append(None)
+
+    reporter = JsonLinesReporter(stdout)
+    try:
+        downloader.run_multi_download(
+            iter_urls(sources, stdin),
+            max_workers=max(1, args.concurrency),
+            progress_callback=reporter.progress,
+            result_callback=reporter.result,
+            format_id=args.format_id,
+            **settings
+        )
+    finally:
+        finish_background_work(store)
+        for f in batch_files:
+            f.close()
+    return 0 if reporter.summary() else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
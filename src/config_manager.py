@@ -1,6 +1,9 @@
 import json
 import os
-from dataclasses import dataclass, asdict, field
+import stat
+import tempfile
+import threading
+from dataclasses import dataclass, asdict, fields, field
 from typing import Optional
 
 @dataclass
@@ -8,12 +11,14 @@ class AppConfig:
     download_folder: str = "downloads"
     preferred_quality: str = "best"
     proxy: Optional[str] = None
+    proxies: list = field(default_factory=list) # pool used when `proxy` is empty
     dark_mode: bool = True
     auto_update_ytdlp: bool = True
     ffmpeg_path: Optional[str] = None
     max_concurrent: int = 3
+    batch_order: str = "sjf" # "sjf" (smallest first), "largest" (first) or "fifo" (list order)
     video_codec: str = "h264"
-    audio_codec: str = "mp3"
+    audio_codec: str = "mp3" # audio-only target; "original" keeps the source codec
     socket_timeout: int = 30
     cookies_file: Optional[str] = None
     archive_file: str = "archive.txt"
@@ -22,16 +27,33 @@ class AppConfig:
     smart_mode: bool = False
     last_format: str = "Best (Auto)"
     last_quality: str = "Maximum Quality"
-    subscriptions: list = field(default_factory=list)
     experimental_drm: bool = False
     cdm_path: Optional[str] = None
     scheduler_enabled: bool = False
     scheduler_start: str = "02:00"
     scheduler_end: str = "06:00"
+    api_host: str = "127.0.0.1"
+    api_port: int = 8765
+    metrics_port: int = 0 # 0 = no metrics endpoint in the GUI
+    trace_file: Optional[str] = "traces.jsonl"
+    resolve_playlist_metadata: bool = True # fetch formats/durations for flat playlist entries
+    metadata_workers: int = 4
+    staging_dir: Optional[str] = None # local scratch folder; None = download straight into download_folder
+    move_workers: int = 2 # parallel copies from staging_dir to download_folder
+    transcode_workers: int = 0 # parallel audio re-encodes; 0 = half the CPU cores
+    dedup_mode: str = "reflink" # "off", "reflink" (copy-on-write clones only) or "hardlink" (reflink, else hardlink)
 
 class ConfigManager:
-    def __init__(self, config_file: str = "config.json"):
+    def __init__(self, config_file: str = "config.json", save_delay: float = 0.0):
+        """`save_delay` > 0 enables write-behind: changes made within that many
+        seconds are coalesced into a single write. Call flush() before exit."""
         self.config_file = config_file
+        self.save_delay = save_delay
+        self._lock = threading.RLock()
+        self._timer: Optional[threading.Timer] = None
+        self._dirty = False
+        # Subscriptions found in an old config.json, to be moved into the StateStore
+        self.legacy_subscriptions: list = []
         self.config = self.load()
 
     def load(self) -> AppConfig:
@@ -40,29 +62,82 @@ class ConfigManager:
             try:
                 with open(self.config_file, 'r', encoding='utf-8') as f:
                     data = json.load(f)
-                    return AppConfig(**data)
+                self.legacy_subscriptions = data.pop('subscriptions', None) or []
+                known = {fld.name for fld in fields(AppConfig)}
+                return AppConfig(**{k: v for k, v in data.items() if k in known})
             except (json.JSONDecodeError, TypeError, KeyError) as e:
                 print(f"Error loading config: {e}. Using defaults.")
         
         return AppConfig()
 
     def save(self, config: Optional[AppConfig] = None) -> None:
-        """Save the current config to a JSON file."""
-        if config:
-            self.config = config
-            
+        """Save the current config to a JSON file right away."""
+        with self._lock:
+            if config:
+                self.config = config
+            self._cancel_timer()
+            self._dirty = False
+            try:
+                self._write_atomic(asdict(self.config))
+            except Exception as e:
+                print(f"Error saving config: {e}")
+
+    def _write_atomic(self, data: dict) -> None:
+        """Write to a temp file in the same folder, then rename it over the config.
+
+        A crash mid-write leaves the previous config intact instead of a truncated file.
+        """
+        directory = os.path.dirname(os.path.abspath(self.config_file))
+        fd, tmp_path = tempfile.mkstemp(prefix=".config-", suffix=".tmp", dir=directory)
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(asdict(self.config), f, indent=4)
-        except Exception as e:
-            print(f"Error saving config: {e}")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            # mkstemp creates the file 0600; keep the permissions the config already had
+            try:
+                os.chmod(tmp_path, stat.S_IMODE(os.stat(self.config_file).st_mode))
+            except FileNotFoundError:
+                pass
+            os.replace(tmp_path, self.config_file)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def schedule_save(self) -> None:
+        """Mark the config dirty; it is written once the save window elapses."""
+        if self.save_delay <= 0:
+            self.save()
+            return
+
+        with self._lock:
+            self._dirty = True
+            if self._timer is None:
+                self._timer = threading.Timer(self.save_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> None:
+        """Write any pending changes now (called on shutdown)."""
+        with self._lock:
+            if self._dirty:
+                self.save()
+            else:
+                self._cancel_timer()
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
 
     def update(self, **kwargs) -> None:
-        """Update specific settings and save immediately."""
-        for key, value in kwargs.items():
-            if hasattr(self.config, key):
-                setattr(self.config, key, value)
-        self.save()
+        """Update specific settings and schedule a save."""
+        with self._lock:
+            for key, value in kwargs.items():
+                if hasattr(self.config, key):
+                    setattr(self.config, key, value)
+            self.schedule_save()
 
 # Example usage (can be removed or kept for testing)
 if __name__ == "__main__":
@@ -0,0 +1,232 @@
+import asyncio
+import json
+import logging
+import threading
+from urllib.parse import urlsplit, parse_qs
+
+logger = logging.getLogger("UltraTube.API")
+
+MAX_BODY = 1024 * 1024
+READ_TIMEOUT = 10.0
+
+REASONS = {
+    200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error",
+}
+
+class ControlServer:
+    """Local JSON-over-HTTP API for a JobQueue, served by one asyncio thread.
+
+    GET    /jobs[?status=...]  list jobs with live progress
+    POST   /jobs               {"url" or "urls", "priority"?, "format"?}
+    GET    /jobs/<id>
+    PATCH  /jobs/<id>          {"priority": n}
+    DELETE /jobs/<id>          cancel
+    GET    /stats              queue counts and throughput
+
+    Binds to localhost by default; pass `unix_path` to listen on a Unix socket instead.
+    Further endpoints can be added with add_route(); with queue=None only those are served.
+    """
+    def __init__(self, queue, host="127.0.0.1", port=8765, unix_path=None):
+        self.queue = queue
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self.loop = None
+        self._server = None
+        self._thread = None
+        self._routes = [] # (method, path segments, handler)
+
+        if queue is not None:
+            self.add_route("GET", "/jobs", self._list_jobs)
+            self.add_route("POST", "/jobs", self._create_jobs)
+            self.add_route("GET", "/jobs/{id}", self._get_job)
+            self.add_route("PATCH", "/jobs/{id}", self._update_job)
+            self.add_route("DELETE", "/jobs/{id}", self._cancel_job)
+            self.add_route("GET", "/stats", lambda request: (200, self.queue.stats()))
+
+    def add_route(self, method, path, handler):
+        """`handler(request)` returns (status, payload); dicts/lists are sent as JSON, str as text.
+
+        A payload of (str, content_type) sets the content type explicitly.
+        """
+        self._routes.append((method, path.strip("/").split("/"), handler))
+
+    # --- Lifecycle ---
+    async def _start_server(self):
+        if self.unix_path:
+            self._server = await asyncio.start_unix_server(self._handle, path=self.unix_path)
+        else:
+            self._server = await asyncio.start_server(self._handle, self.host, self.port)
+            self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Control API listening on {self.address}")
+
+    @property
+    def address(self):
+        return f"unix:{self.unix_path}" if self.unix_path else f"http://{self.host}:{self.port}"
+
+    def start(self):
+        """Serve from a background thread; returns once the socket is bound."""
+        ready = threading.Event()
+        failure = []
+
+        def run():
+            self.loop = asyncio.new_event_loop()
+            try:
+                self.loop.run_until_complete(self._start_server())
+            except Exception as e:
+                failure.append(e)
+                ready.set()
+                self.loop.close()
+                return
+            ready.set()
+            self.loop.run_forever()
+            self._server.close()
+            self.loop.run_until_complete(self._server.wait_closed())
+            self.loop.close()
+
+        self._thread = threading.Thread(target=run, name="control-api", daemon=True)
+        self._thread.start()
+        ready.wait()
+        if failure:
+            raise failure[0]
+
+    def wait(self):
+        """Block until the server thread exits (Ctrl+C still works)."""
+        while self._thread and self._thread.is_alive():
+            self._thread.join(1)
+
+    def stop(self):
+        if self.loop and self._thread and self._thread.is_alive():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(5)
+
+    # --- HTTP ---
+    async def _read_request(self, reader):
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        method, target, _ = request_line.split(" ", 2)
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length") or 0)
+        if length > MAX_BODY:
+            return method, target, None
+        body = await reader.readexactly(length) if length else b""
+        return method, target, body
+
+    async def _handle(self, reader, writer):
+        try:
+            method, target, body = await asyncio.wait_for(self._read_request(reader), READ_TIMEOUT)
+            if body is None:
+                status, payload = 413, {"error": "request body too large"}
+            else:
+                status, payload = self.dispatch(method, target, body)
+        except (ValueError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+            status, payload = 400, {"error": "malformed request"}
+        except ConnectionError:
+            writer.close()
+            return
+
+        content_type = "application/json"
+        if isinstance(payload, tuple):
+            payload, content_type = payload
+        elif isinstance(payload, str):
+            content_type = "text/plain; charset=utf-8"
+        data = (payload if isinstance(payload, str) else json.dumps(payload, default=str)).encode("utf-8")
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(data)}\r\n"
+                "Connection: close\r\n\r\n")
+        try:
+            writer.write(head.encode("latin-1") + data)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def dispatch(self, method, target, body=b""):
+        """Route a request to its handler; returns (status, payload)."""
+        parts = urlsplit(target)
+        segments = parts.path.strip("/").split("/")
+        request = {"method": method, "query": parse_qs(parts.query), "body": body, "params": {}}
+
+        allowed = False
+        for route_method, pattern, handler in self._routes:
+            params = _match(pattern, segments)
+            if params is None:
+                continue
+            if route_method != method:
+                allowed = True
+                continue
+            request["params"] = params
+            try:
+                return handler(request)
+            except (ValueError, TypeError) as e:
+                return 400, {"error": str(e)}
+            except Exception as e:
+                logger.error(f"Control API error on {method} {target}: {e}")
+                return 500, {"error": "internal error"}
+        if allowed:
+            return 405, {"error": f"{method} not allowed"}
+        return 404, {"error": "not found"}
+
+    # --- Handlers ---
+    def _list_jobs(self, request):
+        status = request["query"].get("status", [None])[0]
+        return 200, {"jobs": self.queue.jobs(status)}
+
+    def _create_jobs(self, request):
+        data = _json_body(request)
+        urls = data.get("urls") or ([data["url"]] if data.get("url") else [])
+        if not urls or not all(isinstance(u, str) and u for u in urls):
+            raise ValueError("expected 'url' or a list of 'urls'")
+        jobs = [self.queue.submit(u, data.get("priority", 0), data.get("format")) for u in urls]
+        return 201, {"jobs": [j.to_dict() for j in jobs]}
+
+    def _get_job(self, request):
+        job = self.queue.get(request["params"]["id"])
+        return (200, job) if job else (404, {"error": "unknown job"})
+
+    def _update_job(self, request):
+        job_id = request["params"]["id"]
+        data = _json_body(request)
+        if "priority" not in data:
+            raise ValueError("expected 'priority'")
+        if self.queue.get(job_id) is None:
+            return 404, {"error": "unknown job"}
+        if not self.queue.reprioritize(job_id, data["priority"]):
+            return 409, {"error": "job already started"}
+        return 200, self.queue.get(job_id)
+
+    def _cancel_job(self, request):
+        job_id = request["params"]["id"]
+        if self.queue.get(job_id) is None:
+            return 404, {"error": "unknown job"}
+        if not self.queue.cancel(job_id):
+            return 409, {"error": "job already finished"}
+        return 200, self.queue.get(job_id)
+
+def _match(pattern, segments):
+    if len(pattern) != len(segments):
+        return None
+    params = {}
+    for expected, actual in zip(pattern, segments):
+        if expected.startswith("{") and expected.endswith("}"):
+            params[expected[1:-1]] = actual
+        elif expected != actual:
+            return None
+    return params
+
+def _json_body(request):
+    try:
+        data = json.loads(request["body"] or b"{}")
+    except json.JSONDecodeError as e:
+        raise ValueError(f"invalid JSON: {e}")
+    if not isinstance(data, dict):
+        raise ValueError("expected a JSON object")
+    return data
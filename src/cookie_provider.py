@@ -0,0 +1,122 @@
+import os
+import time
+import logging
+import threading
+from typing import Optional
+from urllib.parse import urlparse
+
+logger = logging.getLogger("UltraTube.Cookies")
+
+# Sites whose login spans several cookie domains
+DOMAIN_GROUPS = {
+    "youtube.com": ("youtube.com", "youtu.be", "google.com", "googlevideo.com"),
+    "youtu.be": ("youtube.com", "youtu.be", "google.com", "googlevideo.com"),
+}
+
+# Browser databases have no single file we can cheaply watch, so re-read them on a timer
+BROWSER_REFRESH_SECONDS = 600
+
+def internal_browser_dir():
+    """Storage folder of the embedded browser (see EmbeddedBrowser)."""
+    return os.path.abspath(os.path.join(os.getcwd(), "browser_data"))
+
+def base_domain(url):
+    host = (urlparse(url).hostname or "").lower()
+    parts = host.split(".")
+    return ".".join(parts[-2:]) if len(parts) >= 2 else host
+
+def _domain_matches(cookie_domain, domains):
+    cookie_domain = cookie_domain.lstrip(".").lower()
+    return any(cookie_domain == d or cookie_domain.endswith("." + d) for d in domains)
+
+class CookieProvider:
+    """Loads (and decrypts) each cookie source once and hands out shared jars.
+
+    Jars are filtered down to the domains relevant to the URL being processed
+    and reloaded when the source file's mtime changes (or after a timeout for
+    browser profiles), instead of yt-dlp re-parsing the source on every call.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sources = {}   # source key -> (stamp, full jar)
+        self._filtered = {}  # (source key, stamp, domain) -> filtered jar
+
+    def get_jar(self, url, cookie_file=None, browser=None, internal_browser=False):
+        """Return a shared YoutubeDLCookieJar for `url`, or None if there is no cookie source."""
+        if internal_browser:
+            path = internal_browser_dir()
+            if not os.path.exists(os.path.join(path, "Cookies")):
+                return None
+            key = ("internal", path)
+        elif cookie_file:
+            key = ("file", os.path.abspath(cookie_file))
+        elif browser:
+            key = ("browser", browser)
+        else:
+            return None
+
+        with self._lock:
+            stamp, jar = self._load(key)
+            domain = base_domain(url)
+            cache_key = (key, stamp, domain)
+            if cache_key not in self._filtered:
+                self._filtered[cache_key] = self._filter(jar, DOMAIN_GROUPS.get(domain, (domain,)))
+            return self._filtered[cache_key]
+
+    def invalidate(self):
+        with self._lock:
+            self._sources.clear()
+            self._filtered.clear()
+
+    def _stamp(self, key):
+        kind, target = key
+        if kind == "file":
+            return os.path.getmtime(target)
+        if kind == "internal":
+            return os.path.getmtime(os.path.join(target, "Cookies"))
+        return int(time.time() // BROWSER_REFRESH_SECONDS)
+
+    def _load(self, key):
+        stamp = self._stamp(key)
+        cached = self._sources.get(key)
+        if cached and cached[0] == stamp:
+            return cached
+
+        kind, target = key
+        started = time.monotonic()
+        from yt_dlp.cookies import YoutubeDLCookieJar, extract_cookies_from_browser
+        if kind == "file":
+            jar = YoutubeDLCookieJar(target)
+            jar.load()
+        elif kind == "internal":
+            # QtWebEngine keeps a Chromium cookie database in its storage folder
+            jar = extract_cookies_from_browser("chromium", profile=target)
+        else:
+            jar = extract_cookies_from_browser(target)
+        logger.info(f"Loaded {len(jar)} cookies from {kind} source in {time.monotonic() - started:.2f}s")
+
+        # Drop filtered views of the stale jar
+        self._filtered = {k: v for k, v in self._filtered.items() if k[0] != key}
+        self._sources[key] = (stamp, jar)
+        return self._sources[key]
+
+    @staticmethod
+    def _filter(jar, domains):
+        from yt_dlp.cookies import YoutubeDLCookieJar
+        filtered = YoutubeDLCookieJar()
+        for cookie in jar:
+            if _domain_matches(cookie.domain, domains):
+                filtered.set_cookie(cookie)
+        return filtered
+
+_provider: Optional[CookieProvider] = None
+_provider_lock = threading.Lock()
+
+def get_provider() -> CookieProvider:
+    """Process-wide provider shared by every download and metadata job."""
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                _provider = CookieProvider()
+    return _provider
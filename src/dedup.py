@@ -0,0 +1,166 @@
+import hashlib
+import logging
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from src import metrics
+
+logger = logging.getLogger("UltraTube.Dedup")
+
+DEDUP_WORKERS = 2
+SAMPLE_BLOCK = 64 * 1024
+HASH_CHUNK = 4 * 1024 * 1024
+# Subtitles, thumbnails and the like aren't worth a lookup
+MIN_SIZE = 1024 * 1024
+
+MODES = ("off", "reflink", "hardlink")
+# Fixed set of locks serializing files whose samples hash to the same stripe
+LOCK_STRIPES = 64
+
+# ioctl(dest_fd, FICLONE, src_fd): copy-on-write clone on btrfs, XFS, bcachefs...
+FICLONE = 0x40049409
+
+def sampled_hash(path, size=None) -> str:
+    """Cheap fingerprint: the size plus the first, middle and last blocks of the file."""
+    size = os.path.getsize(path) if size is None else size
+    digest = hashlib.blake2b(str(size).encode(), digest_size=16)
+    with open(path, "rb") as f:
+        if size <= 3 * SAMPLE_BLOCK:
+            digest.update(f.read())
+        else:
+            for offset in (0, size // 2 - SAMPLE_BLOCK // 2, size - SAMPLE_BLOCK):
+                f.seek(offset)
+                digest.update(f.read(SAMPLE_BLOCK))
+    return f"{size}:{digest.hexdigest()}"
+
+def full_hash(path) -> str:
+    digest = hashlib.blake2b()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _reflink(src, dest) -> bool:
+    if not sys.platform.startswith("linux"):
+        return False
+    import fcntl
+    try:
+        with open(src, "rb") as fin, open(dest, "wb") as fout:
+            fcntl.ioctl(fout.fileno(), FICLONE, fin.fileno())
+        return True
+    except OSError:
+        try:
+            os.remove(dest)
+        except OSError:
+            pass
+        return False
+
+def replace_with_link(original, duplicate, mode="hardlink") -> Optional[str]:
+    """Replace `duplicate` by a reflink (or, in hardlink mode, a hardlink) to `original`.
+
+    Returns how it was linked, or None if the filesystem allows neither.
+    """
+    tmp = duplicate + ".dedup"
+    if _reflink(original, tmp):
+        method = "reflink"
+    elif mode == "hardlink":
+        try:
+            os.link(original, tmp)
+        except OSError:
+            return None
+        method = "hardlink"
+    else:
+        return None
+    os.replace(tmp, duplicate)
+    return method
+
+class Deduplicator:
+    """Replaces downloaded files identical to ones already in the library with links.
+
+    Files are looked up by sampled_hash() in the StateStore index; a full
+    hash is only computed (and cached in the index) when samples collide.
+    """
+    def __init__(self, store, mode="reflink", max_workers=DEDUP_WORKERS):
+        self.store = store
+        self.mode = mode
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="dedup")
+        self._sample_locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+
+    def submit(self, paths):
+        """Index and deduplicate finished files in the background; returns their futures."""
+        return [self._executor.submit(self.process, path) for path in paths if path]
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def process(self, path) -> Optional[str]:
+        """Index `path`; returns the library file it now links to, if it was a duplicate."""
+        path = os.path.abspath(path)
+        try:
+            st = os.stat(path)
+            if st.st_size < MIN_SIZE:
+                return None
+            sample = sampled_hash(path, st.st_size)
+            # Two copies of one video finishing together must not miss each other
+            with self._sample_locks[hash(sample) % LOCK_STRIPES]:
+                return self._process(path, st, sample)
+        except OSError as e:
+            logger.warning(f"Could not deduplicate {path}: {e}")
+            return None
+
+    def _process(self, path, st, sample):
+        digest = None
+        original = None
+        for entry in self.store.files_with_sample(sample):
+            other = entry["path"]
+            if other == path:
+                continue
+            try:
+                other_st = os.stat(other)
+            except OSError:
+                self.store.forget_file(other)
+                continue
+            if other_st.st_size != entry["size"] or other_st.st_mtime != entry["mtime"]:
+                self.store.forget_file(other) # changed since it was indexed
+                continue
+            if (other_st.st_dev, other_st.st_ino) == (st.st_dev, st.st_ino):
+                return other # already linked
+            digest = digest or full_hash(path)
+            other_digest = entry["full_hash"]
+            if not other_digest:
+                other_digest = full_hash(other)
+                self.store.set_full_hash(other, other_digest)
+            if other_digest == digest:
+                original = other
+                break
+
+        if original:
+            method = replace_with_link(original, path, self.mode)
+            if method:
+                metrics.DEDUP_SAVED_BYTES.inc(st.st_size)
+                logger.info(f"{path} duplicates {original}; replaced with a {method}")
+                st = os.stat(path)
+            else:
+                logger.info(f"{path} duplicates {original}, but the filesystem can't link them")
+                original = None
+        self.store.record_file_hash(path, st.st_size, st.st_mtime, sample, digest)
+        return original
+
+_deduplicator: Optional[Deduplicator] = None
+
+def set_deduplicator(deduplicator):
+    """Install the deduplicator finished downloads are handed to (None disables it)."""
+    global _deduplicator
+    _deduplicator = deduplicator
+
+def get_deduplicator() -> Optional[Deduplicator]:
+    return _deduplicator
+
+def shutdown(wait=True):
+    global _deduplicator
+    deduplicator, _deduplicator = _deduplicator, None
+    if deduplicator is not None:
+        deduplicator.shutdown(wait)
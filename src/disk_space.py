@@ -0,0 +1,202 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import shutil
+import sys
+import threading
+from typing import Optional
+
+from src.batch_scheduler import known_size
+
+logger = logging.getLogger("UltraTube.DiskSpace")
+
+# Left free on top of the estimate (logs, config, the OS)
+RESERVE_BYTES = 256 * 1024 * 1024
+# Separate video and audio streams sit on disk next to the merged file until the merge ends
+MERGE_FACTOR = 2.0
+# Estimates (filesize_approx) are often a few percent low
+ESTIMATE_SLACK = 1.05
+
+FALLOC_FL_KEEP_SIZE = 0x01
+
+class InsufficientSpace(Exception):
+    """Not enough free space for a download; the job can be retried once space is freed."""
+    def __init__(self, directory, required, free):
+        self.directory = directory
+        self.required = required
+        self.free = free
+        super().__init__(f"Not enough disk space in {directory}: needs ~{required / 2**30:.2f} GiB, "
+                         f"{free / 2**30:.2f} GiB free")
+
+class DiskTooSmall(Exception):
+    """A download is larger than the whole filesystem; freeing space won't help, so it fails."""
+    def __init__(self, directory, required, total):
+        self.directory = directory
+        self.required = required
+        self.total = total
+        super().__init__(f"Download needs ~{required / 2**30:.2f} GiB, more than the "
+                         f"{total / 2**30:.2f} GiB filesystem holding {directory}")
+
+def media_size(info) -> Optional[int]:
+    """Bytes of the formats yt-dlp selected with ESTIMATE_SLACK added; None if unknown."""
+    size = known_size(info)
+    return None if size is None else int(size * ESTIMATE_SLACK)
+
+def required_space(info) -> Optional[int]:
+    """Peak bytes a download needs where it is written, including the merge."""
+    size = media_size(info)
+    if size is None:
+        return None
+    if len(info.get('requested_formats') or ()) > 1:
+        size = int(size * MERGE_FACTOR)
+    return size
+
+def _existing(path):
+    """`path` or its nearest existing parent."""
+    path = os.path.abspath(path)
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return path
+
+def free_space(path) -> int:
+    """Free bytes on the filesystem holding `path` (or its nearest existing parent)."""
+    return shutil.disk_usage(_existing(path)).free
+
+def _device(path):
+    try:
+        return os.stat(_existing(path)).st_dev
+    except OSError:
+        return os.path.abspath(path)
+
+# Bytes promised to running downloads, per filesystem (st_dev); free space
+# doesn't show them until they are written
+_reserved = {}
+_reserved_lock = threading.Lock()
+
+class Reservation:
+    """Space one download job has claimed; release() when the job ends."""
+    def __init__(self):
+        self.claims = {}
+
+    def release(self):
+        with _reserved_lock:
+            for device, size in self.claims.items():
+                left = _reserved.get(device, 0) - size
+                if left > 0:
+                    _reserved[device] = left
+                else:
+                    _reserved.pop(device, None)
+            self.claims = {}
+
+def reserved_space(path) -> int:
+    """Bytes claimed by running downloads on the filesystem holding `path`."""
+    with _reserved_lock:
+        return _reserved.get(_device(path), 0)
+
+def ensure_space(directory, required, reservation=None):
+    """Raise InsufficientSpace unless `required` bytes fit next to what other jobs claimed,
+    DiskTooSmall if they can never fit.
+
+    With a `reservation` the bytes are claimed for it in the same step, so
+    parallel jobs can't all pass the check against the same free space.
+    """
+    device = _device(directory)
+    usage = shutil.disk_usage(_existing(directory))
+    if required + RESERVE_BYTES > usage.total:
+        raise DiskTooSmall(directory, required, usage.total)
+    with _reserved_lock:
+        free = free_space(directory) - _reserved.get(device, 0)
+        if required + RESERVE_BYTES > free:
+            raise InsufficientSpace(directory, required, max(free, 0))
+        if reservation is not None:
+            _reserved[device] = _reserved.get(device, 0) + required
+            reservation.claims[device] = reservation.claims.get(device, 0) + required
+
+def preflight(info, work_dir, final_dir=None, reservation=None):
+    """Raise InsufficientSpace if the selected formats won't fit.
+
+    `work_dir` holds the parts and the merge; `final_dir` (when staging) only
+    the finished file. Unknown sizes pass. The job's `reservation` is moved to
+    this video: the previous one's files are on disk by now.
+    """
+    if reservation is not None:
+        reservation.release()
+    required = required_space(info)
+    if required is None:
+        return
+    ensure_space(work_dir, required, reservation)
+    if final_dir and os.path.abspath(final_dir) != os.path.abspath(work_dir):
+        ensure_space(final_dir, media_size(info), reservation)
+
+_fallocate = None
+if sys.platform.startswith("linux"):
+    try:
+        _libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        _fallocate = _libc.fallocate
+        _fallocate.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_int64, ctypes.c_int64]
+    except (OSError, AttributeError):
+        _fallocate = None
+
+def preallocate(path, size) -> bool:
+    """Reserve `size` bytes of blocks for `path` without changing its length.
+
+    The file size stays as is (FALLOC_FL_KEEP_SIZE), so yt-dlp's resume and
+    append logic, which reads the size of the .part file, is unaffected.
+    Returns False where the platform or filesystem can't do it.
+    """
+    if _fallocate is None or size <= 0:
+        return False
+    try:
+        fd = os.open(path, os.O_WRONLY)
+    except OSError:
+        return False
+    try:
+        if _fallocate(fd, FALLOC_FL_KEEP_SIZE, 0, int(size)) != 0:
+            logger.debug(f"fallocate failed for {path}: {os.strerror(ctypes.get_errno())}")
+            return False
+        return True
+    finally:
+        os.close(fd)
+
+class Preallocator:
+    """yt-dlp progress hook that preallocates each file once its exact size is known.
+
+    total_bytes_estimate (fragmented/DASH downloads) is only an extrapolation;
+    blocks reserved past the real end would stay allocated after the rename.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._done = set()
+
+    def __call__(self, d):
+        if d.get('status') != 'downloading':
+            return
+        path = d.get('tmpfilename') or d.get('filename')
+        total = d.get('total_bytes')
+        if not path or not total or path == '-':
+            return
+        with self._lock:
+            if path in self._done:
+                return
+            self._done.add(path)
+        if preallocate(path, total):
+            logger.debug(f"Preallocated {total} bytes for {path}")
+
+def make_preflight(final_dir=None, reservation=None):
+    """A yt-dlp 'before_dl' postprocessor running preflight() on each video."""
+    from yt_dlp.postprocessor.common import PostProcessor
+
+    class DiskSpacePreflightPP(PostProcessor):
+        def run(self, info):
+            work_dir = os.path.dirname(info.get('_filename') or info.get('filepath') or '') or '.'
+            preflight(info, work_dir, final_dir, reservation)
+            return [], info
+
+        def _hook_progress(self, status, info_dict):
+            pass # Not a real processing step
+
+    return DiskSpacePreflightPP()
@@ -0,0 +1,204 @@
+import hashlib
+import itertools
+import logging
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from src import metrics
+
+logger = logging.getLogger("UltraTube.Mover")
+
+MOVE_WORKERS = 2
+COPY_CHUNK = 4 * 1024 * 1024
+# Renames on network shares fail transiently while another process holds the file (WinError 32)
+REPLACE_ATTEMPTS = 5
+REPLACE_DELAY = 1.0
+
+# yt-dlp leftovers that never belong in the destination
+_LEFTOVER_SUFFIXES = (".part", ".ytdl", ".temp")
+
+class MoveError(Exception):
+    """A staged file could not be copied to its destination intact."""
+
+def _hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(COPY_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _replace(src, dest):
+    for attempt in range(REPLACE_ATTEMPTS):
+        try:
+            os.replace(src, dest)
+            return
+        except PermissionError:
+            if attempt == REPLACE_ATTEMPTS - 1:
+                raise
+            time.sleep(REPLACE_DELAY * (attempt + 1))
+
+def _same_device(src, dest_dir):
+    try:
+        return os.stat(src).st_dev == os.stat(dest_dir).st_dev
+    except OSError:
+        return False
+
+def move_file(src, dest, verify=True):
+    """Move `src` to `dest`, copying across filesystems.
+
+    Cross-device copies go to `<dest>.moving` first, are checked against the
+    source (size, and SHA-256 read back when `verify`), then renamed into place,
+    so the destination never holds a partial file.
+    """
+    dest_dir = os.path.dirname(dest) or "."
+    os.makedirs(dest_dir, exist_ok=True)
+    if _same_device(src, dest_dir):
+        _replace(src, dest)
+        return dest
+
+    tmp = dest + ".moving"
+    digest = hashlib.sha256()
+    try:
+        with open(src, "rb") as fin, open(tmp, "wb") as fout:
+            for chunk in iter(lambda: fin.read(COPY_CHUNK), b""):
+                digest.update(chunk)
+                fout.write(chunk)
+            fout.flush()
+            os.fsync(fout.fileno())
+        if os.path.getsize(tmp) != os.path.getsize(src):
+            raise MoveError(f"size mismatch copying {src} to {dest}")
+        if verify and _hash_file(tmp) != digest.hexdigest():
+            raise MoveError(f"checksum mismatch copying {src} to {dest}")
+        shutil.copystat(src, tmp)
+        _replace(tmp, dest)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    os.remove(src)
+    return dest
+
+class FileMover:
+    """Moves finished downloads from local staging to their destination in the background.
+
+    At most `max_workers` moves run at once, so slow destination storage
+    doesn't hold up download slots.
+    """
+    def __init__(self, max_workers=MOVE_WORKERS, verify=True):
+        self.verify = verify
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="file-mover")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._claimed = set() # destination paths of moves in progress
+        metrics.PENDING_MOVES.set_function(self.pending)
+
+    def submit(self, stage_dir, dest_dir):
+        """Move every finished file in `stage_dir` into `dest_dir`; returns a Future of the new paths.
+
+        The Future fails with MoveError if any file had to stay in `stage_dir`.
+        """
+        with self._lock:
+            self._pending += 1
+        return self._executor.submit(self._move_dir, stage_dir, dest_dir)
+
+    def pending(self) -> int:
+        with self._lock:
+            return self._pending
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def _move_dir(self, stage_dir, dest_dir):
+        moved, failed, targets = [], [], {}
+        try:
+            if not os.path.isdir(stage_dir):
+                return moved # e.g. already in the download archive
+            names = [name for name in sorted(os.listdir(stage_dir))
+                     if os.path.isfile(os.path.join(stage_dir, name)) and not name.endswith(_LEFTOVER_SUFFIXES)]
+            with self._lock:
+                targets = unique_names(names, dest_dir, _base_name(stage_dir, names), self._claimed)
+                self._claimed.update(os.path.join(dest_dir, target) for target in targets.values())
+            for name, target in targets.items():
+                src = os.path.join(stage_dir, name)
+                if target != name:
+                    logger.warning(f"{name} already exists in {dest_dir}; saving it as {target}")
+                started = time.monotonic()
+                try:
+                    moved.append(move_file(src, os.path.join(dest_dir, target), self.verify))
+                except (OSError, MoveError) as e:
+                    failed.append(f"{name} ({e})")
+                    logger.error(f"Could not move {src} to {dest_dir}: {e}; it stays in staging")
+                    continue
+                logger.info(f"Moved {name} to {dest_dir} in {time.monotonic() - started:.1f}s")
+            if failed:
+                raise MoveError(f"could not move {', '.join(failed)} to {dest_dir}; kept in {stage_dir}")
+            shutil.rmtree(stage_dir, ignore_errors=True)
+            return moved
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._claimed.difference_update(os.path.join(dest_dir, target) for target in targets.values())
+
+def _base_name(stage_dir, names):
+    """Name shared by a job's files (the media file's, without extension): 'Title' for 'Title.en.srt'."""
+    if not names:
+        return ""
+    largest = max(names, key=lambda name: os.path.getsize(os.path.join(stage_dir, name)))
+    return os.path.splitext(largest)[0]
+
+def unique_names(names, dest_dir, base, claimed=()):
+    """Destination names for one job's files that replace nothing in `dest_dir`.
+
+    Like yt-dlp, staging never overwrites: on a clash every file named after
+    `base` gets the same ' (n)' suffix ('Title (1).mp4', 'Title (1).en.srt'),
+    so subtitles and thumbnails still match their video. `claimed` holds
+    destination paths other moves are about to create.
+    """
+    def renamed(name, n):
+        if n == 0:
+            return name
+        stem, rest = (base, name[len(base):]) if base and name.startswith(base) else os.path.splitext(name)
+        return f"{stem} ({n}){rest}"
+
+    for n in itertools.count():
+        targets = {name: renamed(name, n) for name in names}
+        paths = [os.path.join(dest_dir, target) for target in targets.values()]
+        if not any(os.path.lexists(path) or path in claimed for path in paths):
+            return targets
+
+def staged_path(path, stage_dir, dest_dir):
+    """Where a file downloaded to `stage_dir` ends up once moved."""
+    if not path:
+        return path
+    return os.path.join(dest_dir, os.path.relpath(path, stage_dir))
+
+_mover: Optional[FileMover] = None
+_mover_lock = threading.Lock()
+
+def set_mover(mover):
+    """Install the mover used by downloads with a staging directory (e.g. with a configured worker count)."""
+    global _mover
+    with _mover_lock:
+        _mover = mover
+
+def get_mover() -> FileMover:
+    global _mover
+    if _mover is None:
+        with _mover_lock:
+            if _mover is None:
+                _mover = FileMover()
+    return _mover
+
+def shutdown(wait=True):
+    """Finish (or with wait=False, abandon waiting for) queued moves; call before exiting."""
+    global _mover
+    with _mover_lock:
+        mover, _mover = _mover, None
+    if mover is not None:
+        mover.shutdown(wait)
@@ -0,0 +1,70 @@
+from typing import Optional
+
+from src import audio_pipeline
+
+# Quality label fragment (UI presets, CLI -f) -> (max height, extra sort fields).
+# Checked in order, so "4K HDR" must come before "4K".
+QUALITY_PRESETS = (
+    ("8K", 4320, ()),
+    ("4K HDR", 2160, ("hdr:12",)), # Dolby Vision / HDR10 before SDR
+    ("4K", 2160, ()),
+    ("1440p", 1440, ()),
+    ("1080p", 1080, ()),
+    ("720p", 720, ()),
+    ("480p", 480, ()),
+)
+
+# video_codec setting -> yt-dlp sort fields and merge containers.
+# "vcodec:h264" prefers h264, then codecs yt-dlp ranks below it, so the
+# download falls back gracefully where the site has no h264 at that height.
+# Containers are tried in order; yt-dlp picks the first that takes both
+# streams as they are, so merging is a plain copy.
+VIDEO_CODECS = {
+    "h264": {"sort": ("vcodec:h264", "acodec:aac"), "containers": "mp4/mkv"},
+    "h265": {"sort": ("vcodec:h265", "acodec:aac"), "containers": "mp4/mkv"},
+    "vp9": {"sort": ("vcodec:vp9", "acodec:opus"), "containers": "webm/mkv"},
+    "av1": {"sort": ("vcodec:av01", "acodec:opus"), "containers": "mp4/webm/mkv"},
+}
+DEFAULT_CONTAINERS = "mp4/webm/mkv"
+
+def preset_height(format_id) -> Optional[tuple]:
+    """(max height, extra sort fields) for a quality label, None if it isn't one."""
+    for label, height, extra in QUALITY_PRESETS:
+        if label in format_id:
+            return height, extra
+    return None
+
+def select(format_id=None, video_codec=None) -> dict:
+    """yt-dlp options (format, format_sort, merge_output_format) for a quality and codec.
+
+    Resolution always ranks first; the codec preference only decides between
+    formats of the chosen height. Unknown `format_id`s are yt-dlp format IDs
+    or specs and are passed through.
+    """
+    codec = VIDEO_CODECS.get(video_codec) # unknown codecs: no preference
+    codec_sort = list(codec["sort"]) if codec else []
+
+    preset = preset_height(format_id) if format_id else None
+    if format_id == "Best Available" or not format_id:
+        fmt, sort = 'bestvideo+bestaudio/best', ['res', *codec_sort]
+    elif preset:
+        height, extra = preset
+        fmt = f'bestvideo[height<={height}]+bestaudio/best[height<={height}]/best'
+        sort = [f'res:{height}', *extra, *codec_sort]
+    else:
+        # Specific format IDs (e.g. from a list); only the audio to add is up to us
+        fmt = format_id if '+' in format_id or '/' in format_id else f"{format_id}+bestaudio/best"
+        sort = codec_sort
+    return {
+        'format': fmt,
+        'format_sort': sort,
+        'merge_output_format': codec["containers"] if codec else DEFAULT_CONTAINERS,
+    }
+
+def for_download(format_id=None, video_codec=None, audio_codec=None) -> dict:
+    """select(), or with `audio_codec` the audio policy's format, as download_item requests it."""
+    selection = select(format_id, video_codec)
+    if audio_codec:
+        # The audio policy's own filters decide; video sort fields don't apply
+        selection.update(format=audio_pipeline.format_for(audio_codec), format_sort=[])
+    return selection
@@ -0,0 +1,30 @@
+import threading
+
+_session = None
+_lock = threading.Lock()
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+def get_session():
+    """Return the app-wide requests session, creating it on first use.
+
+    Sharing one session keeps connections (and their TLS setup) pooled across
+    the update check and thumbnail loaders instead of paying for it per request.
+    """
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                import requests
+                session = requests.Session()
+                session.headers['User-Agent'] = USER_AGENT
+                _session = session
+    return _session
+
+def close_session():
+    """Release pooled connections, e.g. on application shutdown."""
+    global _session
+    with _lock:
+        if _session is not None:
+            _session.close()
+            _session = None
@@ -0,0 +1,265 @@
+import heapq
+import itertools
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field, asdict
+from typing import Optional
+
+import downloader
+from src import metrics
+from src.retry_policy import get_coordinator
+from src import proxy_pool
+
+# Window for the "current" throughput figure
+THROUGHPUT_WINDOW = 10.0
+
+# Seconds before a job deferred for lack of disk space is queued again
+DEFER_DELAY = 60.0
+# Deferrals before such a job fails; each retry extracts the page again
+MAX_DEFERRALS = 30
+
+ACTIVE_STATES = ("queued", "running", "deferred")
+
+# Finished, failed and cancelled jobs kept for GET /jobs; older ones are forgotten
+MAX_FINISHED_JOBS = 1000
+
+class JobCancelled(Exception):
+    """Raised from the progress hook to abort a running download."""
+
+@dataclass
+class Job:
+    url: str
+    priority: int = 0
+    format_id: Optional[str] = None
+    id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    status: str = "queued"
+    title: Optional[str] = None
+    filename: Optional[str] = None
+    percent: float = 0.0
+    speed: str = ""
+    eta: str = ""
+    bytes: int = 0
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    deferrals: int = 0
+    cancel_requested: bool = False
+
+    def to_dict(self):
+        data = asdict(self)
+        data.pop("cancel_requested")
+        return data
+
+class JobQueue:
+    """Priority download queue shared by headless front-ends (CLI, control API).
+
+    Higher priority runs first, FIFO within a priority. Worker threads call
+    downloader.download_item with the queue's settings.
+    """
+    def __init__(self, max_workers=3, **settings):
+        self.max_workers = max_workers
+        self.defer_delay = DEFER_DELAY
+        self.max_deferrals = MAX_DEFERRALS
+        self.settings = settings
+        self._jobs = {}
+        self._finished = deque() # ids of ended jobs, oldest first
+        self._forgotten = {} # status -> count of ended jobs dropped from _jobs
+        self.max_finished = MAX_FINISHED_JOBS
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._threads = []
+        self._running = False
+        self._started_at = time.time()
+        self._bytes_total = 0
+        self._recent = deque() # (monotonic time, bytes) samples
+        metrics.QUEUE_DEPTH.set_function(self.queue_depth)
+
+    # --- Lifecycle ---
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        for i in range(self.max_workers):
+            thread = threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=None):
+        """Stop taking new jobs and abort running ones."""
+        with self._cond:
+            self._running = False
+            for job in self._jobs.values():
+                if job.status == "running":
+                    job.cancel_requested = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    # --- Commands ---
+    def submit(self, url, priority=0, format_id=None) -> Job:
+        job = Job(url=url, priority=int(priority), format_id=format_id)
+        with self._cond:
+            self._jobs[job.id] = job
+            self._push(job)
+            self._cond.notify()
+        return job
+
+    def cancel(self, job_id) -> bool:
+        """Drop a queued job or abort a running one; False if unknown or already done."""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if not job or job.status not in ACTIVE_STATES:
+                return False
+            if job.status in ("queued", "deferred"):
+                job.status = "cancelled"
+                job.finished_at = time.time()
+                self._ended(job)
+            else:
+                job.cancel_requested = True
+            return True
+
+    def reprioritize(self, job_id, priority) -> bool:
+        """Change the priority of a job that hasn't started yet."""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if not job or job.status != "queued":
+                return False
+            job.priority = int(priority)
+            # The old heap entry is skipped when popped
+            self._push(job)
+            return True
+
+    # --- Queries ---
+    def get(self, job_id) -> Optional[dict]:
+        with self._cond:
+            job = self._jobs.get(job_id)
+            return job.to_dict() if job else None
+
+    def jobs(self, status=None) -> list:
+        with self._cond:
+            return [j.to_dict() for j in self._jobs.values() if status is None or j.status == status]
+
+    def queue_depth(self) -> int:
+        with self._cond:
+            return sum(1 for j in self._jobs.values() if j.status == "queued")
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        pool = proxy_pool.get_pool()
+        with self._cond:
+            counts = dict(self._forgotten)
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            self._trim(now)
+            recent = sum(b for _, b in self._recent)
+            uptime = time.time() - self._started_at
+            return {
+                "jobs": counts,
+                "workers": self.max_workers,
+                "bytes_total": self._bytes_total,
+                "throughput_bps": round(recent / THROUGHPUT_WINDOW),
+                "average_bps": round(self._bytes_total / uptime) if uptime > 0 else 0,
+                "uptime": round(uptime, 1),
+                "hosts": get_coordinator().snapshot(),
+                "proxies": pool.snapshot() if pool else {},
+            }
+
+    # --- Internals ---
+    def _push(self, job):
+        heapq.heappush(self._heap, (-job.priority, next(self._seq), job.priority, job))
+
+    def _pop(self):
+        """Next runnable job, or None when stopping. Caller holds the lock."""
+        while self._running:
+            while self._heap:
+                _, _, priority, job = heapq.heappop(self._heap)
+                if job.status == "queued" and job.priority == priority:
+                    return job
+            self._cond.wait()
+        return None
+
+    def _requeue(self, job):
+        with self._cond:
+            if job.status == "deferred" and self._running:
+                job.status = "queued"
+                self._push(job)
+                self._cond.notify()
+
+    def _ended(self, job):
+        """Keep only the newest max_finished ended jobs. Caller holds the lock."""
+        self._finished.append(job.id)
+        while len(self._finished) > self.max_finished:
+            old = self._jobs.pop(self._finished.popleft(), None)
+            if old is not None:
+                self._forgotten[old.status] = self._forgotten.get(old.status, 0) + 1
+
+    def _trim(self, now):
+        while self._recent and now - self._recent[0][0] > THROUGHPUT_WINDOW:
+            self._recent.popleft()
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                job = self._pop()
+                if job is None:
+                    return
+                job.status = "running"
+                job.started_at = time.time()
+            self._run(job)
+
+    def _run(self, job):
+        last = {"downloaded": 0}
+
+        def on_progress(prog):
+            if job.cancel_requested:
+                raise JobCancelled(job.id)
+            with self._cond:
+                if prog.status == "downloading":
+                    job.percent, job.speed, job.eta = prog.percentage, prog.speed, prog.eta
+                    job.title = prog.title
+                    downloaded = prog.downloaded_bytes or 0
+                    # A smaller count means the next file (e.g. audio after video) started
+                    delta = downloaded - last["downloaded"] if downloaded >= last["downloaded"] else downloaded
+                    last["downloaded"] = downloaded
+                    if delta > 0:
+                        self._bytes_total += delta
+                        self._recent.append((time.monotonic(), delta))
+                        self._trim(time.monotonic())
+                elif prog.status == "finished":
+                    last["downloaded"] = 0
+
+        def on_background_failure(error):
+            with self._cond:
+                job.status, job.error = "failed", error
+
+        result = downloader.download_item(job.url, format_id=job.format_id, progress_callback=on_progress,
+                                          on_background_failure=on_background_failure, **self.settings)
+        with self._cond:
+            job.finished_at = time.time()
+            job.bytes = result.get("bytes", 0)
+            job.title = result.get("title") or job.title
+            job.filename = result.get("filename")
+            if job.cancel_requested:
+                job.status = "cancelled"
+            elif result.get("status") == "deferred" and job.deferrals >= self.max_deferrals:
+                job.status = "failed"
+                job.error = f"{result.get('error')} (gave up after {job.deferrals} retries)"
+            elif result.get("status") == "deferred":
+                job.status, job.error = "deferred", result.get("error")
+                job.deferrals += 1
+                timer = threading.Timer(self.defer_delay, self._requeue, (job,))
+                timer.daemon = True
+                timer.start()
+            else:
+                job.status = result.get("status", "failed")
+                job.error = result.get("error")
+                if job.status == "finished":
+                    job.percent = 100.0
+            if job.status != "deferred":
+                self._ended(job)
@@ -0,0 +1,151 @@
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import zipfile
+
+# Per-job fields passed through `extra=` that end up as JSON keys
+JOB_FIELDS = ("job_id", "url", "bytes", "duration", "status", "phases")
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with any per-job fields lifted to the top level."""
+    def format(self, record):
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "thread": record.threadName,
+        }
+        for key in JOB_FIELDS:
+            if hasattr(record, key):
+                entry[key] = getattr(record, key)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks the caller: records are dropped when the queue is full."""
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record):
+        """Make the record picklable like QueueHandler.prepare, but keep the
+        traceback in `exc_text` instead of folding it into the message, so
+        each formatter can still place it."""
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+class LoggingPipeline:
+    """Routes a logger through a bounded queue to file handlers on a background thread."""
+    def __init__(self, logger, log_file="app.log", json_file="app.jsonl",
+                 max_bytes=5 * 1024 * 1024, backup_count=3, queue_size=10000):
+        self.logger = logger
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.queue_handler = BoundedQueueHandler(self.queue)
+
+        text_handler = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8', delay=True)
+        text_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        handlers = [text_handler]
+        if json_file:
+            json_handler = logging.handlers.RotatingFileHandler(
+                json_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8', delay=True)
+            json_handler.setFormatter(JsonFormatter())
+            handlers.append(json_handler)
+        self.handlers = handlers
+
+        self.listener = logging.handlers.QueueListener(self.queue, *handlers, respect_handler_level=True)
+        logger.addHandler(self.queue_handler)
+        self.listener.start()
+        self._stopped = False
+        atexit.register(self.stop)
+
+    def log_files(self):
+        """Current log files plus their rotated backups that exist on disk."""
+        paths = []
+        for handler in self.handlers:
+            base = handler.baseFilename
+            candidates = [base] + [f"{base}.{i}" for i in range(1, handler.backupCount + 1)]
+            paths.extend(p for p in candidates if os.path.exists(p))
+        return paths
+
+    @property
+    def dropped(self):
+        return self.queue_handler.dropped
+
+    def stop(self):
+        """Drain the queue and close the files; safe to call more than once."""
+        if self._stopped:
+            return
+        self._stopped = True
+        self.listener.stop()
+        self.logger.removeHandler(self.queue_handler)
+        if self.dropped:
+            # The queue may still be full: write straight to the files
+            record = self.logger.makeRecord(
+                self.logger.name, logging.WARNING, __file__, 0,
+                f"Log queue overflowed, {self.dropped} records were dropped.", None, None)
+            for handler in self.handlers:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+        for handler in self.handlers:
+            handler.close()
+
+def tail_lines(path, n=50, block_size=8192):
+    """Return the last `n` lines of a file, reading blocks backwards from EOF.
+
+    Cost depends on the size of the tail, not of the file.
+    """
+    if n <= 0:
+        return []
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        data = b''
+        # n+1 newlines guarantee n complete lines even with a trailing newline
+        while pos > 0 and data.count(b'\n') <= n:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+    return data.decode('utf-8', errors='replace').splitlines()[-n:]
+
+def log_excerpt(path, max_lines=1000, max_bytes=256 * 1024):
+    """Tail of a log capped by both line count and size, for pasting into a report."""
+    lines = tail_lines(path, max_lines)
+    size = 0
+    kept = []
+    for line in reversed(lines):
+        size += len(line.encode('utf-8')) + 1
+        if size > max_bytes:
+            break
+        kept.append(line)
+    return "\n".join(reversed(kept))
+
+def export_log_bundle(dest, paths):
+    """Write the given log files into a compressed zip at `dest`."""
+    with zipfile.ZipFile(dest, 'w', compression=zipfile.ZIP_DEFLATED) as bundle:
+        for path in paths:
+            if os.path.exists(path):
+                bundle.write(path, arcname=os.path.basename(path))
+    return dest
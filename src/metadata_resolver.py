@@ -0,0 +1,89 @@
+import logging
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+import downloader
+
+logger = logging.getLogger("UltraTube.Metadata")
+
+# QThreadPool priorities; rows scrolled into view jump the queue
+PRIORITY_DEFAULT = 0
+PRIORITY_VISIBLE = 10
+
+class _ResolveSignals(QObject):
+    resolved = pyqtSignal(str, dict)
+    failed = pyqtSignal(str, str)
+
+class _ResolveTask(QRunnable):
+    def __init__(self, url, settings, signals):
+        super().__init__()
+        # The resolver keeps the reference, so a queued task can be taken back and restarted
+        self.setAutoDelete(False)
+        self.url = url
+        self.settings = settings
+        self.signals = signals
+        self.started = False
+
+    def run(self):
+        self.started = True
+        try:
+            info = downloader.get_video_info(self.url, **self.settings)
+        except Exception as e:
+            self.signals.failed.emit(self.url, str(e))
+            return
+        if info:
+            self.signals.resolved.emit(self.url, info)
+        else:
+            self.signals.failed.emit(self.url, "Could not fetch video info.")
+
+class MetadataResolver(QObject):
+    """Fetches full metadata (formats, duration, size) for flat playlist entries.
+
+    At most `max_in_flight` extractions run at once. Results go through
+    downloader.get_video_info, so they land in its cache and are reused by
+    the download. prioritize() moves queued URLs to the front.
+    """
+    resolved = pyqtSignal(str, dict)
+    failed = pyqtSignal(str, str)
+
+    def __init__(self, settings, max_in_flight=4, parent=None):
+        super().__init__(parent)
+        self.settings = settings
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max(1, max_in_flight))
+        self._tasks = {} # url -> queued or running task
+        self._signals = _ResolveSignals()
+        self._signals.resolved.connect(self._on_resolved)
+        self._signals.failed.connect(self._on_failed)
+
+    def enqueue(self, urls, priority=PRIORITY_DEFAULT):
+        for url in urls:
+            if url in self._tasks:
+                continue
+            task = _ResolveTask(url, self.settings, self._signals)
+            self._tasks[url] = task
+            self.pool.start(task, priority)
+
+    def prioritize(self, urls):
+        """Run these URLs next if they are still waiting."""
+        for url in urls:
+            task = self._tasks.get(url)
+            if task and not task.started and self.pool.tryTake(task):
+                self.pool.start(task, PRIORITY_VISIBLE)
+
+    def pending(self):
+        return len(self._tasks)
+
+    def stop(self):
+        """Drop everything that hasn't started; running extractions finish on their own."""
+        self.pool.clear()
+        self._tasks = {url: t for url, t in self._tasks.items() if t.started}
+
+    def _on_resolved(self, url, info):
+        self._tasks.pop(url, None)
+        self.resolved.emit(url, info)
+
+    def _on_failed(self, url, error):
+        self._tasks.pop(url, None)
+        logger.warning(f"Could not resolve metadata for {url}: {error}")
+        self.failed.emit(url, error)
@@ -0,0 +1,221 @@
+import bisect
+import threading
+
+# Seconds
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+PHASE_BUCKETS = (0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, registry, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = registry.lock
+        self._values = {}
+        registry.register(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _label_str(self, key, extra=()):
+        pairs = list(zip(self.labelnames, key)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in pairs) + "}"
+
+    def _json_key(self, key):
+        return ",".join(f"{n}={v}" for n, v in zip(self.labelnames, key))
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        if not self.labelnames:
+            return [(self.name, self._values.get((), 0))]
+        return [(self.name + self._label_str(k), v) for k, v in sorted(self._values.items())]
+
+    def snapshot(self):
+        if not self.labelnames:
+            return self._values.get((), 0)
+        return {self._json_key(k): v for k, v in sorted(self._values.items())}
+
+class Gauge(_Metric):
+    """Value that is either set directly or read from a callback at scrape time."""
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._function = None
+
+    def set(self, value):
+        with self._lock:
+            self._values[()] = value
+
+    def inc(self, amount=1):
+        with self._lock:
+            self._values[()] = self._values.get((), 0) + amount
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+    def set_function(self, function):
+        self._function = function
+
+    def value(self):
+        if self._function is not None:
+            try:
+                return self._function()
+            except Exception:
+                return 0
+        return self._values.get((), 0)
+
+    def samples(self):
+        return [(self.name, self.value())]
+
+    def snapshot(self):
+        return self.value()
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, registry, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(registry, name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            data = self._values.get(key)
+            if data is None:
+                data = self._values[key] = {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0}
+            data["counts"][bisect.bisect_left(self.buckets, value)] += 1
+            data["sum"] += value
+            data["count"] += 1
+
+    def count(self, **labels):
+        with self._lock:
+            data = self._values.get(self._key(labels))
+            return data["count"] if data else 0
+
+    def sum(self, **labels):
+        with self._lock:
+            data = self._values.get(self._key(labels))
+            return data["sum"] if data else 0.0
+
+    def samples(self):
+        out = []
+        for key, data in sorted(self._values.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), data["counts"]):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                out.append((f"{self.name}_bucket" + self._label_str(key, [("le", le)]), cumulative))
+            out.append((f"{self.name}_sum" + self._label_str(key), data["sum"]))
+            out.append((f"{self.name}_count" + self._label_str(key), data["count"]))
+        return out
+
+    def snapshot(self):
+        result = {}
+        for key, data in sorted(self._values.items()):
+            result[self._json_key(key)] = {
+                "count": data["count"],
+                "sum": round(data["sum"], 6),
+                "mean": round(data["sum"] / data["count"], 6) if data["count"] else 0,
+                "buckets": dict(zip([_number(b) for b in self.buckets] + ["+Inf"], data["counts"])),
+            }
+        return result.get("", result) if not self.labelnames else result
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+
+    def counter(self, name, help_text, labelnames=()):
+        return Counter(self, name, help_text, labelnames)
+
+    def gauge(self, name, help_text):
+        return Gauge(self, name, help_text)
+
+    def histogram(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        return Histogram(self, name, help_text, labelnames, buckets)
+
+    def render_prometheus(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        with self.lock:
+            for metric in self.metrics:
+                lines.append(f"# HELP {metric.name} {metric.help}")
+                lines.append(f"# TYPE {metric.name} {metric.kind}")
+                lines.extend(f"{name} {_number(value)}" for name, value in metric.samples())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        with self.lock:
+            return {metric.name: metric.snapshot() for metric in self.metrics}
+
+    def reset(self):
+        with self.lock:
+            for metric in self.metrics:
+                metric._values.clear()
+
+def _number(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+REGISTRY = Registry()
+
+DOWNLOADED_BYTES = REGISTRY.counter("ultratube_downloaded_bytes_total", "Bytes received by downloads.")
+JOBS = REGISTRY.counter("ultratube_jobs_total", "Finished download jobs by outcome.", ("status",))
+JOB_SECONDS = REGISTRY.histogram("ultratube_job_seconds", "Wall time of download jobs.", buckets=PHASE_BUCKETS)
+PHASE_SECONDS = REGISTRY.histogram("ultratube_job_phase_seconds", "Wall time of download jobs by phase.",
+                                   ("phase",), buckets=PHASE_BUCKETS)
+METADATA_SECONDS = REGISTRY.histogram("ultratube_metadata_seconds", "Latency of metadata extraction (cache misses).")
+METADATA_REQUESTS = REGISTRY.counter("ultratube_metadata_requests_total", "Metadata lookups by cache result.",
+                                     ("cache",))
+RETRIES = REGISTRY.counter("ultratube_retries_total", "Retries reported by yt-dlp (HTTP and fragments).")
+THROTTLED = REGISTRY.counter("ultratube_throttled_responses_total", "HTTP 429/503 responses received.")
+CIRCUIT_OPENS = REGISTRY.counter("ultratube_circuit_opens_total", "Times a host was paused by its circuit breaker.")
+ACTIVE_DOWNLOADS = REGISTRY.gauge("ultratube_active_downloads", "Downloads currently running.")
+QUEUE_DEPTH = REGISTRY.gauge("ultratube_queue_depth", "Jobs waiting in the download queue.")
+DEDUP_SAVED_BYTES = REGISTRY.counter("ultratube_dedup_saved_bytes_total",
+                                     "Bytes freed by linking duplicate downloads.")
+HEALTHY_PROXIES = REGISTRY.gauge("ultratube_healthy_proxies", "Proxies in the pool currently in rotation.")
+PENDING_MOVES = REGISTRY.gauge("ultratube_pending_moves", "Staged downloads waiting to be moved to their destination.")
+PENDING_TRANSCODES = REGISTRY.gauge("ultratube_pending_transcodes", "Audio files queued for or being re-encoded.")
+
+def cache_hit_rate():
+    hits = METADATA_REQUESTS.value(cache="hit")
+    total = hits + METADATA_REQUESTS.value(cache="miss")
+    return hits / total if total else 0.0
+
+def snapshot():
+    """JSON-friendly view of all metrics plus derived figures."""
+    data = REGISTRY.snapshot()
+    data["metadata_cache_hit_rate"] = round(cache_hit_rate(), 4)
+    return data
+
+def add_routes(server):
+    """Expose /metrics (Prometheus text) and /metrics.json on a ControlServer."""
+    server.add_route("GET", "/metrics", lambda request: (
+        200, (REGISTRY.render_prometheus(), "text/plain; version=0.0.4; charset=utf-8")))
+    server.add_route("GET", "/metrics.json", lambda request: (200, snapshot()))
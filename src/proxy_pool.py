@@ -0,0 +1,227 @@
+import logging
+import re
+import threading
+import time
+from typing import Optional
+from urllib.parse import urlsplit, urlunsplit
+
+from src import metrics
+
+logger = logging.getLogger("UltraTube.Proxy")
+
+HEALTH_CHECK_URL = "http://www.gstatic.com/generate_204"
+CHECK_INTERVAL = 30.0 # seconds between health check rounds
+CHECK_TIMEOUT = 10.0
+# Consecutive failures (checks or jobs) that take a proxy out of rotation
+EJECT_AFTER = 3
+# Smoothing of the latency/throughput averages
+EWMA_ALPHA = 0.3
+# Scoring assumes a job moves this much data; unknown throughput counts as DEFAULT_THROUGHPUT
+SCORE_BYTES = 8 * 1024 * 1024
+DEFAULT_THROUGHPUT = 1024 * 1024
+DEFAULT_LATENCY = 1.0
+
+# Errors that point at the proxy rather than at the video
+PROXY_ERROR_PATTERN = re.compile(
+    r"proxy|tunnel|timed? ?out|connection (?:refused|reset|aborted)|remote end closed|unreachable", re.I)
+
+def _ewma(old, new):
+    return new if old is None else old + EWMA_ALPHA * (new - old)
+
+def redact(url) -> str:
+    """`url` without its user:password, for logs and stats."""
+    parts = urlsplit(url)
+    if "@" not in parts.netloc:
+        return url
+    return urlunsplit(parts._replace(netloc="***@" + parts.netloc.rpartition("@")[2]))
+
+def is_proxy_failure(error) -> bool:
+    return bool(error) and bool(PROXY_ERROR_PATTERN.search(str(error)))
+
+class ProxyState:
+    def __init__(self, url):
+        self.url = url
+        self.active = 0
+        self.latency = None    # seconds, health checks
+        self.throughput = None # bytes/s, finished transfers
+        self.failures = 0
+        self.ejected = False
+        self.jobs = 0
+
+    def score(self) -> float:
+        """Expected seconds for one more job, given the jobs already running through it."""
+        latency = self.latency if self.latency is not None else DEFAULT_LATENCY
+        throughput = self.throughput or DEFAULT_THROUGHPUT
+        return (self.active + 1) * (latency + SCORE_BYTES / throughput)
+
+    def to_dict(self):
+        return {
+            "active": self.active,
+            "healthy": not self.ejected,
+            "latency": round(self.latency, 3) if self.latency is not None else None,
+            "throughput_bps": round(self.throughput) if self.throughput else None,
+            "failures": self.failures,
+            "jobs": self.jobs,
+        }
+
+class ProxyPool:
+    """Spreads jobs over several proxies.
+
+    Each job goes to the healthy proxy with the lowest score (load x expected
+    time from measured latency and throughput). Proxies failing EJECT_AFTER
+    times in a row are ejected; a background health check re-admits them
+    once they answer again.
+    """
+    def __init__(self, proxies, check_url=HEALTH_CHECK_URL, check_interval=CHECK_INTERVAL):
+        self.proxies = {url: ProxyState(url) for url in dict.fromkeys(proxies)}
+        self.check_url = check_url
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        metrics.HEALTHY_PROXIES.set_function(self.healthy_count)
+
+    # --- Assignment ---
+    def acquire(self, prefer=None) -> Optional[str]:
+        """Pick a proxy for a new job and count it as busy; `prefer` is used while it is healthy."""
+        with self._lock:
+            if not self.proxies:
+                return None
+            preferred = self.proxies.get(prefer)
+            if preferred is not None and not preferred.ejected:
+                preferred.active += 1
+                preferred.jobs += 1
+                return preferred.url
+            candidates = [p for p in self.proxies.values() if not p.ejected]
+            if not candidates:
+                # Better a struggling proxy than silently going direct
+                candidates = list(self.proxies.values())
+            best = min(candidates, key=ProxyState.score)
+            best.active += 1
+            best.jobs += 1
+            return best.url
+
+    def release(self, url, ok=True, transferred=0, seconds=0.0):
+        """A job on `url` ended; `transferred` bytes in `seconds` feed the throughput score."""
+        with self._lock:
+            state = self.proxies.get(url)
+            if state is None:
+                return
+            state.active = max(0, state.active - 1)
+            if ok:
+                state.failures = 0
+                if transferred > 0 and seconds > 0:
+                    state.throughput = _ewma(state.throughput, transferred / seconds)
+            else:
+                self._failed(state, "job failed")
+
+    # --- Health ---
+    def check(self, url):
+        """Probe one proxy; returns the latency or None on failure."""
+        from src.http_session import get_session
+        started = time.monotonic()
+        try:
+            response = get_session().get(self.check_url, proxies={"http": url, "https": url},
+                                         timeout=CHECK_TIMEOUT, allow_redirects=False)
+            ok = response.status_code < 500
+        except Exception as e:
+            logger.debug(f"Health check via {redact(url)} failed: {e}")
+            ok = False
+        latency = time.monotonic() - started
+        with self._lock:
+            state = self.proxies[url]
+            if not ok:
+                self._failed(state, "health check failed")
+                return None
+            state.latency = _ewma(state.latency, latency)
+            state.failures = 0
+            if state.ejected:
+                state.ejected = False
+                logger.info(f"Proxy {redact(url)} is healthy again, back in rotation")
+        return latency
+
+    def check_all(self):
+        for url in list(self.proxies):
+            self.check(url)
+
+    def start(self):
+        """Run health checks in a background thread, the first round right away."""
+        if self._thread or not self.proxies:
+            return
+        self._thread = threading.Thread(target=self._run, name="proxy-health", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            # A check may be mid-request; the thread is a daemon, so don't wait it out
+            self._thread.join(1.0)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.check_all()
+            self._stop.wait(self.check_interval)
+
+    def _failed(self, state, reason):
+        """Caller holds the lock."""
+        state.failures += 1
+        if not state.ejected and state.failures >= EJECT_AFTER:
+            state.ejected = True
+            logger.warning(f"Proxy {redact(state.url)} ejected after {state.failures} failures ({reason})")
+
+    # --- Queries ---
+    def healthy_count(self) -> int:
+        with self._lock:
+            return sum(1 for p in self.proxies.values() if not p.ejected)
+
+    def snapshot(self) -> dict:
+        """Per-proxy state keyed by the redacted URL (served by the control API)."""
+        result = {}
+        with self._lock:
+            for i, (url, p) in enumerate(self.proxies.items()):
+                key = redact(url)
+                result[key if key not in result else f"{key}#{i}"] = p.to_dict()
+        return result
+
+class _Lease:
+    def __init__(self, pool, explicit, prefer=None):
+        self.pool = pool
+        self.pooled = not explicit and pool is not None
+        self.proxy = explicit or (pool.acquire(prefer) if pool is not None else None)
+        self._released = not self.pooled or self.proxy is None
+
+    def release(self, error=None, transferred=0, seconds=0.0):
+        """Report the outcome; only errors that look like proxy trouble count against it."""
+        if self._released:
+            return
+        self._released = True
+        self.pool.release(self.proxy, ok=not is_proxy_failure(error), transferred=transferred, seconds=seconds)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release(exc)
+        return False
+
+_pool: Optional[ProxyPool] = None
+
+def set_pool(pool):
+    """Install the pool used by jobs that don't name a proxy (None disables it)."""
+    global _pool
+    if _pool is not None and _pool is not pool:
+        _pool.stop()
+    _pool = pool
+
+def get_pool() -> Optional[ProxyPool]:
+    return _pool
+
+def lease(explicit=None, prefer=None):
+    """The proxy for one job: `explicit` if given, else one from the pool (if any).
+
+    `prefer` names a pool proxy to reuse while it is healthy (e.g. the one that
+    extracted the video's media URLs). Call release() (or use it as a context
+    manager) when the job ends.
+    """
+    return _Lease(_pool, explicit, prefer)
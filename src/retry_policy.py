@@ -0,0 +1,225 @@
+import email.utils
+import logging
+import random
+import threading
+import time
+from collections import deque
+from typing import Optional
+from urllib.parse import urlsplit
+
+from src import metrics
+
+logger = logging.getLogger("UltraTube.Retry")
+
+# Responses that mean "slow down" rather than "broken"
+THROTTLE_STATUSES = (429, 503)
+
+# Exponential backoff between yt-dlp retries (seconds)
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+
+# Throttled responses within FAILURE_WINDOW seconds that open a host's circuit.
+# A window rather than a consecutive count: under load, other jobs' successes
+# in between would otherwise keep resetting it.
+FAILURE_THRESHOLD = 3
+FAILURE_WINDOW = 60.0
+# First cooldown of an open circuit without Retry-After; doubles while the host keeps throttling
+COOLDOWN_BASE = 15.0
+COOLDOWN_MAX = 15 * 60.0
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_MAX, rng=random):
+    """'Full jitter' backoff: uniform in [0, min(cap, base * 2**attempt)]."""
+    return rng.uniform(0, min(cap, base * (2 ** attempt)))
+
+def parse_retry_after(value, now=None) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        deadline = email.utils.parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, deadline - (now or time.time()))
+
+def host_of(url) -> str:
+    return (urlsplit(url).hostname or "").lower()
+
+class CircuitBreaker:
+    """Health of one host.
+
+    closed:    requests flow; throttled responses are counted.
+    open:      the host keeps throttling; nobody sends until the cooldown ends.
+    half_open: cooldown over; one probe request decides between closed and open.
+    """
+    def __init__(self, host, threshold=FAILURE_THRESHOLD, clock=time.monotonic, window=FAILURE_WINDOW):
+        self.host = host
+        self.threshold = threshold
+        self.clock = clock
+        self.window = window
+        self.state = CLOSED
+        self._throttles = deque() # times of recent throttled responses
+        self.trips = 0 # consecutive openings, for the cooldown backoff
+        self.open_until = 0.0
+        self.probing = False
+
+    @property
+    def failures(self) -> int:
+        """Throttled responses within the window."""
+        cutoff = self.clock() - self.window
+        while self._throttles and self._throttles[0] < cutoff:
+            self._throttles.popleft()
+        return len(self._throttles)
+
+    def delay(self) -> float:
+        """Seconds until a request may be sent (0 = now), claiming the probe when half-open."""
+        now = self.clock()
+        if self.state == OPEN:
+            if now < self.open_until:
+                return self.open_until - now
+            self.state = HALF_OPEN
+            logger.info(f"Circuit for {self.host} half-open, sending a probe")
+        if self.state == HALF_OPEN:
+            if self.probing:
+                return 1.0
+            self.probing = True
+        return 0.0
+
+    def success(self):
+        """A request got through; only a successful probe clears the failure window."""
+        if self.state != CLOSED:
+            logger.info(f"Circuit for {self.host} closed")
+            self.state = CLOSED
+            self._throttles.clear()
+            self.trips = 0
+        self.probing = False
+
+    def throttled(self, retry_after=None):
+        self._throttles.append(self.clock())
+        self.probing = False
+        if self.state == HALF_OPEN or retry_after is not None or self.failures >= self.threshold:
+            self.trip(retry_after)
+
+    def release(self):
+        """A request finished without telling us anything about throttling."""
+        self.probing = False
+
+    def trip(self, retry_after=None):
+        if retry_after is None:
+            cooldown = min(COOLDOWN_MAX, COOLDOWN_BASE * (2 ** self.trips))
+            cooldown = cooldown / 2 + random.uniform(0, cooldown / 2)
+        else:
+            cooldown = min(COOLDOWN_MAX, retry_after)
+        self.trips += 1
+        self.state = OPEN
+        self.open_until = max(self.open_until, self.clock() + cooldown)
+        metrics.CIRCUIT_OPENS.inc()
+        logger.warning(f"Circuit for {self.host} open for {cooldown:.0f}s after {self.failures} throttled response(s)")
+
+    def to_dict(self):
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "retry_in": round(max(0.0, self.open_until - self.clock()), 1) if self.state == OPEN else 0.0,
+        }
+
+class RetryCoordinator:
+    """Shared view of host health for every download and metadata worker.
+
+    Each HTTP request waits on its host's circuit, so one host throttling us
+    pauses all jobs for that host instead of each burning its own retries.
+    """
+    def __init__(self, threshold=FAILURE_THRESHOLD, clock=time.monotonic, sleep=time.sleep):
+        self.threshold = threshold
+        self.clock = clock
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self._breakers = {}
+
+    def breaker(self, host) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = CircuitBreaker(host, self.threshold, self.clock)
+            return breaker
+
+    def acquire(self, host):
+        """Block until `host` accepts requests."""
+        breaker = self.breaker(host)
+        while True:
+            with self._lock:
+                delay = breaker.delay()
+            if delay <= 0:
+                return
+            self.sleep(min(delay, 5.0))
+
+    def record_success(self, host):
+        breaker = self.breaker(host)
+        with self._lock:
+            breaker.success()
+
+    def record_throttle(self, host, retry_after=None):
+        metrics.THROTTLED.inc()
+        breaker = self.breaker(host)
+        with self._lock:
+            breaker.throttled(retry_after)
+
+    def record_other(self, host):
+        breaker = self.breaker(host)
+        with self._lock:
+            breaker.release()
+
+    def snapshot(self) -> dict:
+        """Hosts whose circuit isn't closed."""
+        with self._lock:
+            return {h: b.to_dict() for h, b in self._breakers.items() if b.state != CLOSED or b.failures}
+
+    def sleep_functions(self) -> dict:
+        """yt-dlp `retry_sleep_functions`: jittered exponential backoff between retries."""
+        return {kind: (lambda n: backoff_delay(n)) for kind in ("http", "fragment", "extractor")}
+
+    def wrap(self, ydl):
+        """Route every request of a YoutubeDL instance through the host circuits.
+
+        Requests wait for their host's circuit and report the outcome; re-sending
+        is left to yt-dlp's own retries (with sleep_functions() backoff), so a
+        throttled request isn't retried at two levels.
+        """
+        from yt_dlp.networking.exceptions import HTTPError
+        urlopen = ydl.urlopen
+
+        def guarded_urlopen(req):
+            host = host_of(req if isinstance(req, str) else req.url)
+            self.acquire(host)
+            try:
+                response = urlopen(req)
+            except HTTPError as e:
+                if e.status in THROTTLE_STATUSES:
+                    self.record_throttle(host, parse_retry_after(e.response.headers.get("Retry-After")))
+                else:
+                    self.record_other(host)
+                raise
+            except BaseException:
+                self.record_other(host)
+                raise
+            self.record_success(host)
+            return response
+
+        ydl.urlopen = guarded_urlopen
+        return ydl
+
+_coordinator: Optional[RetryCoordinator] = None
+_coordinator_lock = threading.Lock()
+
+def get_coordinator() -> RetryCoordinator:
+    """Process-wide coordinator shared by all workers."""
+    global _coordinator
+    if _coordinator is None:
+        with _coordinator_lock:
+            if _coordinator is None:
+                _coordinator = RetryCoordinator()
+    return _coordinator
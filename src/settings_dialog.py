@@ -7,6 +7,13 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt, QTime
 
+# Batch start order shown in the dialog -> AppConfig.batch_order
+BATCH_ORDERS = (
+    ("Smallest first (first results soonest)", "sjf"),
+    ("Largest first (overnight windows)", "largest"),
+    ("List order", "fifo"),
+)
+
 class SettingsDialog(QDialog):
     def __init__(self, config_manager, colors, parent=None):
         super().__init__(parent)
@@ -14,7 +21,6 @@ class SettingsDialog(QDialog):
         self.colors = colors
         self.setWindowTitle("UltraTube Preferences")
         self.setMinimumSize(600, 650)
-        self.apply_styles()
         
         self.layout = QVBoxLayout(self)
         self.layout.setContentsMargins(20, 20, 20, 20)
@@ -40,6 +46,11 @@ class SettingsDialog(QDialog):
         self.concurrent_downloads = QSpinBox()
         self.concurrent_downloads.setRange(1, 10)
         gen_layout.addRow("Max Threads:", self.concurrent_downloads)
+
+        self.batch_order = QComboBox()
+        for label, policy in BATCH_ORDERS:
+            self.batch_order.addItem(label, policy)
+        gen_layout.addRow("Batch Order:", self.batch_order)
         
         self.dark_mode = QCheckBox("Enable Deep Obsidian Theme")
         gen_layout.addRow(self.dark_mode)
@@ -58,7 +69,7 @@ class SettingsDialog(QDialog):
         fmt_layout.addRow("Video Encoding:", self.video_codec)
         
         self.audio_codec = QComboBox()
-        self.audio_codec.addItems(["mp3", "aac", "m4a", "opus"])
+        self.audio_codec.addItems(["mp3", "aac", "m4a", "opus", "original"])
         fmt_layout.addRow("Audio Encoding:", self.audio_codec)
 
         # --- Scheduler Tab ---
@@ -67,7 +78,7 @@ class SettingsDialog(QDialog):
         sch_layout.setContentsMargins(20, 20, 20, 20)
         
         self.sch_enabled = QCheckBox("Activate Smart Scheduler")
-        self.sch_enabled.setStyleSheet("font-weight: bold; font-size: 14px;")
+        self.sch_enabled.setObjectName("sch_enabled")
         sch_layout.addWidget(self.sch_enabled)
         
         sch_form = QFormLayout()
@@ -82,7 +93,7 @@ class SettingsDialog(QDialog):
         
         sch_info = QLabel("Downloads added outside these hours will remain paused in the high-fidelity queue.")
         sch_info.setWordWrap(True)
-        sch_info.setStyleSheet(f"color: {self.colors['sub_text']}; font-size: 12px; font-style: italic; margin-top: 10px;")
+        sch_info.setObjectName("sch_info")
         sch_layout.addWidget(sch_info)
         sch_layout.addStretch()
 
@@ -124,6 +135,10 @@ class SettingsDialog(QDialog):
         
         self.archive_path = QLineEdit()
         adv_layout.addRow("Download Archive:", self.archive_path)
+
+        self.staging_path = QLineEdit()
+        self.staging_path.setPlaceholderText("None (download straight to the download path)")
+        adv_layout.addRow("Local Staging Folder:", self.staging_path)
         
         self.use_internal_browser = QCheckBox("Use Embedded Browser Engine")
         adv_layout.addRow(self.use_internal_browser)
@@ -155,71 +170,6 @@ class SettingsDialog(QDialog):
         
         self.load_settings()
 
-    def apply_styles(self):
-        accent = self.colors['accent']
-        self.setStyleSheet(f"""
-            QDialog {{ background-color: {self.colors['bg']}; }}
-            QWidget {{ color: {self.colors['text']}; font-family: 'Inter', sans-serif; }}
-            
-            QTabWidget::pane {{ border: 1px solid {self.colors['border']}; border-radius: 12px; background: {self.colors['card']}; }}
-            QTabBar::tab {{
-                background: transparent;
-                padding: 15px 23px;
-                min-width: 130px;
-                text-align: left;
-                color: {self.colors['sub_text']};
-            }}
-            QTabBar::tab:selected {{
-                color: {accent};
-                font-weight: 800;
-                border-right: 3px solid {accent};
-            }}
-            
-            QLineEdit, QSpinBox, QComboBox, QTimeEdit {{
-                background-color: {self.colors['bg']};
-                border: 1px solid {self.colors['border']};
-                border-radius: 8px;
-                padding: 8px 12px;
-                color: {self.colors['text']};
-            }}
-            
-            QComboBox QAbstractItemView {{
-                background-color: {self.colors['card']};
-                border: 1px solid {self.colors['border']};
-                selection-background-color: {accent};
-                color: {self.colors['text']};
-                outline: none;
-            }}
-
-            QCheckBox {{
-                spacing: 10px;
-                color: {self.colors['text']};
-                font-weight: 500;
-            }}
-            QCheckBox::indicator {{
-                width: 22px;
-                height: 22px;
-                background-color: {self.colors['bg']};
-                border: 2px solid {self.colors['border']};
-                border-radius: 6px;
-            }}
-            QCheckBox::indicator:checked {{
-                background-color: {accent};
-                border-color: {accent};
-                image: url(data:image/svg+xml;base64,PHN2ZyB4bWxucz0iaHR0cDovL3d3dy53My5vcmcvMjAwMC9zdmciIHdpZHRoPSIyNCIgaGVpZ2h0PSIyNCIgdmlld0JveD0iMCAwIDI0IDI0IiBmaWxsPSJub25lIiBzdHJva2U9IndoaXRlIiBzdHJva2Utd2lkdGg9IjQiIHN0cm9rZS1saW5lY2FwPSJyb3VuZCIgc3Ryb2tlLWxpbmVqb2luPSJyb3VuZCI+PHBvbHlsaW5lIHBvaW50cz0iMjAgNiA5IDE3IDQgMTIiPjwvcG9seWxpbmU+PC9zdmc+);
-            }}
-            QCheckBox::indicator:hover {{ border-color: {accent}; }}
-            
-            QPushButton {{
-                background-color: {self.colors['card']};
-                border: 1px solid {self.colors['border']};
-                border-radius: 10px;
-                padding: 10px 20px;
-                font-weight: 600;
-            }}
-            QPushButton:hover {{ border-color: {accent}; background-color: {self.colors['bg']}; }}
-        """)
-
     def select_folder(self):
         folder = QFileDialog.getExistingDirectory(self, "Select Download Folder")
         if folder: self.download_path.setText(folder)
@@ -246,11 +196,14 @@ class SettingsDialog(QDialog):
         set_combo(self.video_codec, config.video_codec)
         set_combo(self.audio_codec, config.audio_codec)
         set_combo(self.browser_cookies, config.browser_cookies)
+        idx = self.batch_order.findData(config.batch_order)
+        if idx >= 0: self.batch_order.setCurrentIndex(idx)
         
         self.proxy_url.setText(config.proxy if config.proxy else "")
         self.socket_timeout.setValue(config.socket_timeout)
         self.cookies_path.setText(config.cookies_file if config.cookies_file else "")
         self.archive_path.setText(config.archive_file)
+        self.staging_path.setText(config.staging_dir or "")
         self.use_internal_browser.setChecked(config.use_internal_browser)
         self.experimental_drm.setChecked(config.experimental_drm)
         self.cdm_path.setText(config.cdm_path if config.cdm_path else "")
@@ -263,6 +216,7 @@ class SettingsDialog(QDialog):
         self.config_manager.update(
             download_folder=self.download_path.text(),
             max_concurrent=self.concurrent_downloads.value(),
+            batch_order=self.batch_order.currentData(),
             dark_mode=self.dark_mode.isChecked(),
             preferred_quality=self.pref_quality.currentText(),
             video_codec=self.video_codec.currentText(),
@@ -271,6 +225,7 @@ class SettingsDialog(QDialog):
             socket_timeout=self.socket_timeout.value(),
             cookies_file=self.cookies_path.text() if self.cookies_path.text() else None,
             archive_file=self.archive_path.text(),
+            staging_dir=self.staging_path.text() or None,
             browser_cookies=self.browser_cookies.currentText(),
             use_internal_browser=self.use_internal_browser.isChecked(),
             experimental_drm=self.experimental_drm.isChecked(),
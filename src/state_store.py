@@ -0,0 +1,154 @@
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS subscriptions (
+    url TEXT PRIMARY KEY,
+    title TEXT,
+    enabled INTEGER NOT NULL DEFAULT 1,
+    last_check TEXT,
+    high_water_mark TEXT,
+    error_count INTEGER NOT NULL DEFAULT 0,
+    added_at REAL
+);
+CREATE TABLE IF NOT EXISTS download_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL,
+    title TEXT,
+    filename TEXT,
+    status TEXT NOT NULL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_history_url ON download_history(url);
+CREATE TABLE IF NOT EXISTS file_hashes (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    sample_hash TEXT NOT NULL,
+    full_hash TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_file_hashes_sample ON file_hashes(sample_hash);
+"""
+
+def _now() -> str:
+    return time.strftime("%Y-%m-%d %H:%M")
+
+# Subscriptions, per-channel state and download history; shared by the GUI and the CLI
+STATE_DB_FILE = "ultratube.db"
+
+class StateStore:
+    """SQLite-backed runtime state: subscriptions, per-channel state and download history.
+
+    Kept out of config.json so that frequently changing data gets indexed
+    lookups and row-level updates instead of full rewrites of the config.
+    """
+    def __init__(self, db_file: str = STATE_DB_FILE):
+        self.db_file = db_file
+        self._lock = threading.Lock()
+        # Shared by the GUI thread and background workers, serialized by _lock
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            if db_file != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _execute(self, sql: str, params=()) -> sqlite3.Cursor:
+        with self._lock, self._conn:
+            return self._conn.execute(sql, params)
+
+    def _query(self, sql: str, params=()) -> list:
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params).fetchall()]
+
+    # --- Subscriptions ---
+    def add_subscription(self, url: str, title: Optional[str] = None, last_check: Optional[str] = None,
+                         enabled: bool = True) -> bool:
+        """Insert a subscription; returns False if the URL is already subscribed."""
+        cur = self._execute(
+            "INSERT OR IGNORE INTO subscriptions (url, title, enabled, last_check, added_at) VALUES (?, ?, ?, ?, ?)",
+            (url, title or url, int(enabled), last_check or _now(), time.time())
+        )
+        return cur.rowcount == 1
+
+    def has_subscription(self, url: str) -> bool:
+        return bool(self._query("SELECT 1 FROM subscriptions WHERE url = ?", (url,)))
+
+    def get_subscription(self, url: str) -> Optional[dict]:
+        rows = self._query("SELECT * FROM subscriptions WHERE url = ?", (url,))
+        return rows[0] if rows else None
+
+    def list_subscriptions(self, enabled_only: bool = False) -> list:
+        sql = "SELECT * FROM subscriptions"
+        if enabled_only:
+            sql += " WHERE enabled = 1"
+        return self._query(sql + " ORDER BY added_at")
+
+    def remove_subscription(self, url: str) -> bool:
+        return self._execute("DELETE FROM subscriptions WHERE url = ?", (url,)).rowcount == 1
+
+    def update_last_check(self, url: str, timestamp: Optional[str] = None) -> str:
+        timestamp = timestamp or _now()
+        self._execute("UPDATE subscriptions SET last_check = ? WHERE url = ?", (timestamp, url))
+        return timestamp
+
+    def set_high_water_mark(self, url: str, video_id: str) -> None:
+        """Remember the newest video seen for a channel."""
+        self._execute("UPDATE subscriptions SET high_water_mark = ?, error_count = 0 WHERE url = ?", (video_id, url))
+
+    def record_error(self, url: str) -> None:
+        self._execute("UPDATE subscriptions SET error_count = error_count + 1 WHERE url = ?", (url,))
+
+    def import_subscriptions(self, subs: list) -> int:
+        """Import legacy subscription dicts from config.json; returns how many were added."""
+        added = 0
+        for sub in subs:
+            if sub.get('url') and self.add_subscription(
+                sub['url'], sub.get('title'), sub.get('last_check'), sub.get('enabled', True)
+            ):
+                added += 1
+        return added
+
+    # --- Download history ---
+    def record_download(self, url: str, status: str, title: Optional[str] = None, filename: Optional[str] = None) -> None:
+        self._execute(
+            "INSERT INTO download_history (url, title, filename, status, finished_at) VALUES (?, ?, ?, ?, ?)",
+            (url, title, filename, status, time.time())
+        )
+
+    def update_download_status(self, url: str, status: str) -> None:
+        """Change the status of the latest history entry for `url` (e.g. a conversion failed later)."""
+        self._execute(
+            "UPDATE download_history SET status = ? WHERE id = (SELECT MAX(id) FROM download_history WHERE url = ?)",
+            (status, url)
+        )
+
+    def download_history(self, url: Optional[str] = None, limit: int = 100) -> list:
+        if url:
+            return self._query(
+                "SELECT * FROM download_history WHERE url = ? ORDER BY id DESC LIMIT ?", (url, limit)
+            )
+        return self._query("SELECT * FROM download_history ORDER BY id DESC LIMIT ?", (limit,))
+
+    # --- Downloaded file hashes (deduplication index) ---
+    def record_file_hash(self, path: str, size: int, mtime: float, sample_hash: str,
+                         full_hash: Optional[str] = None) -> None:
+        self._execute(
+            "INSERT OR REPLACE INTO file_hashes (path, size, mtime, sample_hash, full_hash) VALUES (?, ?, ?, ?, ?)",
+            (path, size, mtime, sample_hash, full_hash)
+        )
+
+    def set_full_hash(self, path: str, full_hash: str) -> None:
+        self._execute("UPDATE file_hashes SET full_hash = ? WHERE path = ?", (full_hash, path))
+
+    def files_with_sample(self, sample_hash: str) -> list:
+        return self._query("SELECT * FROM file_hashes WHERE sample_hash = ?", (sample_hash,))
+
+    def forget_file(self, path: str) -> None:
+        self._execute("DELETE FROM file_hashes WHERE path = ?", (path,))
@@ -7,14 +7,24 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt, QThread, pyqtSignal, pyqtSlot, QTimer, QTime
 import downloader
 
+def count_new_entries(entries, high_water_mark):
+    """Number of entries (newest first) published after the last seen video id."""
+    if not high_water_mark:
+        return len(entries)
+    for i, entry in enumerate(entries):
+        if entry.get('id') == high_water_mark:
+            return i
+    return len(entries)
+
 class SubscriptionWorker(QThread):
     """Background thread to periodically check subscriptions for new videos."""
     new_video_found = pyqtSignal(str, str) # url, sub_title
     check_finished = pyqtSignal(str, int)  # sub_url, new_count
 
-    def __init__(self, config_manager, settings):
+    def __init__(self, config_manager, store, settings):
         super().__init__()
         self.config_manager = config_manager
+        self.store = store
         self.settings = settings
         self.is_running = True
 
@@ -41,22 +51,25 @@ class SubscriptionWorker(QThread):
                 continue
 
             # 2. Process subs
-            for sub in self.config_manager.config.subscriptions:
-                if not sub.get('enabled', True):
-                    continue
-                
+            for sub in self.store.list_subscriptions(enabled_only=True):
                 url = sub['url']
                 print(f"Checking subscription: {url}")
                 
                 # Fetch info in flat mode to see entries without downloading
                 info = downloader.get_video_info(url, **self.settings)
                 if info and 'entries' in info:
+                    entries = [e for e in info['entries'] if e]
+                    new_count = count_new_entries(entries, sub.get('high_water_mark'))
                     # We trigger run_multi_download for the channel/playlist
                     downloader.run_multi_download(
                         [url], 
                         **self.settings
                     )
-                    self.check_finished.emit(url, 0)
+                    if entries and entries[0].get('id'):
+                        self.store.set_high_water_mark(url, entries[0]['id'])
+                    self.check_finished.emit(url, new_count)
+                else:
+                    self.store.record_error(url)
             
             # Sleep for 1 hour (default)
             for _ in range(3600):
@@ -97,24 +110,16 @@ class SubscriptionItem(QFrame):
         self.init_ui()
 
     def init_ui(self):
+        # Styled by the application theme (see src/theme.py)
         self.setFixedHeight(90)
-        self.setStyleSheet(f"""
-            QFrame {{
-                background-color: {self.colors['card']};
-                border-radius: 16px;
-                padding: 15px;
-                border: 1px solid {self.colors['border']};
-            }}
-            QFrame:hover {{ border-color: {self.colors['accent']}; }}
-        """)
         layout = QHBoxLayout(self)
 
         info_layout = QVBoxLayout()
         self.lbl_title = QLabel(self.title if len(self.title) < 60 else self.title[:57] + "...")
-        self.lbl_title.setStyleSheet(f"font-weight: 700; font-size: 15px; color: {self.colors['text']}; border: none;")
+        self.lbl_title.setObjectName("sub_title")
         
         self.lbl_status = QLabel(f"Sync Status: {self.last_check}")
-        self.lbl_status.setStyleSheet(f"color: {self.colors['sub_text']}; font-size: 12px; border: none;")
+        self.lbl_status.setObjectName("sub_status")
         
         info_layout.addWidget(self.lbl_title)
         info_layout.addWidget(self.lbl_status)
@@ -122,23 +127,23 @@ class SubscriptionItem(QFrame):
 
         self.btn_del = QPushButton("🗑")
         self.btn_del.setFixedSize(40, 40)
-        self.btn_del.setStyleSheet(f"""
-            QPushButton {{ 
-                background: transparent; 
-                font-size: 18px; 
-                color: {self.colors['sub_text']}; 
-                border: none;
-            }}
-            QPushButton:hover {{ color: {self.colors['danger']}; background: {self.colors['bg']}; border-radius: 10px; }}
-        """)
+        self.btn_del.setObjectName("sub_delete")
         self.btn_del.clicked.connect(lambda: self.remove_requested.emit(self.url))
         layout.addWidget(self.btn_del)
 
+    def set_last_check(self, timestamp, new_count=0):
+        """Refresh only the status line after a background check."""
+        self.last_check = timestamp
+        suffix = f" • {new_count} new" if new_count else ""
+        self.lbl_status.setText(f"Sync Status: {timestamp}{suffix}")
+
 class SubscriptionTab(QWidget):
-    def __init__(self, config_manager, colors, parent=None):
+    def __init__(self, config_manager, store, colors, parent=None):
         super().__init__(parent)
         self.config_manager = config_manager
+        self.store = store
         self.colors = colors
+        self._rows = {} # url -> (QListWidgetItem, SubscriptionItem)
         self.init_ui()
         self.load_subscriptions()
         self.start_background_check()
@@ -149,11 +154,11 @@ class SubscriptionTab(QWidget):
         layout.setSpacing(25)
 
         header = QLabel("Channel Subscriptions")
-        header.setStyleSheet(f"font-size: 32px; font-weight: 800; color: {self.colors['text']};")
+        header.setObjectName("page_title")
         layout.addWidget(header)
 
         subheader = QLabel("Auto-download new videos from your favorite creators")
-        subheader.setStyleSheet(f"font-size: 15px; color: {self.colors['sub_text']};")
+        subheader.setObjectName("page_subtitle")
         layout.addWidget(subheader)
 
         # Add Subscription Row
@@ -161,60 +166,55 @@ class SubscriptionTab(QWidget):
         self.url_input = QLineEdit()
         self.url_input.setPlaceholderText("Paste Channel or Playlist URL...")
         self.url_input.setFixedHeight(50)
-        self.url_input.setStyleSheet(f"""
-            QLineEdit {{
-                background-color: {self.colors['card']};
-                border: 2px solid {self.colors['border']};
-                border-radius: 12px;
-                color: {self.colors['text']};
-                padding: 0 15px;
-            }}
-            QLineEdit:focus {{ border-color: {self.colors['accent']}; }}
-        """)
+        self.url_input.setObjectName("sub_url_input")
         add_layout.addWidget(self.url_input)
 
         self.btn_add = QPushButton("Add Channel")
         self.btn_add.setFixedSize(160, 50)
-        self.btn_add.setStyleSheet(f"""
-            QPushButton {{
-                background-color: {self.colors['accent']};
-                color: white;
-                border: none;
-                border-radius: 12px;
-                font-weight: 800;
-                font-size: 15px;
-            }}
-            QPushButton:hover {{ background-color: {self.colors['accent_light']}; }}
-        """)
+        self.btn_add.setObjectName("sub_add_btn")
         self.btn_add.clicked.connect(self.add_subscription)
         add_layout.addWidget(self.btn_add)
         layout.addLayout(add_layout)
 
         # List Area
         self.list_widget = QListWidget()
-        self.list_widget.setStyleSheet("background: transparent; border: none;")
+        self.list_widget.setUniformItemSizes(True) # All rows share the fixed card height
         layout.addWidget(self.list_widget)
 
     def load_subscriptions(self):
+        """Full rebuild; only used on first show. Later changes touch single rows."""
+        self.list_widget.setUpdatesEnabled(False)
         self.list_widget.clear()
-        subs = self.config_manager.config.subscriptions
-        for sub in subs:
+        self._rows.clear()
+        for sub in self.store.list_subscriptions():
             self._add_item_to_ui(sub)
+        self.list_widget.setUpdatesEnabled(True)
 
     def _add_item_to_ui(self, sub_data):
+        if sub_data['url'] in self._rows:
+            return
         item = QListWidgetItem(self.list_widget)
         widget = SubscriptionItem(sub_data, self.colors)
         item.setSizeHint(widget.sizeHint())
         widget.remove_requested.connect(self.remove_subscription)
         self.list_widget.addItem(item)
         self.list_widget.setItemWidget(item, widget)
+        self._rows[sub_data['url']] = (item, widget)
+
+    def _remove_item_from_ui(self, url):
+        row = self._rows.pop(url, None)
+        if row is None:
+            return
+        item, widget = row
+        self.list_widget.takeItem(self.list_widget.row(item))
+        widget.deleteLater()
 
     def add_subscription(self):
         url = self.url_input.text().strip()
         if not url: return
         
         # Check if already exists
-        if any(s['url'] == url for s in self.config_manager.config.subscriptions):
+        if self.store.has_subscription(url):
             return
 
         self.btn_add.setEnabled(False)
@@ -245,24 +245,14 @@ class SubscriptionTab(QWidget):
         url = self.url_input.text().strip()
         title = info.get('title', url)
         
-        new_sub = {
-            'url': url,
-            'title': title,
-            'last_check': time.strftime("%Y-%m-%d %H:%M"),
-            'enabled': True
-        }
-        
-        self.config_manager.config.subscriptions.append(new_sub)
-        self.config_manager.save()
-        self._add_item_to_ui(new_sub)
+        if self.store.add_subscription(url, title):
+            self._add_item_to_ui(self.store.get_subscription(url))
         self.url_input.clear()
 
     @pyqtSlot(str)
     def remove_subscription(self, url):
-        subs = self.config_manager.config.subscriptions
-        self.config_manager.config.subscriptions = [s for s in subs if s['url'] != url]
-        self.config_manager.save()
-        self.load_subscriptions()
+        self.store.remove_subscription(url)
+        self._remove_item_from_ui(url)
 
     def start_background_check(self):
         config = self.config_manager.config
@@ -274,16 +264,13 @@ class SubscriptionTab(QWidget):
             'allow_unplayable': config.experimental_drm,
             'cdm_path': config.cdm_path
         }
-        self.worker = SubscriptionWorker(self.config_manager, settings)
+        self.worker = SubscriptionWorker(self.config_manager, self.store, settings)
         self.worker.check_finished.connect(self.update_last_check)
         self.worker.start()
 
     @pyqtSlot(str, int)
     def update_last_check(self, url, count):
-        subs = self.config_manager.config.subscriptions
-        timestamp = time.strftime("%Y-%m-%d %H:%M")
-        for s in subs:
-            if s['url'] == url:
-                s['last_check'] = timestamp
-        self.config_manager.save()
-        self.load_subscriptions()
+        timestamp = self.store.update_last_check(url)
+        row = self._rows.get(url)
+        if row:
+            row[1].set_last_check(timestamp, count)
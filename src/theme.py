@@ -0,0 +1,278 @@
+from functools import lru_cache
+from string import Template
+
+DARK = {
+    'bg': '#0f0f12',         # Deep obsidian
+    'sidebar': '#16161a',    # Slightly lighter sidebar
+    'card': '#1c1c21',       # Floating cards
+    'text': '#f0f0f5',        # Near white
+    'sub_text': '#9494a5',   # Muted mauve
+    'border': '#2a2a32',     # Subtle separation
+    'accent': '#6366f1',     # Vibrant Indigo
+    'accent_light': '#818cf8',
+    'success': '#10b981',    # Emerald
+    'danger': '#ef4444'      # Rose
+}
+
+LIGHT = {
+    'bg': '#f8fafc',         # Clean slate
+    'sidebar': '#ffffff',
+    'card': '#ffffff',
+    'text': '#0f172a',       # Dark slate
+    'sub_text': '#64748b',   # Slate gray
+    'border': '#e2e8f0',     # Light dividers
+    'accent': '#4f46e5',     # Deep Indigo
+    'accent_light': '#6366f1',
+    'success': '#059669',
+    'danger': '#dc2626'
+}
+
+CHECK_ICON = "data:image/svg+xml;base64,PHN2ZyB4bWxucz0iaHR0cDovL3d3dy53My5vcmcvMjAwMC9zdmciIHdpZHRoPSIyNCIgaGVpZ2h0PSIyNCIgdmlld0JveD0iMCAwIDI0IDI0IiBmaWxsPSJub25lIiBzdHJva2U9IndoaXRlIiBzdHJva2Utd2lkdGg9IjQiIHN0cm9rZS1saW5lY2FwPSJyb3VuZCIgc3Ryb2tlLWxpbmVqb2luPSJyb3VuZCI+PHBvbHlsaW5lIHBvaW50cz0iMjAgNiA5IDE3IDQgMTIiPjwvcG9seWxpbmU+PC9zdmc+"
+
+# One application-wide sheet. Widgets opt in through object names and
+# dynamic properties instead of carrying their own stylesheets, so Qt parses
+# this once per theme no matter how many download or subscription rows exist.
+STYLESHEET = Template("""
+    QMainWindow { background-color: $bg; }
+    QWidget { color: $text; font-family: 'Inter', 'Segoe UI', sans-serif; }
+
+    #sidebar {
+        background-color: $sidebar;
+        border-right: 1px solid $border;
+    }
+    #app_title { font-size: 22px; font-weight: 900; color: $accent; margin-bottom: 20px; }
+
+    QPushButton#nav_btn {
+        background-color: transparent;
+        color: $sub_text;
+        border: none;
+        text-align: left;
+        padding-left: 20px;
+        font-size: 14px;
+        font-weight: 500;
+        border-radius: 10px;
+    }
+    QPushButton#nav_btn:hover { background-color: $border; color: white; }
+    QPushButton#nav_btn[active="true"] { background-color: $accent; color: white; font-weight: 800; }
+    QPushButton#nav_btn[active="true"]:hover { background-color: $accent; }
+
+    QPushButton#report_btn { border: 1px solid $border; font-weight: 600; text-align: left; padding-left: 15px; }
+
+    #page_title { font-size: 32px; font-weight: 800; color: $text; }
+    #page_subtitle { font-size: 14px; color: $sub_text; }
+
+    QPushButton#smart_btn { background-color: $card; color: $text; }
+    QPushButton#smart_btn[active="true"] { background-color: $accent; color: white; }
+
+    QLineEdit {
+        background-color: $card;
+        border: 2px solid $border;
+        border-radius: 12px;
+        padding: 12px 20px;
+        font-size: 15px;
+        color: $text;
+    }
+    QLineEdit:focus { border-color: $accent; background-color: $bg; }
+
+    QComboBox {
+        background-color: $card;
+        border: 2px solid $border;
+        border-radius: 12px;
+        padding: 10px 15px;
+        font-size: 14px;
+        color: $text;
+    }
+    QComboBox::drop-down { border: none; }
+    QComboBox:hover { border-color: $accent; }
+    QComboBox QAbstractItemView {
+        background-color: $card;
+        border: 1px solid $border;
+        selection-background-color: $accent;
+        color: $text;
+        outline: none;
+    }
+
+    QCheckBox {
+        spacing: 8px;
+        color: $text;
+    }
+    QCheckBox::indicator {
+        width: 20px;
+        height: 20px;
+        background-color: $card;
+        border: 2px solid $border;
+        border-radius: 6px;
+    }
+    QCheckBox::indicator:checked {
+        background-color: $accent;
+        border-color: $accent;
+        image: url($check_icon);
+    }
+    QCheckBox::indicator:hover { border-color: $accent; }
+    QCheckBox#select_all { font-weight: 600; font-size: 13px; }
+
+    #download_btn {
+        background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 $accent, stop:1 $accent_light);
+        color: white;
+        border: none;
+        border-radius: 12px;
+        font-size: 16px;
+        font-weight: 800;
+        min-height: 50px;
+    }
+    #download_btn:hover {
+        background-color: $accent_light;
+    }
+    QPushButton#batch_btn { background-color: $accent; color: white; border-radius: 10px; font-weight: 700; }
+
+    QProgressBar {
+        border: none;
+        background-color: $border;
+        height: 8px;
+        border-radius: 4px;
+    }
+    QProgressBar::chunk {
+        background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 $accent, stop:1 $accent_light);
+        border-radius: 4px;
+    }
+
+    QListWidget { background: transparent; border: none; outline: none; }
+    QListWidget::item { background: transparent; border: none; }
+    QListWidget::item:selected { background: transparent; border: none; }
+    QScrollBar:vertical {
+        border: none;
+        background: transparent;
+        width: 6px;
+    }
+    QScrollBar::handle:vertical {
+        background: $border;
+        border-radius: 3px;
+        min-height: 40px;
+    }
+
+    #empty_icon { font-size: 64px; margin-bottom: 10px; }
+    #empty_title { font-size: 20px; font-weight: 700; }
+    #empty_desc { color: $sub_text; font-size: 14px; }
+    #sparkle { color: $accent; font-size: 11px; font-weight: 800; }
+
+    /* Download cards */
+    ModernDownloadItem {
+        background-color: $card;
+        border: 1px solid $accent;
+        border-radius: 16px;
+        margin-bottom: 8px;
+    }
+    ModernDownloadItem[pulsing="true"] { border-color: transparent; }
+    ModernDownloadItem QPushButton {
+        background: $bg;
+        border: 1px solid $border;
+        border-radius: 10px;
+        color: $text;
+    }
+    ModernDownloadItem QPushButton:hover {
+        background: $accent;
+        color: white;
+    }
+    ModernDownloadItem QPushButton#open_btn[done="true"] { background: $success; color: white; border: none; }
+    #thumb_container { background: $bg; border-radius: 10px; }
+    #thumb_label { border-radius: 10px; }
+    #thumb_label[placeholder="true"] { font-size: 30px; color: $sub_text; }
+    #item_title { font-size: 15px; font-weight: 700; }
+    #item_status { font-size: 12px; color: $sub_text; }
+    #item_stats { font-size: 11px; font-weight: 600; color: $accent; }
+    #duration_badge {
+        background-color: rgba(0, 0, 0, 0.6);
+        color: white;
+        padding: 2px 6px;
+        border-radius: 4px;
+        font-size: 10px;
+        font-weight: 800;
+    }
+
+    /* Subscriptions */
+    SubscriptionTab #page_subtitle { font-size: 15px; }
+    QLineEdit#sub_url_input { padding: 0 15px; background-color: $card; }
+    QLineEdit#sub_url_input:focus { border-color: $accent; }
+    QPushButton#sub_add_btn {
+        background-color: $accent;
+        color: white;
+        border: none;
+        border-radius: 12px;
+        font-weight: 800;
+        font-size: 15px;
+    }
+    QPushButton#sub_add_btn:hover { background-color: $accent_light; }
+    SubscriptionItem {
+        background-color: $card;
+        border-radius: 16px;
+        padding: 15px;
+        border: 1px solid $border;
+    }
+    SubscriptionItem:hover { border-color: $accent; }
+    #sub_title { font-weight: 700; font-size: 15px; color: $text; border: none; }
+    #sub_status { color: $sub_text; font-size: 12px; border: none; }
+    QPushButton#sub_delete {
+        background: transparent;
+        font-size: 18px;
+        color: $sub_text;
+        border: none;
+    }
+    QPushButton#sub_delete:hover { color: $danger; background: $bg; border-radius: 10px; }
+
+    /* Preferences dialog */
+    SettingsDialog { background-color: $bg; }
+    SettingsDialog QTabWidget::pane { border: 1px solid $border; border-radius: 12px; background: $card; }
+    SettingsDialog QTabBar::tab {
+        background: transparent;
+        padding: 15px 23px;
+        min-width: 130px;
+        text-align: left;
+        color: $sub_text;
+    }
+    SettingsDialog QTabBar::tab:selected {
+        color: $accent;
+        font-weight: 800;
+        border-right: 3px solid $accent;
+    }
+    SettingsDialog QLineEdit, SettingsDialog QSpinBox, SettingsDialog QComboBox, SettingsDialog QTimeEdit {
+        background-color: $bg;
+        border: 1px solid $border;
+        border-radius: 8px;
+        padding: 8px 12px;
+        color: $text;
+    }
+    SettingsDialog QCheckBox { spacing: 10px; font-weight: 500; }
+    SettingsDialog QCheckBox::indicator { width: 22px; height: 22px; background-color: $bg; }
+    SettingsDialog QPushButton {
+        background-color: $card;
+        border: 1px solid $border;
+        border-radius: 10px;
+        padding: 10px 20px;
+        font-weight: 600;
+    }
+    SettingsDialog QPushButton:hover { border-color: $accent; background-color: $bg; }
+    QCheckBox#sch_enabled { font-weight: bold; font-size: 14px; }
+    #sch_info { color: $sub_text; font-size: 12px; font-style: italic; margin-top: 10px; }
+""")
+
+def palette(dark: bool) -> dict:
+    """Return a fresh copy of the color palette for the given mode."""
+    return dict(DARK if dark else LIGHT)
+
+@lru_cache(maxsize=None)
+def stylesheet(dark: bool) -> str:
+    """Build the application stylesheet once per theme."""
+    return STYLESHEET.substitute(palette(dark), check_icon=CHECK_ICON)
+
+def apply_theme(app, dark: bool) -> None:
+    """Install the cached stylesheet for the whole application."""
+    app.setStyleSheet(stylesheet(dark))
+
+def set_style_property(widget, name: str, value) -> None:
+    """Flip a dynamic property used by a stylesheet selector and repolish only that widget."""
+    if widget.property(name) == value:
+        return
+    widget.setProperty(name, value)
+    style = widget.style()
+    style.unpolish(widget)
+    style.polish(widget)
@@ -0,0 +1,257 @@
+import json
+import os
+import secrets
+import threading
+import time
+from typing import Optional
+
+SERVICE_NAME = "ultratube"
+SCOPE_NAME = "ultratube.downloader"
+
+# Top-level phases of a download job, in the order yt-dlp goes through them
+PHASES = ("cookies", "setup", "extraction", "format_selection", "preparation", "transfer", "postprocessing")
+
+# yt-dlp postprocessor stage -> phase that starts there
+STAGE_PHASES = {
+    "pre_process": "format_selection",
+    "video": "preparation",
+    "before_dl": "transfer",
+}
+
+STATUS_UNSET, STATUS_OK, STATUS_ERROR = 0, 1, 2
+
+def _now_ns():
+    return time.time_ns()
+
+class Span:
+    def __init__(self, name, trace_id, parent=None, attributes=None, start_ns=None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = dict(attributes or {})
+        self.start_ns = start_ns or _now_ns()
+        self.end_ns = None
+        self.status = STATUS_UNSET
+        self.status_message = ""
+
+    def end(self, end_ns=None):
+        if self.end_ns is None:
+            self.end_ns = end_ns or _now_ns()
+
+    @property
+    def duration(self):
+        return ((self.end_ns or _now_ns()) - self.start_ns) / 1e9
+
+    def to_otlp(self):
+        """OTLP/JSON representation of the span."""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1, # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items() if v is not None],
+            "status": {"code": self.status},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+def _otlp_attribute(key, value):
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+class JsonFileExporter:
+    """Appends one OTLP/JSON `resourceSpans` document per trace to a file.
+
+    The format matches the OpenTelemetry collector's file exporter, so the file
+    can be replayed with its `otlpjsonfile` receiver. Rotates to `<file>.1`
+    once it exceeds `max_bytes`.
+    """
+    def __init__(self, path, max_bytes=5 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def export(self, spans):
+        doc = {"resourceSpans": [{
+            "resource": {"attributes": [_otlp_attribute("service.name", SERVICE_NAME)]},
+            "scopeSpans": [{"scope": {"name": SCOPE_NAME}, "spans": [s.to_otlp() for s in spans]}],
+        }]}
+        line = json.dumps(doc, separators=(",", ":")) + "\n"
+        with self._lock:
+            try:
+                if os.path.exists(self.path) and os.path.getsize(self.path) > self.max_bytes:
+                    os.replace(self.path, self.path + ".1")
+            except OSError:
+                pass
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+_exporter: Optional[JsonFileExporter] = None
+
+def set_exporter(exporter):
+    """Install the exporter used by every finished JobTrace (None disables export)."""
+    global _exporter
+    _exporter = exporter
+
+class JobTrace:
+    """Spans for one download job: a root span, one span per phase, and child
+    spans for each fetched file and each postprocessor run.
+
+    Phases follow each other; `enter()` ends the current phase and starts the
+    next. yt-dlp drives it through its progress and postprocessor hooks.
+    """
+    def __init__(self, name="download", attributes=None):
+        self.trace_id = secrets.token_hex(16)
+        self.root = Span(name, self.trace_id, attributes=attributes)
+        self.spans = [self.root]
+        self._lock = threading.Lock()
+        self._phase = None
+        self._tentative = False
+        self._files = {}         # filename -> fetch span
+        self._postprocessors = {} # postprocessor name -> running span
+
+    def phase(self, name):
+        """Context manager for a phase that isn't delimited by yt-dlp hooks."""
+        return _PhaseContext(self, name)
+
+    def enter(self, phase, tentative=False):
+        """End the current phase and start `phase`.
+
+        A tentative phase (e.g. the extraction of a possible next playlist entry)
+        is dropped if nothing else happens before the trace finishes.
+        """
+        with self._lock:
+            if self._phase is not None:
+                if self._phase.name == phase:
+                    return
+                self._phase.end()
+            self._phase = self._add(phase, self.root)
+            self._tentative = tentative
+
+    def stage(self, when):
+        """Called when yt-dlp reaches a postprocessor stage (see STAGE_PHASES)."""
+        if when == "after_video":
+            # Whatever comes next is the next playlist entry
+            self.enter("extraction", tentative=True)
+        elif when in STAGE_PHASES:
+            self.enter(STAGE_PHASES[when])
+
+    def progress_hook(self, d):
+        """yt-dlp progress hook: one child span per fetched file."""
+        filename = d.get("filename")
+        with self._lock:
+            span = self._files.get(filename)
+            if d["status"] == "downloading" and span is None:
+                self._tentative = False
+                self._files[filename] = self._add("fetch", self._phase or self.root,
+                                                  {"file": os.path.basename(filename or "")})
+            elif d["status"] in ("finished", "error") and span is not None and span.end_ns is None:
+                span.attributes.update({
+                    "bytes": d.get("total_bytes") or d.get("downloaded_bytes"),
+                    "fragments": d.get("fragment_count"),
+                })
+                if d["status"] == "error":
+                    span.status = STATUS_ERROR
+                span.end()
+
+    def postprocessor_hook(self, d):
+        """yt-dlp postprocessor hook: one child span per postprocessor (merging, conversions...)."""
+        name = d.get("postprocessor")
+        if d["status"] == "started":
+            if self._phase is None or self._phase.name in ("transfer", "preparation"):
+                self.enter("postprocessing")
+            with self._lock:
+                self._tentative = False
+                self._postprocessors[name] = self._add(name, self._phase or self.root, {"postprocessor": name})
+        elif d["status"] == "finished":
+            with self._lock:
+                span = self._postprocessors.pop(name, None)
+                if span:
+                    span.end()
+
+    def finish(self, error=None):
+        """End all open spans, export the trace and return the per-phase summary."""
+        with self._lock:
+            if self._phase is not None and self._tentative:
+                self.spans.remove(self._phase)
+            end_ns = _now_ns()
+            for span in self.spans:
+                span.end(end_ns)
+            self.root.status = STATUS_ERROR if error else STATUS_OK
+            if error:
+                self.root.status_message = str(error)
+        if _exporter is not None:
+            try:
+                _exporter.export(self.spans)
+            except OSError:
+                pass
+        return self.summary()
+
+    def summary(self):
+        """Seconds per phase plus per postprocessor, summed over the job (playlists repeat phases)."""
+        phases, steps = {}, {}
+        for span in self.spans:
+            if span.parent_id == self.root.span_id:
+                phases[span.name] = round(phases.get(span.name, 0.0) + span.duration, 3)
+            elif "postprocessor" in span.attributes:
+                steps[span.name] = round(steps.get(span.name, 0.0) + span.duration, 3)
+        return {"phases": phases, "postprocessors": steps}
+
+    def _add(self, name, parent, attributes=None):
+        span = Span(name, self.trace_id, parent, attributes)
+        self.spans.append(span)
+        return span
+
+class _PhaseContext:
+    def __init__(self, trace, name):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.trace.enter(self.name)
+        return self
+
+    def __exit__(self, *exc):
+        with self.trace._lock:
+            if self.trace._phase is not None and self.trace._phase.name == self.name:
+                self.trace._phase.end()
+                self.trace._phase = None
+        return False
+
+def format_summary(summary):
+    """One-line human summary, e.g. 'extraction 1.2s · transfer 9.8s · postprocessing 2.0s (Merger 1.9s)'."""
+    parts = []
+    for name, seconds in summary.get("phases", {}).items():
+        text = f"{name} {seconds:.1f}s"
+        if name == "postprocessing" and summary.get("postprocessors"):
+            steps = ", ".join(f"{pp} {s:.1f}s" for pp, s in summary["postprocessors"].items())
+            text += f" ({steps})"
+        parts.append(text)
+    return " · ".join(parts)
+
+def make_stage_marker(trace, when):
+    """A no-op yt-dlp postprocessor that reports reaching stage `when` to `trace`."""
+    from yt_dlp.postprocessor.common import PostProcessor
+
+    class PhaseMarkerPP(PostProcessor):
+        def run(self, info):
+            trace.stage(when)
+            return [], info
+
+        def _hook_progress(self, status, info_dict):
+            pass # Keep markers out of the postprocessor hooks
+
+    return PhaseMarkerPP()
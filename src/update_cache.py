@@ -0,0 +1,50 @@
+import json
+import logging
+import os
+import time
+from typing import Optional
+
+logger = logging.getLogger("UltraTube.UpdateCache")
+
+class UpdateCache:
+    """Remembers the result of the last update check so it runs at most once per TTL.
+
+    A failed check (network error, non-200 reply) is remembered too, for the
+    shorter `failure_ttl`, so an unreachable endpoint isn't hit on every start.
+    """
+    def __init__(self, cache_file: str = "update_cache.json", ttl: int = 24 * 3600,
+                 failure_ttl: int = 3600):
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.failure_ttl = failure_ttl
+
+    def load(self) -> Optional[dict]:
+        """Return the cached release info ({} after a failed check), or None if missing or expired."""
+        if not os.path.exists(self.cache_file):
+            return None
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            return None
+
+        checked_at = data.get("checked_at", 0)
+        ttl = self.failure_ttl if data.get("failed") else self.ttl
+        if time.time() - checked_at > ttl:
+            return None
+        return data.get("release", {})
+
+    def save(self, release: dict) -> None:
+        """Store the release info returned by the update endpoint."""
+        self._write({"checked_at": time.time(), "release": release})
+
+    def save_failure(self) -> None:
+        """Record a failed check so the next attempt waits failure_ttl."""
+        self._write({"checked_at": time.time(), "release": {}, "failed": True})
+
+    def _write(self, data: dict) -> None:
+        try:
+            with open(self.cache_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+        except OSError as e:
+            logger.error(f"Error saving update cache: {e}")
@@ -0,0 +1,52 @@
+import os
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+QtWidgets = pytest.importorskip("PyQt6.QtWidgets")
+
+from src.animation_clock import AnimationClock
+
+@pytest.fixture(scope="module")
+def app():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+class Ticker(QtWidgets.QWidget):
+    def __init__(self):
+        super().__init__()
+        self.ticks = 0
+    def tick(self, dt):
+        self.ticks += 1
+
+def test_only_visible_widgets_tick(app):
+    clock = AnimationClock()
+    shown, hidden = Ticker(), Ticker()
+    shown.show()
+    app.processEvents()
+    clock.subscribe(shown)
+    clock.subscribe(hidden)
+
+    clock._on_tick()
+    assert shown.ticks == 1
+    assert hidden.ticks == 0
+    shown.close()
+
+def test_timer_runs_only_with_subscribers(app):
+    clock = AnimationClock()
+    widget = Ticker()
+    assert not clock.timer.isActive()
+
+    clock.subscribe(widget)
+    assert clock.timer.isActive()
+
+    clock.unsubscribe(widget)
+    assert not clock.timer.isActive()
+
+def test_pause_stops_timer(app):
+    clock = AnimationClock()
+    widget = Ticker()
+    clock.subscribe(widget)
+
+    clock.pause()
+    assert not clock.timer.isActive()
+    clock.resume()
+    assert clock.timer.isActive()
@@ -0,0 +1,146 @@
+import shutil
+import threading
+import pytest
+from concurrent.futures import Future
+from unittest.mock import MagicMock, patch
+
+from src import audio_pipeline
+from src.audio_pipeline import Transcoder, make_audio_router, normalize_codec
+
+pytest.importorskip("yt_dlp")
+from yt_dlp.postprocessor import FFmpegExtractAudioPP
+
+def fake_ffmpeg(pp, path, out_path, codec, more_opts):
+    shutil.copyfile(path, out_path)
+
+def audio_info(path, acodec):
+    return {'filepath': str(path), 'ext': path.suffix[1:], 'acodec': acodec, 'vcodec': 'none'}
+
+def test_normalize_codec():
+    assert normalize_codec("mp4a.40.2") == "aac"
+    assert normalize_codec("mp4a.6b") == "mp3"
+    assert normalize_codec("opus") == "opus"
+    assert normalize_codec("none") is None
+    assert audio_pipeline.format_for("m4a").startswith("bestaudio[acodec^=mp4a]")
+    with pytest.raises(ValueError):
+        audio_pipeline.format_for("wma")
+
+def test_acceptable_codec_is_stream_copied(tmp_path):
+    source = tmp_path / "song.webm"
+    source.write_bytes(b"opus data")
+    deferred = []
+    transcoder = MagicMock()
+    pp = make_audio_router("opus", deferred, transcoder)
+
+    with patch.object(FFmpegExtractAudioPP, "get_audio_codec", return_value="opus"), \
+         patch.object(FFmpegExtractAudioPP, "run_ffmpeg", autospec=True, side_effect=fake_ffmpeg) as ffmpeg:
+        to_delete, info = pp.run(audio_info(source, "opus"))
+
+    assert ffmpeg.call_args.args[3] == "copy"
+    assert info['filepath'] == str(tmp_path / "song.opus") and info['ext'] == "opus"
+    assert to_delete == [str(source)]
+    assert not deferred and not transcoder.submit.called
+
+def test_aac_already_in_m4a_is_left_alone(tmp_path):
+    source = tmp_path / "song.m4a"
+    source.write_bytes(b"aac data")
+    pp = make_audio_router("original", [], MagicMock())
+    with patch.object(FFmpegExtractAudioPP, "run_ffmpeg") as ffmpeg:
+        to_delete, info = pp.run(audio_info(source, "mp4a.40.2"))
+    assert not ffmpeg.called
+    assert to_delete == [] and info['filepath'] == str(source)
+
+def test_other_codecs_are_left_to_the_transcoder(tmp_path):
+    source = tmp_path / "song.webm"
+    source.write_bytes(b"opus data")
+    deferred = []
+    transcoder = MagicMock()
+    pp = make_audio_router("mp3", deferred, transcoder)
+
+    to_delete, info = pp.run(audio_info(source, "opus"))
+
+    assert to_delete == [] and info['filepath'] == str(source)
+    transcoder.submit.assert_called_once()
+    assert transcoder.submit.call_args.args[1] == "mp3"
+    assert deferred == [(str(source), transcoder.submit.return_value, None)]
+
+def test_transcoder_replaces_the_source(tmp_path):
+    source = tmp_path / "song.webm"
+    source.write_bytes(b"opus data")
+    transcoder = Transcoder(max_workers=1)
+    with patch.object(FFmpegExtractAudioPP, "get_audio_codec", return_value="opus"), \
+         patch.object(FFmpegExtractAudioPP, "run_ffmpeg", autospec=True, side_effect=fake_ffmpeg) as ffmpeg:
+        result = transcoder.submit(audio_info(source, "opus"), "mp3").result()
+    transcoder.shutdown()
+
+    assert ffmpeg.call_args.args[3] == "libmp3lame"
+    assert result == str(tmp_path / "song.mp3")
+    assert not source.exists()
+    assert transcoder.pending() == 0
+
+def test_when_done_waits_for_every_future():
+    futures = [Future(), Future()]
+    callback = MagicMock()
+    audio_pipeline.when_done(futures, callback)
+    futures[0].set_result("a")
+    assert not callback.called
+    futures[1].set_exception(RuntimeError("ffmpeg failed"))
+    callback.assert_called_once_with()
+
+    audio_pipeline.when_done([], callback)
+    assert callback.call_count == 2
+
+@patch('yt_dlp.YoutubeDL')
+def test_download_item_adds_the_router(mock_ytdl):
+    import downloader
+    instance = mock_ytdl.return_value.__enter__.return_value
+    downloader.download_item("https://fake-url.com", format_id="bestaudio/best", audio_codec="opus")
+    assert mock_ytdl.call_args.args[0]['format'] == audio_pipeline.format_for("opus")
+    pps = [c.args[0] for c in instance.add_post_processor.call_args_list
+           if c.kwargs.get('when') == 'post_process']
+    assert any(isinstance(pp, FFmpegExtractAudioPP) for pp in pps)
+
+def test_failed_conversion_fails_the_job_and_leaves_the_archive(tmp_path):
+    import downloader
+    archive = tmp_path / "archive.txt"
+    archive.write_text("youtube a\nyoutube b\nyoutube c\n")
+    failures = []
+    job = {'job_id': 'j', 'url': 'https://x/b', 'status': 'finished'}
+    watch = downloader.BackgroundWatch(job, str(archive), failures.append)
+
+    early, late = Future(), Future()
+    watch.watch(early, ["youtube b"], "convert", "/tmp/b.webm")
+    watch.watch(late, ["youtube c"], "convert", "/tmp/c.webm")
+    early.set_exception(RuntimeError("ffmpeg exited with 1"))
+    watch.returned()
+    # Failed before the job was reported: the record says so directly
+    assert job['status'] == 'failed' and "ffmpeg exited" in job['error']
+    assert failures == []
+
+    late.set_exception(RuntimeError("disk full"))
+    assert failures == ["Audio conversion failed: disk full"]
+    assert archive.read_text() == "youtube a\n"
+
+def test_shutdown_can_cancel_queued_conversions(tmp_path):
+    sources = [tmp_path / f"song{i}.webm" for i in range(2)]
+    for source in sources:
+        source.write_bytes(b"opus data")
+    transcoder = Transcoder(max_workers=1)
+    started, release = threading.Event(), threading.Event()
+
+    def slow_ffmpeg(pp, path, out_path, codec, more_opts):
+        started.set()
+        release.wait(5)
+        shutil.copyfile(path, out_path)
+
+    with patch.object(FFmpegExtractAudioPP, "get_audio_codec", return_value="opus"), \
+         patch.object(FFmpegExtractAudioPP, "run_ffmpeg", autospec=True, side_effect=slow_ffmpeg):
+        running = transcoder.submit(audio_info(sources[0], "opus"), "mp3")
+        queued = transcoder.submit(audio_info(sources[1], "opus"), "mp3")
+        started.wait(5)
+        transcoder.shutdown(wait=False, cancel_queued=True)
+        release.set()
+        running.result(5)
+
+    assert queued.cancelled() and sources[1].exists()
+    assert transcoder.pending() == 0
@@ -0,0 +1,61 @@
+import pytest
+
+from src import batch_scheduler
+from src.batch_scheduler import estimate, order, plan
+
+MB = 1024 * 1024
+
+def sized(size):
+    return {'filesize': size}
+
+def test_policies():
+    sizes = [10_000 * MB, 5 * MB, None, 50 * MB, 5 * MB]
+    assert order(sizes, "sjf") == [1, 4, 3, 0, 2]
+    assert order(sizes, "largest") == [0, 3, 1, 4, 2]
+    assert order(sizes, "fifo") == [0, 1, 2, 3, 4]
+    with pytest.raises(ValueError):
+        order(sizes, "random")
+
+def test_unknown_sizes_are_guessed_from_duration():
+    items = [(sized(100 * MB), 100), ({'requested_formats': [{'filesize_approx': 20 * MB}, {'filesize': None}]}, 30),
+             (None, 50), (None, None)]
+    sizes, guessed = batch_scheduler.estimate_sizes(items)
+    assert sizes[:3] == [100 * MB, 30 * MB, 50 * MB] # 1 MB/s of video from the first item
+    assert sizes[3] == 100 * MB # no duration either: the median known size
+    assert guessed == 3
+
+def test_estimate_simulates_parallel_slots():
+    result = estimate([10 * MB, 10 * MB, 20 * MB], workers=2, throughput=MB)
+    assert result["total_bytes"] == 40 * MB
+    assert result["first_completion"] == pytest.approx(10)
+    assert result["completion"] == pytest.approx(30)
+
+def test_sjf_improves_time_to_first_completion():
+    items = [(sized(10_000 * MB), None)] * 3 + [(sized(10 * MB), None)] * 20
+    _, fifo = plan(items, "fifo", workers=3, throughput=10 * MB)
+    indices, sjf = plan(items, "sjf", workers=3, throughput=10 * MB)
+    assert indices[:20] == list(range(3, 23))
+    assert sjf["first_completion"] == pytest.approx(1)
+    assert fifo["first_completion"] == pytest.approx(1000)
+    assert sjf["total_bytes"] == fifo["total_bytes"]
+
+def test_sizes_follow_the_batch_preset():
+    pytest.importorskip("yt_dlp")
+    from src import format_policy
+    formats = [
+        {'format_id': 'v2160', 'height': 2160, 'vcodec': 'vp9', 'acodec': 'none', 'ext': 'webm', 'filesize': 900 * MB},
+        {'format_id': 'v720', 'height': 720, 'vcodec': 'avc1', 'acodec': 'none', 'ext': 'mp4', 'filesize': 60 * MB},
+        {'format_id': 'a', 'vcodec': 'none', 'acodec': 'opus', 'abr': 128, 'ext': 'webm', 'filesize': 5 * MB},
+    ]
+    info = {'id': 'v', 'title': 'V', 'extractor': 'test', 'extractor_key': 'Test',
+            'webpage_url': 'http://site.example/v',
+            'formats': [dict(f, url="http://media.example/v") for f in formats],
+            # What extraction picked: the best formats
+            'requested_formats': [formats[0], formats[2]]}
+    items = [(info, 600)]
+
+    assert batch_scheduler.estimate_sizes(items)[0] == [905 * MB]
+    assert batch_scheduler.estimate_sizes(items, format_policy.for_download("HD (720p)"))[0] == [65 * MB]
+    audio = format_policy.for_download("bestaudio/best", audio_codec="opus")
+    _, summary = plan(items, selection=audio, throughput=MB)
+    assert summary["total_bytes"] == 5 * MB
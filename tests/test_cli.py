@@ -0,0 +1,56 @@
+import io
+import json
+from unittest.mock import patch
+from downloader import DownloadProgress
+from src import cli
+
+def fake_download(url, progress_callback=None, **kwargs):
+    progress_callback(DownloadProgress('downloading', 50.0, "1MiB/s", "00:01", "Video", url=url))
+    status = 'failed' if 'bad' in url else 'finished'
+    return {'job_id': 'x', 'url': url, 'bytes': 10, 'duration': 0.1, 'status': status, 'kwargs': kwargs}
+
+def run_cli(argv, stdin=""):
+    out = io.StringIO()
+    with patch('downloader.download_item', side_effect=fake_download) as mock_dl:
+        code = cli.main(argv + ["--config", "missing-config.json", "--trace-file", ""],
+                        stdout=out, stdin=io.StringIO(stdin))
+    return code, [json.loads(line) for line in out.getvalue().splitlines()], mock_dl
+
+def test_iter_urls_skips_comments_and_duplicates(tmp_path):
+    batch = io.StringIO("https://a.com/1\n\n# comment\nhttps://a.com/2\nhttps://a.com/1\n")
+    assert list(cli.iter_urls(["https://a.com/0", batch])) == ["https://a.com/0", "https://a.com/1", "https://a.com/2"]
+
+def test_batch_file_and_stdin_emit_json_lines(tmp_path):
+    batch = tmp_path / "urls.txt"
+    batch.write_text("https://a.com/1\nhttps://a.com/2\n")
+    code, events, mock_dl = run_cli(["-a", str(batch), "-a", "-", "-f", "720p", "-j", "2", "-o", str(tmp_path)],
+                                    stdin="https://a.com/3\n")
+
+    assert code == 0
+    results = [e for e in events if e["event"] == "result"]
+    assert sorted(r["url"] for r in results) == ["https://a.com/1", "https://a.com/2", "https://a.com/3"]
+    assert {e["url"] for e in events if e["event"] == "progress"} == {r["url"] for r in results}
+    assert events[-1] == dict(events[-1], event="summary", total=3, finished=3, failed=0)
+    kwargs = results[0]["kwargs"]
+    assert kwargs["format_id"] == "720p" and kwargs["download_dir"] == str(tmp_path)
+    assert kwargs["archive_file"] == "archive.txt"
+
+def test_failures_set_exit_code():
+    code, events, _ = run_cli(["https://a.com/ok", "https://a.com/bad"])
+    assert code == 1
+    assert events[-1]["failed"] == 1
+
+def test_dedup_needs_a_state_database(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with patch('src.dedup.set_deduplicator') as install:
+        run_cli(["https://a.com/1"])
+    assert not install.called
+    assert not (tmp_path / "ultratube.db").exists()
+
+    config = tmp_path / "config.json"
+    config.write_text("{}")
+    assert cli.default_state_db(str(config)) == str(tmp_path / "ultratube.db")
+    with patch('src.dedup.set_deduplicator') as install:
+        run_cli(["https://a.com/1", "--state-db", str(tmp_path / "history.db")])
+    assert install.call_args.args[0].mode == "reflink"
+    assert (tmp_path / "history.db").exists()
@@ -1,6 +1,7 @@
 import os
 import json
 import pytest
+from unittest.mock import patch
 from src.config_manager import ConfigManager, AppConfig
 
 def test_config_load_default(tmp_path):
@@ -35,3 +36,38 @@ def test_config_smart_mode_persistence(tmp_path):
     assert new_manager.config.smart_mode is True
     assert new_manager.config.last_format == "MP3 Audio"
     assert new_manager.config.last_quality == "High"
+
+def test_config_write_behind_coalesces(tmp_path):
+    config_file = tmp_path / "config.json"
+    manager = ConfigManager(str(config_file), save_delay=60)
+
+    with patch.object(manager, "_write_atomic", wraps=manager._write_atomic) as write:
+        manager.update(max_concurrent=4)
+        manager.update(dark_mode=False)
+        manager.update(download_folder="batched")
+        assert write.call_count == 0
+        assert not config_file.exists()
+
+        manager.flush()
+        assert write.call_count == 1
+
+    new_manager = ConfigManager(str(config_file))
+    assert new_manager.config.download_folder == "batched"
+    assert new_manager.config.max_concurrent == 4
+
+def test_config_atomic_save_leaves_no_temp_files(tmp_path):
+    config_file = tmp_path / "config.json"
+    manager = ConfigManager(str(config_file))
+    manager.update(download_folder="first")
+    manager.update(download_folder="second")
+
+    assert os.listdir(tmp_path) == ["config.json"]
+    with open(config_file, encoding="utf-8") as f:
+        assert json.load(f)["download_folder"] == "second"
+
+def test_config_save_keeps_file_permissions(tmp_path):
+    config_file = tmp_path / "config.json"
+    config_file.write_text("{}")
+    os.chmod(config_file, 0o644)
+    ConfigManager(str(config_file)).update(download_folder="elsewhere")
+    assert config_file.stat().st_mode & 0o777 == 0o644
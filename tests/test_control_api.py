@@ -0,0 +1,54 @@
+import json
+import urllib.request
+import urllib.error
+from unittest.mock import MagicMock
+import pytest
+from src.control_api import ControlServer
+from src.job_queue import JobQueue
+
+@pytest.fixture
+def server():
+    # Never started, so submitted jobs stay queued
+    queue = JobQueue(max_workers=1)
+    srv = ControlServer(queue, port=0)
+    srv.start()
+    yield srv
+    srv.stop()
+
+def call(srv, method, path, body=None):
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(f"{srv.address}{path}", data=data, method=method)
+    try:
+        with urllib.request.urlopen(req, timeout=5) as resp:
+            return resp.status, json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+def test_enqueue_list_reprioritize_cancel(server):
+    status, body = call(server, "POST", "/jobs", {"urls": ["https://a.com/1", "https://a.com/2"], "priority": 1})
+    assert status == 201
+    job_id = body["jobs"][0]["id"]
+
+    status, body = call(server, "GET", "/jobs?status=queued")
+    assert status == 200 and len(body["jobs"]) == 2
+
+    status, body = call(server, "PATCH", f"/jobs/{job_id}", {"priority": 9})
+    assert status == 200 and body["priority"] == 9
+
+    status, body = call(server, "DELETE", f"/jobs/{job_id}")
+    assert status == 200 and body["status"] == "cancelled"
+    assert call(server, "DELETE", f"/jobs/{job_id}")[0] == 409
+
+    status, body = call(server, "GET", "/stats")
+    assert body["jobs"] == {"queued": 1, "cancelled": 1}
+
+def test_errors(server):
+    assert call(server, "GET", "/jobs/nope")[0] == 404
+    assert call(server, "POST", "/jobs", {"priority": 1})[0] == 400
+    assert call(server, "PUT", "/jobs")[0] == 405
+    assert call(server, "GET", "/nothing")[0] == 404
+
+def test_custom_route_text_payload():
+    srv = ControlServer(MagicMock())
+    srv.add_route("GET", "/metrics", lambda request: (200, ("up 1\n", "text/plain; version=0.0.4")))
+    assert srv.dispatch("GET", "/metrics") == (200, ("up 1\n", "text/plain; version=0.0.4"))
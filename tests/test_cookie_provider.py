@@ -0,0 +1,47 @@
+import os
+import time
+from src.cookie_provider import CookieProvider, base_domain
+
+COOKIES = """# Netscape HTTP Cookie File
+.youtube.com\tTRUE\t/\tTRUE\t{exp}\tSID\tyt-session
+.google.com\tTRUE\t/\tTRUE\t{exp}\tHSID\tgoogle-session
+.vimeo.com\tTRUE\t/\tTRUE\t{exp}\tvuid\tvimeo-session
+"""
+
+def write_cookies(path, extra=""):
+    path.write_text(COOKIES.format(exp=int(time.time()) + 86400) + extra)
+
+def test_base_domain():
+    assert base_domain("https://www.youtube.com/watch?v=x") == "youtube.com"
+    assert base_domain("https://player.vimeo.com/video/1") == "vimeo.com"
+
+def test_jar_is_filtered_per_domain(tmp_path):
+    cookie_file = tmp_path / "cookies.txt"
+    write_cookies(cookie_file)
+    provider = CookieProvider()
+
+    yt = provider.get_jar("https://www.youtube.com/watch?v=x", cookie_file=str(cookie_file))
+    assert {c.name for c in yt} == {"SID", "HSID"}
+
+    vimeo = provider.get_jar("https://vimeo.com/1", cookie_file=str(cookie_file))
+    assert {c.name for c in vimeo} == {"vuid"}
+
+def test_jar_is_shared_until_file_changes(tmp_path):
+    cookie_file = tmp_path / "cookies.txt"
+    write_cookies(cookie_file)
+    provider = CookieProvider()
+    url = "https://www.youtube.com/watch?v=x"
+
+    first = provider.get_jar(url, cookie_file=str(cookie_file))
+    assert provider.get_jar(url, cookie_file=str(cookie_file)) is first
+
+    write_cookies(cookie_file, f".youtube.com\tTRUE\t/\tTRUE\t{int(time.time()) + 86400}\tLOGIN\tnew\n")
+    mtime = os.path.getmtime(cookie_file) + 10
+    os.utime(cookie_file, (mtime, mtime))
+
+    reloaded = provider.get_jar(url, cookie_file=str(cookie_file))
+    assert reloaded is not first
+    assert "LOGIN" in {c.name for c in reloaded}
+
+def test_no_cookie_source():
+    assert CookieProvider().get_jar("https://www.youtube.com/watch?v=x") is None
@@ -0,0 +1,79 @@
+import os
+import pytest
+from unittest.mock import patch
+
+from src import dedup
+from src.dedup import Deduplicator, sampled_hash
+from src.state_store import StateStore
+
+SIZE = 2 * 1024 * 1024
+
+@pytest.fixture
+def store(tmp_path):
+    store = StateStore(str(tmp_path / "state.db"))
+    yield store
+    store.close()
+
+def write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return str(path)
+
+def test_sampled_hash_only_reads_samples(tmp_path):
+    a = os.urandom(SIZE)
+    # Same size, head, middle and tail; differs elsewhere
+    b = bytearray(a)
+    b[200_000] ^= 0xFF
+    pa, pb = write(tmp_path / "a", a), write(tmp_path / "b", bytes(b))
+    assert sampled_hash(pa) == sampled_hash(pb)
+    assert sampled_hash(pa) != sampled_hash(write(tmp_path / "c", a[:-1]))
+
+def test_duplicate_is_hardlinked(tmp_path, store):
+    data = os.urandom(SIZE)
+    original = write(tmp_path / "lib" / "Video.mp4", data)
+    copy = write(tmp_path / "lib" / "Video (reupload).mp4", data)
+    deduplicator = Deduplicator(store, mode="hardlink")
+
+    with patch("src.dedup._reflink", return_value=False):
+        assert deduplicator.process(original) is None
+        assert deduplicator.process(copy) == original
+    deduplicator.shutdown()
+
+    assert os.stat(copy).st_ino == os.stat(original).st_ino
+    assert open(copy, "rb").read() == data
+    assert {r["path"] for r in store.files_with_sample(sampled_hash(original))} == {original, copy}
+
+def test_sample_collision_is_settled_by_full_hash(tmp_path, store):
+    data = bytearray(os.urandom(SIZE))
+    original = write(tmp_path / "a.mp4", bytes(data))
+    data[200_000] ^= 0xFF
+    other = write(tmp_path / "b.mp4", bytes(data))
+    deduplicator = Deduplicator(store, mode="hardlink")
+    deduplicator.process(original)
+    assert deduplicator.process(other) is None
+    assert os.stat(other).st_ino != os.stat(original).st_ino
+    # The full hash is cached for the next lookup
+    assert all(r["full_hash"] for r in store.files_with_sample(sampled_hash(original)))
+    deduplicator.shutdown()
+
+def test_reflink_mode_leaves_files_alone_without_support(tmp_path, store):
+    data = os.urandom(SIZE)
+    original = write(tmp_path / "a.mp4", data)
+    copy = write(tmp_path / "b.mp4", data)
+    deduplicator = Deduplicator(store, mode="reflink")
+    with patch("src.dedup._reflink", return_value=False):
+        deduplicator.process(original)
+        assert deduplicator.process(copy) is None
+    assert os.stat(copy).st_ino != os.stat(original).st_ino
+    deduplicator.shutdown()
+
+def test_stale_index_entries_are_dropped(tmp_path, store):
+    data = os.urandom(SIZE)
+    original = write(tmp_path / "a.mp4", data)
+    deduplicator = Deduplicator(store, mode="hardlink")
+    deduplicator.process(original)
+    os.remove(original)
+    copy = write(tmp_path / "b.mp4", data)
+    assert deduplicator.process(copy) is None
+    assert [r["path"] for r in store.files_with_sample(sampled_hash(copy))] == [copy]
+    deduplicator.shutdown()
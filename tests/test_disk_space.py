@@ -0,0 +1,110 @@
+import os
+import sys
+import time
+import pytest
+from unittest.mock import patch
+
+from src import disk_space
+from src.disk_space import InsufficientSpace, preflight, required_space, media_size
+
+GIB = 2 ** 30
+
+def test_required_space_counts_merge():
+    single = {"filesize": GIB}
+    merged = {"requested_formats": [{"filesize": 3 * GIB}, {"filesize_approx": GIB}]}
+    assert required_space(single) == pytest.approx(GIB * disk_space.ESTIMATE_SLACK, rel=1e-6)
+    assert required_space(merged) == pytest.approx(8 * GIB * disk_space.ESTIMATE_SLACK, rel=1e-6)
+    assert media_size({"requested_formats": [{"filesize": GIB}, {}]}) is None
+
+def test_preflight_refuses_when_it_wont_fit(tmp_path):
+    info = {"requested_formats": [{"filesize": 4 * GIB}, {"filesize": GIB}]}
+    with patch("src.disk_space.free_space", return_value=8 * GIB):
+        with pytest.raises(InsufficientSpace) as exc:
+            preflight(info, str(tmp_path))
+    assert exc.value.required > 10 * GIB
+
+    with patch("src.disk_space.free_space", return_value=20 * GIB):
+        preflight(info, str(tmp_path))
+    # Unknown sizes aren't refused
+    with patch("src.disk_space.free_space", return_value=0):
+        preflight({"title": "live"}, str(tmp_path))
+
+def test_staging_checks_destination_for_final_size(tmp_path):
+    info = {"requested_formats": [{"filesize": 4 * GIB}, {"filesize": GIB}]}
+    stage, dest = str(tmp_path / "stage"), str(tmp_path / "nas")
+    free = {stage: 50 * GIB, dest: 6 * GIB}
+    with patch("src.disk_space.free_space", side_effect=lambda d: free[d]):
+        preflight(info, stage, dest)
+        free[dest] = 5 * GIB
+        with pytest.raises(InsufficientSpace):
+            preflight(info, stage, dest)
+
+def test_parallel_jobs_count_each_others_claims(tmp_path):
+    info = {"filesize": 4 * GIB}
+    first, second = disk_space.Reservation(), disk_space.Reservation()
+    with patch("src.disk_space.free_space", return_value=6 * GIB):
+        preflight(info, str(tmp_path), reservation=first)
+        assert disk_space.reserved_space(str(tmp_path)) >= 4 * GIB
+        with pytest.raises(InsufficientSpace):
+            preflight(info, str(tmp_path), reservation=second)
+        first.release()
+        preflight(info, str(tmp_path), reservation=second)
+        # The job's next video replaces its claim rather than adding to it
+        preflight(info, str(tmp_path), reservation=second)
+    second.release()
+    assert disk_space.reserved_space(str(tmp_path)) == 0
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="fallocate is Linux-only")
+def test_preallocate_keeps_file_size(tmp_path):
+    path = tmp_path / "video.mp4.part"
+    path.write_bytes(b"abc")
+    if not disk_space.preallocate(str(path), 8 * 1024 * 1024):
+        pytest.skip("filesystem doesn't support fallocate")
+    assert os.path.getsize(path) == 3
+    assert os.stat(path).st_blocks * 512 >= 8 * 1024 * 1024
+
+def test_job_queue_requeues_deferred_jobs():
+    from src.job_queue import JobQueue
+    results = iter([{"status": "deferred", "error": "Not enough disk space"}, {"status": "finished"}])
+    queue = JobQueue(max_workers=1)
+    queue.defer_delay = 0.05
+    with patch("downloader.download_item", side_effect=lambda *a, **kw: next(results)):
+        queue.start()
+        job = queue.submit("https://x/big")
+        deadline = time.monotonic() + 5
+        while queue.get(job.id)["status"] != "finished" and time.monotonic() < deadline:
+            time.sleep(0.01)
+        queue.stop(timeout=2)
+    assert queue.get(job.id)["status"] == "finished"
+
+def test_job_queue_gives_up_on_deferred_jobs():
+    from src.job_queue import JobQueue
+    queue = JobQueue(max_workers=1)
+    queue.defer_delay = 0.01
+    queue.max_deferrals = 2
+    deferred = {"status": "deferred", "error": "Not enough disk space"}
+    with patch("downloader.download_item", return_value=deferred) as download:
+        queue.start()
+        job = queue.submit("https://x/big")
+        deadline = time.monotonic() + 5
+        while queue.get(job.id)["status"] != "failed" and time.monotonic() < deadline:
+            time.sleep(0.01)
+        queue.stop(timeout=2)
+    assert queue.get(job.id)["status"] == "failed"
+    assert "gave up after 2 retries" in queue.get(job.id)["error"]
+    assert download.call_count == 3
+
+def test_larger_than_the_filesystem_fails_at_once(tmp_path):
+    usage = disk_space.shutil.disk_usage(str(tmp_path))
+    with pytest.raises(disk_space.DiskTooSmall):
+        disk_space.ensure_space(str(tmp_path), usage.total)
+
+def test_preallocator_ignores_estimates(tmp_path):
+    path = str(tmp_path / "video.mp4.part")
+    hook = disk_space.Preallocator()
+    with patch("src.disk_space.preallocate", return_value=True) as prealloc:
+        hook({"status": "downloading", "tmpfilename": path, "total_bytes_estimate": GIB})
+        assert not prealloc.called
+        hook({"status": "downloading", "tmpfilename": path, "total_bytes": GIB})
+        hook({"status": "downloading", "tmpfilename": path, "total_bytes": GIB})
+    prealloc.assert_called_once_with(path, GIB)
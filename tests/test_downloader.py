@@ -1,3 +1,4 @@
+import time
 import pytest
 from unittest.mock import MagicMock, patch
 import downloader
@@ -41,3 +42,95 @@ def test_download_item_mock(mock_ytdl):
     # Check if correct opts were passed (can be complex, but let's check format)
     args, kwargs = mock_ytdl.call_args
     assert 'bestvideo[height<=720]+bestaudio/best' in args[0]['format']
+
+def make_info(expire=None, epoch=None):
+    url = "https://media.example/v.mp4" + (f"?expire={expire}&sig=x" if expire else "")
+    return {'id': 'v', 'title': 'V', 'webpage_url': 'https://site.example/v',
+            'epoch': epoch or int(time.time()), 'formats': [{'format_id': '18', 'url': url}]}
+
+def test_info_reuse_respects_expiry():
+    now = time.time()
+    assert downloader.is_info_reusable(make_info(expire=int(now) + 3600), now)
+    assert not downloader.is_info_reusable(make_info(expire=int(now) + 60), now)
+    assert downloader.is_info_reusable(make_info(epoch=int(now) - 60), now)
+    assert not downloader.is_info_reusable(make_info(epoch=int(now) - downloader.INFO_MAX_AGE - 1), now)
+    assert not downloader.is_info_reusable({'_type': 'playlist', 'entries': []}, now)
+
+@patch('yt_dlp.YoutubeDL')
+def test_download_reuses_fresh_info(mock_ytdl):
+    instance = mock_ytdl.return_value.__enter__.return_value
+    info = make_info(expire=int(time.time()) + 3600)
+
+    job = downloader.download_item("https://site.example/v", info=info)
+
+    assert job['status'] == 'finished'
+    instance.process_ie_result.assert_called_once()
+    assert instance.process_ie_result.call_args.kwargs == {'download': True}
+    instance.download.assert_not_called()
+
+@patch('yt_dlp.YoutubeDL')
+def test_download_reextracts_expired_or_rejected_info(mock_ytdl):
+    import yt_dlp
+    instance = mock_ytdl.return_value.__enter__.return_value
+
+    downloader.download_item("https://site.example/v", info=make_info(expire=int(time.time()) + 60))
+    instance.process_ie_result.assert_not_called()
+    instance.download.assert_called_once_with(["https://site.example/v"])
+
+    instance.download.reset_mock()
+    from yt_dlp.networking.exceptions import HTTPError
+    forbidden = HTTPError(MagicMock(status=403, reason="Forbidden", headers={}))
+    instance.process_ie_result.side_effect = yt_dlp.utils.DownloadError(
+        "HTTP Error 403: Forbidden", exc_info=(HTTPError, forbidden, None))
+    job = downloader.download_item("https://site.example/v", info=make_info(expire=int(time.time()) + 3600))
+    assert job['status'] == 'finished'
+    instance.download.assert_called_once_with(["https://site.example/v"])
+
+@patch('yt_dlp.YoutubeDL')
+def test_download_keeps_other_errors(mock_ytdl):
+    import yt_dlp
+    instance = mock_ytdl.return_value.__enter__.return_value
+    instance.process_ie_result.side_effect = yt_dlp.utils.DownloadError(
+        "ERROR: Postprocessing: Conversion failed!")
+    job = downloader.download_item("https://site.example/v", info=make_info(expire=int(time.time()) + 3600))
+    assert job['status'] == 'failed'
+    instance.download.assert_not_called()
+
+@patch('yt_dlp.YoutubeDL')
+def test_download_uses_cached_analysis(mock_ytdl):
+    instance = mock_ytdl.return_value.__enter__.return_value
+    instance.extract_info.return_value = make_info()
+    downloader._METADATA_CACHE.clear()
+    try:
+        downloader.get_video_info("https://short.example/v")
+        downloader.download_item("https://site.example/v")
+    finally:
+        downloader._METADATA_CACHE.clear()
+    instance.process_ie_result.assert_called_once()
+    instance.download.assert_not_called()
+
+def test_multi_download_reads_urls_only_as_slots_free():
+    import threading
+    release = threading.Event()
+    read = []
+
+    def urls():
+        for i in range(100):
+            read.append(i)
+            yield f"https://x/{i}"
+
+    def slow_download(url, **kwargs):
+        release.wait(5)
+        return {'url': url, 'status': 'finished'}
+
+    results = []
+    with patch("downloader.download_item", side_effect=slow_download):
+        runner = threading.Thread(target=lambda: results.append(
+            downloader.run_multi_download(urls(), max_workers=2, result_callback=lambda job: None)))
+        runner.start()
+        time.sleep(0.2)
+        # 2 workers * MULTI_DOWNLOAD_BACKLOG in flight, plus the one waiting for a slot
+        assert len(read) <= 2 * downloader.MULTI_DOWNLOAD_BACKLOG + 1
+        release.set()
+        runner.join(5)
+    assert len(read) == 100 and results == [None]
@@ -0,0 +1,130 @@
+import os
+import pytest
+from unittest.mock import patch
+
+import downloader
+from src import file_mover
+from src.file_mover import FileMover, MoveError, move_file
+
+@pytest.fixture
+def cross_device():
+    with patch("src.file_mover._same_device", return_value=False):
+        yield
+
+def test_move_file_copies_and_verifies(tmp_path, cross_device):
+    src = tmp_path / "stage" / "a.mp4"
+    src.parent.mkdir()
+    src.write_bytes(b"x" * 10000)
+    dest = tmp_path / "nas" / "a.mp4"
+
+    assert move_file(str(src), str(dest)) == str(dest)
+    assert dest.read_bytes() == b"x" * 10000
+    assert not src.exists()
+    assert not (tmp_path / "nas" / "a.mp4.moving").exists()
+
+def test_corrupt_copy_keeps_source(tmp_path, cross_device):
+    src = tmp_path / "a.mp4"
+    src.write_bytes(b"data")
+    dest = tmp_path / "nas" / "a.mp4"
+    with patch("src.file_mover._hash_file", return_value="bad"):
+        with pytest.raises(MoveError):
+            move_file(str(src), str(dest))
+    assert src.exists()
+    assert not dest.exists()
+    assert os.listdir(tmp_path / "nas") == []
+
+def test_mover_moves_finished_files_only(tmp_path):
+    stage = tmp_path / "staging" / "job1"
+    stage.mkdir(parents=True)
+    (stage / "Video.mp4").write_bytes(b"video")
+    (stage / "Video.en.srt").write_bytes(b"subs")
+    (stage / "Other.f137.mp4.part").write_bytes(b"partial")
+    mover = FileMover(max_workers=1)
+    moved = mover.submit(str(stage), str(tmp_path / "out")).result()
+    mover.shutdown()
+
+    assert sorted(os.path.basename(p) for p in moved) == ["Video.en.srt", "Video.mp4"]
+    assert not stage.exists()
+    assert mover.pending() == 0
+
+def test_download_item_stages_then_moves(tmp_path):
+    stage_root, out = tmp_path / "staging", tmp_path / "out"
+
+    class FakeYDL:
+        def __init__(self, opts):
+            self.opts = opts
+        def __enter__(self): return self
+        def __exit__(self, *a): return False
+        def download(self, urls):
+            path = self.opts['outtmpl'].replace('%(title)s.%(ext)s', 'Clip.mp4')
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(b"clip")
+            for hook in self.opts['progress_hooks']:
+                hook({'status': 'finished', 'filename': path, 'total_bytes': 4, 'info_dict': {'title': 'Clip'}})
+
+    with patch("downloader.open_ydl", side_effect=lambda opts, jar=None: FakeYDL(opts)), \
+         patch("downloader.resolve_cookies", return_value=None), \
+         patch("downloader.add_stage_markers"):
+        job = downloader.download_item("https://x/clip", download_dir=str(out), staging_dir=str(stage_root),
+                                       archive_file=str(tmp_path / "archive.txt"))
+    file_mover.shutdown()
+
+    assert job['status'] == 'finished'
+    assert job['filename'] == os.path.join(str(out), "Clip.mp4")
+    assert (out / "Clip.mp4").read_bytes() == b"clip"
+    assert os.listdir(stage_root) == []
+
+def test_mover_never_overwrites_the_destination(tmp_path):
+    out = tmp_path / "out"
+    out.mkdir()
+    (out / "Video.mp4").write_bytes(b"first video")
+    (out / "Video (1).en.srt").write_bytes(b"someone else's subs")
+    stage = tmp_path / "staging" / "job2"
+    stage.mkdir(parents=True)
+    (stage / "Video.mp4").write_bytes(b"second video")
+    (stage / "Video.en.srt").write_bytes(b"subs")
+    mover = FileMover(max_workers=1)
+    moved = mover.submit(str(stage), str(out)).result()
+    mover.shutdown()
+
+    assert sorted(os.path.basename(p) for p in moved) == ["Video (2).en.srt", "Video (2).mp4"]
+    assert (out / "Video.mp4").read_bytes() == b"first video"
+    assert (out / "Video (1).en.srt").read_bytes() == b"someone else's subs"
+    assert (out / "Video (2).mp4").read_bytes() == b"second video"
+
+def test_failed_move_fails_the_job_and_leaves_the_archive(tmp_path):
+    stage_root, out = tmp_path / "staging", tmp_path / "out"
+    archive = tmp_path / "archive.txt"
+
+    class FakeYDL:
+        def __init__(self, opts):
+            self.opts = opts
+        def __enter__(self): return self
+        def __exit__(self, *a): return False
+        def download(self, urls):
+            path = self.opts['outtmpl'].replace('%(title)s.%(ext)s', 'Clip.mp4')
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(b"clip")
+            archive.write_text("youtube clip\n")
+            info = {'title': 'Clip', 'id': 'clip', 'extractor_key': 'Youtube'}
+            for hook in self.opts['progress_hooks']:
+                hook({'status': 'finished', 'filename': path, 'total_bytes': 4, 'info_dict': info})
+
+    failures = []
+    with patch("downloader.open_ydl", side_effect=lambda opts, jar=None: FakeYDL(opts)), \
+         patch("downloader.resolve_cookies", return_value=None), \
+         patch("downloader.add_stage_markers"), \
+         patch("src.file_mover.move_file", side_effect=OSError("NAS unreachable")):
+        file_mover.set_mover(FileMover(max_workers=1))
+        job = downloader.download_item("https://x/clip", download_dir=str(out), staging_dir=str(stage_root),
+                                       archive_file=str(archive), on_background_failure=failures.append)
+        file_mover.shutdown()
+
+    # The move may fail before or after download_item returns
+    errors = failures or [job.get('error')]
+    assert "NAS unreachable" in errors[0]
+    assert job['status'] == ('finished' if failures else 'failed')
+    assert archive.read_text() == ""
+    assert os.listdir(stage_root / job['job_id']) == ["Clip.mp4"]
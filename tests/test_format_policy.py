@@ -0,0 +1,41 @@
+import pytest
+
+from src import format_policy
+
+MEDIA_URL = "http://media.example/v"
+FORMATS = [
+    {'format_id': 'vp9-1080', 'height': 1080, 'width': 1920, 'vcodec': 'vp9', 'acodec': 'none', 'ext': 'webm'},
+    {'format_id': 'avc-1080', 'height': 1080, 'width': 1920, 'vcodec': 'avc1.640028', 'acodec': 'none', 'ext': 'mp4'},
+    {'format_id': 'vp9-2160', 'height': 2160, 'width': 3840, 'vcodec': 'vp9', 'acodec': 'none', 'ext': 'webm'},
+    {'format_id': 'a-opus', 'vcodec': 'none', 'acodec': 'opus', 'abr': 160, 'ext': 'webm'},
+    {'format_id': 'a-aac', 'vcodec': 'none', 'acodec': 'mp4a.40.2', 'abr': 128, 'ext': 'm4a'},
+]
+
+def pick(format_id, video_codec):
+    yt_dlp = pytest.importorskip("yt_dlp")
+    opts = format_policy.select(format_id, video_codec)
+    with yt_dlp.YoutubeDL({**opts, 'quiet': True, 'simulate': True}) as ydl:
+        info = ydl.process_ie_result({
+            'id': 'v', 'title': 'V', 'extractor': 'test', 'extractor_key': 'Test',
+            'webpage_url': 'http://site.example/v',
+            'formats': [dict(f, url=MEDIA_URL) for f in FORMATS],
+        }, download=False)
+    return info['format_id'], info['ext']
+
+def test_presets_are_table_driven():
+    assert format_policy.select("HD (720p)")['format'].startswith('bestvideo[height<=720]+bestaudio')
+    hdr = format_policy.select("4K HDR / 60fps", "vp9")
+    assert hdr['format_sort'] == ['res:2160', 'hdr:12', 'vcodec:vp9', 'acodec:opus']
+    assert format_policy.select("137")['format'] == '137+bestaudio/best'
+    assert format_policy.select("137/18")['format'] == '137/18'
+    assert format_policy.select(None, "h264")['format_sort'] == ['res', 'vcodec:h264', 'acodec:aac']
+    assert format_policy.select(None, "mpeg2")['merge_output_format'] == format_policy.DEFAULT_CONTAINERS
+
+def test_codec_preference_avoids_remuxing():
+    assert pick("Full HD (1080p)", "h264") == ('avc-1080+a-aac', 'mp4')
+    assert pick("Full HD (1080p)", "vp9") == ('vp9-1080+a-opus', 'webm')
+
+def test_resolution_ranks_before_codec():
+    format_id, ext = pick("Best Available", "h264")
+    assert format_id.startswith('vp9-2160')
+    assert ext == 'mkv' # vp9 + aac: the first listed container that takes both as-is
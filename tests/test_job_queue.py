@@ -0,0 +1,85 @@
+import threading
+import time
+from unittest.mock import patch
+from downloader import DownloadProgress
+from src.job_queue import JobQueue
+
+def wait_for(predicate, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+class FakeDownloads:
+    """download_item stand-in that blocks until released and records run order."""
+    def __init__(self):
+        self.release = threading.Event()
+        self.order = []
+
+    def __call__(self, url, format_id=None, progress_callback=None, **kwargs):
+        self.order.append(url)
+        progress_callback(DownloadProgress('downloading', 10.0, url=url, downloaded_bytes=1000))
+        while not self.release.wait(0.01):
+            progress_callback(DownloadProgress('downloading', 10.0, url=url, downloaded_bytes=1000))
+        return {'url': url, 'bytes': 1000, 'status': 'finished', 'title': url}
+
+def test_priority_order_and_reprioritize():
+    fake = FakeDownloads()
+    with patch('downloader.download_item', side_effect=fake):
+        queue = JobQueue(max_workers=1)
+        queue.start()
+        first = queue.submit("https://a.com/first")
+        assert wait_for(lambda: queue.get(first.id)["status"] == "running")
+
+        low = queue.submit("https://a.com/low")
+        high = queue.submit("https://a.com/high", priority=5)
+        bumped = queue.submit("https://a.com/bumped")
+        assert queue.reprioritize(bumped.id, 10)
+        assert not queue.reprioritize(first.id, 10)
+
+        fake.release.set()
+        assert wait_for(lambda: all(j["status"] == "finished" for j in queue.jobs()))
+        queue.stop()
+
+    assert fake.order == ["https://a.com/first", "https://a.com/bumped", "https://a.com/high", "https://a.com/low"]
+    assert queue.stats()["bytes_total"] >= 1000
+
+def test_cancel_queued_and_running():
+    fake = FakeDownloads()
+    def aborting(url, progress_callback=None, **kwargs):
+        try:
+            return fake(url, progress_callback=progress_callback, **kwargs)
+        except Exception as e:
+            return {'url': url, 'status': 'failed', 'error': str(e)}
+
+    with patch('downloader.download_item', side_effect=aborting):
+        queue = JobQueue(max_workers=1)
+        queue.start()
+        running = queue.submit("https://a.com/running")
+        assert wait_for(lambda: queue.get(running.id)["status"] == "running")
+        waiting = queue.submit("https://a.com/waiting")
+
+        assert queue.cancel(waiting.id)
+        assert queue.get(waiting.id)["status"] == "cancelled"
+        assert queue.cancel(running.id)
+        assert wait_for(lambda: queue.get(running.id)["status"] == "cancelled")
+        assert not queue.cancel(running.id)
+        queue.stop()
+
+    assert fake.order == ["https://a.com/running"]
+
+def test_only_recent_finished_jobs_are_kept():
+    queue = JobQueue(max_workers=1)
+    queue.max_finished = 3
+    results = {'status': 'finished', 'bytes': 1}
+    with patch("downloader.download_item", return_value=results):
+        queue.start()
+        jobs = [queue.submit(f"https://x/{i}") for i in range(5)]
+        assert wait_for(lambda: queue.get(jobs[-1].id) and queue.get(jobs[-1].id)["status"] == "finished")
+        queue.stop(timeout=2)
+
+    assert [j["url"] for j in queue.jobs()] == ["https://x/2", "https://x/3", "https://x/4"]
+    assert queue.get(jobs[0].id) is None
+    assert queue.stats()["jobs"] == {"finished": 5}
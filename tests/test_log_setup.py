@@ -0,0 +1,79 @@
+import json
+import logging
+import queue
+import zipfile
+from src.log_setup import LoggingPipeline, BoundedQueueHandler, JsonFormatter, tail_lines, log_excerpt, export_log_bundle
+
+def test_json_formatter_lifts_job_fields():
+    record = logging.LogRecord("UltraTube.Downloader", logging.INFO, __file__, 1, "Finished", None, None)
+    record.job_id = "abc"
+    record.bytes = 1024
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["msg"] == "Finished"
+    assert entry["job_id"] == "abc"
+    assert entry["bytes"] == 1024
+    assert "duration" not in entry
+
+def test_bounded_queue_drops_instead_of_blocking():
+    handler = BoundedQueueHandler(queue.Queue(maxsize=2))
+    logger = logging.getLogger("UltraTube.test_drop")
+    logger.propagate = False
+    logger.addHandler(handler)
+    for i in range(5):
+        logger.warning("msg %d", i)
+    logger.removeHandler(handler)
+    assert handler.dropped == 3
+
+def test_pipeline_writes_text_and_json(tmp_path):
+    logger = logging.getLogger("UltraTube.test_pipeline")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    pipeline = LoggingPipeline(logger, str(tmp_path / "app.log"), str(tmp_path / "app.jsonl"))
+    logger.info("Finished download", extra={"job_id": "j1", "url": "https://x", "duration": 1.5})
+    pipeline.stop()
+
+    assert "Finished download" in (tmp_path / "app.log").read_text()
+    entry = json.loads((tmp_path / "app.jsonl").read_text().splitlines()[0])
+    assert entry["job_id"] == "j1"
+    assert entry["duration"] == 1.5
+
+def test_pipeline_keeps_tracebacks_and_reports_drops(tmp_path):
+    logger = logging.getLogger("UltraTube.test_pipeline_exc")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    pipeline = LoggingPipeline(logger, str(tmp_path / "app.log"), str(tmp_path / "app.jsonl"))
+    try:
+        raise ValueError("bad format")
+    except ValueError:
+        logger.exception("Download failed")
+    pipeline.queue_handler.dropped = 2
+    pipeline.stop()
+
+    failed, dropped = [json.loads(line) for line in (tmp_path / "app.jsonl").read_text().splitlines()]
+    assert failed["msg"] == "Download failed"
+    assert "ValueError: bad format" in failed["exc"]
+    assert "ValueError: bad format" in (tmp_path / "app.log").read_text()
+    assert "2 records were dropped" in dropped["msg"]
+
+def test_tail_lines_reads_from_end(tmp_path):
+    log = tmp_path / "app.log"
+    log.write_text("".join(f"line {i}\n" for i in range(10000)))
+
+    assert tail_lines(str(log), 3, block_size=16) == ["line 9997", "line 9998", "line 9999"]
+    assert tail_lines(str(log), 0) == []
+    assert len(tail_lines(str(log), 20000)) == 10000
+
+def test_log_excerpt_is_size_bounded(tmp_path):
+    log = tmp_path / "app.log"
+    log.write_text("".join(f"{i:09d}\n" for i in range(1000)))
+
+    excerpt = log_excerpt(str(log), max_lines=500, max_bytes=100)
+    assert len(excerpt.encode("utf-8")) <= 100
+    assert excerpt.endswith("000000999")
+
+def test_export_log_bundle(tmp_path):
+    log = tmp_path / "app.log"
+    log.write_text("hello\n")
+    dest = export_log_bundle(str(tmp_path / "bundle.zip"), [str(log), str(tmp_path / "missing.log")])
+    with zipfile.ZipFile(dest) as bundle:
+        assert bundle.namelist() == ["app.log"]
@@ -0,0 +1,60 @@
+import os
+import threading
+import time
+import pytest
+from unittest.mock import patch
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+QtCore = pytest.importorskip("PyQt6.QtCore")
+
+from src.metadata_resolver import MetadataResolver
+
+@pytest.fixture
+def app():
+    return QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+def wait_for(app, condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.01)
+    assert condition()
+
+def test_prioritized_urls_run_next_and_in_flight_is_capped(app):
+    release = threading.Event()
+    lock = threading.Lock()
+    started, running, peak = [], [0], [0]
+
+    def fake_info(url, **settings):
+        with lock:
+            started.append(url)
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        if url == "a":
+            release.wait(5)
+        with lock:
+            running[0] -= 1
+        return {"webpage_url": url, "duration": 61, "formats": [{}]}
+
+    resolver = MetadataResolver({}, max_in_flight=1)
+    results = []
+    resolver.resolved.connect(lambda url, info: results.append(url))
+    with patch("downloader.get_video_info", side_effect=fake_info):
+        resolver.enqueue(["a", "b", "c", "d"])
+        wait_for(app, lambda: started == ["a"])
+        resolver.prioritize(["d"])
+        release.set()
+        wait_for(app, lambda: len(results) == 4)
+
+    assert started == ["a", "d", "b", "c"]
+    assert peak[0] == 1
+    assert resolver.pending() == 0
+
+def test_failures_and_duplicates(app):
+    resolver = MetadataResolver({}, max_in_flight=2)
+    failed = []
+    resolver.failed.connect(lambda url, error: failed.append(url))
+    with patch("downloader.get_video_info", return_value=None) as get_info:
+        resolver.enqueue(["x", "x"])
+        wait_for(app, lambda: failed == ["x"])
+    assert get_info.call_count == 1
@@ -0,0 +1,69 @@
+from unittest.mock import patch
+import pytest
+import downloader
+from src import metrics
+from src.metrics import Registry
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    metrics.REGISTRY.reset()
+    downloader._METADATA_CACHE.clear()
+    yield
+    metrics.REGISTRY.reset()
+    downloader._METADATA_CACHE.clear()
+
+def test_prometheus_text_format():
+    registry = Registry()
+    jobs = registry.counter("jobs_total", "Jobs.", ("status",))
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(1, 5))
+    jobs.inc(status="finished")
+    jobs.inc(2, status="failed")
+    latency.observe(0.5)
+    latency.observe(3)
+
+    text = registry.render_prometheus()
+    assert "# TYPE jobs_total counter" in text
+    assert 'jobs_total{status="failed"} 2' in text
+    assert 'latency_seconds_bucket{le="1"} 1' in text
+    assert 'latency_seconds_bucket{le="5"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 2' in text
+    assert "latency_seconds_count 2" in text
+
+    snap = registry.snapshot()
+    assert snap["jobs_total"] == {"status=failed": 2, "status=finished": 1}
+    assert snap["latency_seconds"]["count"] == 2
+
+@patch('yt_dlp.YoutubeDL')
+def test_metadata_cache_and_latency(mock_ytdl):
+    mock_ytdl.return_value.__enter__.return_value.extract_info.return_value = {'id': '1'}
+    downloader.get_video_info("https://fake-url.com/a")
+    downloader.get_video_info("https://fake-url.com/a")
+
+    assert metrics.METADATA_REQUESTS.value(cache="miss") == 1
+    assert metrics.METADATA_REQUESTS.value(cache="hit") == 1
+    assert metrics.METADATA_SECONDS.count() == 1
+    assert metrics.snapshot()["metadata_cache_hit_rate"] == 0.5
+
+def test_progress_hook_counts_bytes_across_files():
+    hook = downloader.create_progress_hook(lambda p: None)
+    for name, sizes in (("video.mp4", (100, 400)), ("audio.m4a", (50, 80))):
+        for size in sizes:
+            hook({'status': 'downloading', 'filename': name, 'downloaded_bytes': size})
+        hook({'status': 'finished', 'filename': name, 'downloaded_bytes': sizes[-1]})
+    assert metrics.DOWNLOADED_BYTES.value() == 480
+
+def test_retries_counted_from_ytdlp_messages():
+    log = downloader.YtdlpLogger()
+    log.warning("HTTP Error 503. Retrying (1/10)...")
+    log.debug("[download] Got error: timed out. Retrying fragment 7 (2/15)...")
+    log.debug("[download] Destination: x.mp4")
+    assert metrics.RETRIES.value() == 2
+
+@patch('yt_dlp.YoutubeDL')
+def test_download_records_job_metrics(mock_ytdl):
+    job = downloader.download_item("https://fake-url.com")
+    assert job['status'] == 'finished'
+    assert set(job['phases']) == {"cookies", "setup", "extraction"}
+    assert metrics.JOBS.value(status="finished") == 1
+    assert metrics.PHASE_SECONDS.count(phase="extraction") == 1
+    assert metrics.ACTIVE_DOWNLOADS.value() == 0
@@ -0,0 +1,35 @@
+import json
+import subprocess
+from unittest.mock import patch
+
+import profile_startup
+from profile_startup import percentile, summarize, compare
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 21))
+    assert percentile(values, 50) == 10
+    assert percentile(values, 95) == 19
+    assert percentile([5.0], 95) == 5.0
+
+def test_summarize_and_compare():
+    runs = [{"import_time": 0.1, "first_paint": 0.3, "interactive": 0.4} for _ in range(5)]
+    summary = summarize(runs)
+    assert summary["first_paint"]["median"] == 0.3
+    assert summary["first_paint"]["samples"] == 5
+
+    baseline = {"first_paint": {"median": 0.2}, "import_time": {"median": 0.1}}
+    assert compare(summary, baseline, tolerance=0.2) == ["first_paint"]
+    assert compare(summary, baseline, tolerance=0.6) == []
+
+def test_broken_startup_fails_the_gate(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps({"metrics": {"first_paint": {"median": 0.3}}}))
+    crashed = subprocess.CompletedProcess([], 1, stdout="", stderr="Traceback")
+    no_paint = subprocess.CompletedProcess([], 0, stdout=json.dumps({"import_time": 0.1}), stderr="")
+
+    with patch("profile_startup.subprocess.run", return_value=crashed):
+        assert profile_startup.run_benchmark(3, baseline=str(baseline)) == 1
+        assert profile_startup.run_benchmark(3) == 1
+    with patch("profile_startup.subprocess.run", return_value=no_paint):
+        assert profile_startup.run_benchmark(2) == 1
+    assert compare({}, {"first_paint": {"median": 0.3}}) == ["first_paint"]
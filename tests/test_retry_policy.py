@@ -0,0 +1,112 @@
+import random
+import pytest
+from unittest.mock import MagicMock
+
+from src import retry_policy
+from src.retry_policy import RetryCoordinator, parse_retry_after, backoff_delay
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+    def __call__(self):
+        return self.now
+    def sleep(self, seconds):
+        self.now += seconds
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+@pytest.fixture
+def coordinator(clock):
+    return RetryCoordinator(threshold=3, clock=clock, sleep=clock.sleep)
+
+def test_parse_retry_after():
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:30 GMT", now=1445412500) == 10.0
+
+def test_backoff_is_jittered_and_capped():
+    rng = random.Random(1)
+    delays = [backoff_delay(n, base=1, cap=8, rng=rng) for n in range(10)]
+    assert all(0 <= d <= 8 for d in delays)
+    assert len(set(delays)) == len(delays)
+
+def test_circuit_opens_after_threshold_then_probes(coordinator, clock):
+    for _ in range(2):
+        coordinator.record_throttle("a.example")
+    assert coordinator.breaker("a.example").state == "closed"
+    coordinator.record_throttle("a.example")
+    breaker = coordinator.breaker("a.example")
+    assert breaker.state == "open"
+
+    # Another host is unaffected
+    start = clock.now
+    coordinator.acquire("b.example")
+    assert clock.now == start
+
+    # The queue for the host waits out the cooldown, then one probe goes through
+    coordinator.acquire("a.example")
+    assert clock.now >= breaker.open_until
+    assert breaker.state == "half_open" and breaker.probing
+    coordinator.record_success("a.example")
+    assert breaker.state == "closed" and breaker.failures == 0
+
+def test_retry_after_opens_immediately_and_failed_probe_reopens(coordinator, clock):
+    coordinator.record_throttle("a.example", retry_after=30)
+    breaker = coordinator.breaker("a.example")
+    assert breaker.state == "open"
+    assert breaker.open_until == pytest.approx(clock.now + 30)
+    assert coordinator.snapshot()["a.example"]["state"] == "open"
+
+    coordinator.acquire("a.example")
+    coordinator.record_throttle("a.example")
+    assert breaker.state == "open"
+    assert breaker.trips == 2
+
+def test_wrap_records_and_waits_but_leaves_retrying_to_ytdlp(coordinator, clock):
+    from yt_dlp.networking.exceptions import HTTPError
+
+    def throttled():
+        return HTTPError(MagicMock(status=429, reason="Too Many Requests", headers={"Retry-After": "5"}))
+
+    ydl = MagicMock()
+    original = ydl.urlopen
+    original.side_effect = [throttled(), "ok"]
+    coordinator.wrap(ydl)
+
+    with pytest.raises(HTTPError):
+        ydl.urlopen("https://a.example/video")
+    assert original.call_count == 1
+    assert coordinator.breaker("a.example").state == "open"
+
+    # yt-dlp's retry waits out the Retry-After on the circuit
+    start = clock.now
+    assert ydl.urlopen("https://a.example/video") == "ok"
+    assert clock.now - start >= 5
+    assert coordinator.breaker("a.example").state == "closed"
+
+def test_other_jobs_successes_dont_hide_throttling(coordinator, clock):
+    for _ in range(2):
+        coordinator.record_throttle("a.example")
+        coordinator.record_success("a.example")
+    coordinator.record_throttle("a.example")
+    assert coordinator.breaker("a.example").state == "open"
+
+    # Throttles spread out beyond the window don't add up
+    coordinator.acquire("b.example")
+    other = coordinator.breaker("b.example")
+    for _ in range(3):
+        coordinator.record_throttle("b.example")
+        clock.sleep(retry_policy.FAILURE_WINDOW / 2 + 1)
+        if other.state == "open":
+            break
+    assert other.state == "closed"
+
+def test_downloader_uses_shared_coordinator():
+    import downloader
+    ydl = downloader.open_ydl({"quiet": True})
+    assert "retry_sleep_functions" in ydl.params
+    assert ydl.urlopen.__name__ == "guarded_urlopen"
+    assert retry_policy.get_coordinator() is retry_policy.get_coordinator()
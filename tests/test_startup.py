@@ -0,0 +1,40 @@
+import os
+import sys
+import subprocess
+import pytest
+
+pytest.importorskip("PyQt6.QtWidgets")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import time allowed for `import main`, in microseconds
+IMPORT_BUDGET_US = 1_500_000
+
+# Modules that must only be loaded on demand, never at startup
+DEFERRED_MODULES = ["yt_dlp", "requests", "PyQt6.QtWebEngineWidgets", "PyQt6.QtWebEngineCore"]
+
+def import_times(module, cwd):
+    """Run `python -X importtime` and return {module: cumulative_us}."""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd, env=env, capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+def test_heavy_modules_are_deferred(tmp_path):
+    times = import_times("main", tmp_path)
+    for name in DEFERRED_MODULES:
+        assert name not in times, f"{name} is imported at startup"
+
+def test_main_import_budget(tmp_path):
+    times = import_times("main", tmp_path)
+    assert times["main"] < IMPORT_BUDGET_US
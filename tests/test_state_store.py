@@ -0,0 +1,53 @@
+import json
+from src.state_store import StateStore
+from src.config_manager import ConfigManager
+from src.subscription_tab import count_new_entries
+
+def test_subscription_crud(tmp_path):
+    store = StateStore(str(tmp_path / "state.db"))
+    assert store.add_subscription("https://yt/c/a", "Channel A") is True
+    assert store.add_subscription("https://yt/c/a", "Duplicate") is False
+    assert store.has_subscription("https://yt/c/a")
+
+    store.update_last_check("https://yt/c/a", "2026-01-01 10:00")
+    store.record_error("https://yt/c/a")
+    sub = store.get_subscription("https://yt/c/a")
+    assert sub["title"] == "Channel A"
+    assert sub["last_check"] == "2026-01-01 10:00"
+    assert sub["error_count"] == 1
+
+    store.set_high_water_mark("https://yt/c/a", "vid123")
+    sub = store.get_subscription("https://yt/c/a")
+    assert sub["high_water_mark"] == "vid123"
+    assert sub["error_count"] == 0
+
+    assert store.remove_subscription("https://yt/c/a") is True
+    assert store.list_subscriptions() == []
+
+def test_download_history(tmp_path):
+    store = StateStore(str(tmp_path / "state.db"))
+    store.record_download("https://yt/v/1", "finished", "One", "one.mp4")
+    store.record_download("https://yt/v/2", "failed")
+
+    assert len(store.download_history()) == 2
+    assert store.download_history("https://yt/v/1")[0]["filename"] == "one.mp4"
+
+def test_legacy_subscriptions_are_migrated(tmp_path):
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps({
+        "download_folder": "dl",
+        "subscriptions": [{"url": "https://yt/c/a", "title": "A", "last_check": "x", "enabled": False}]
+    }))
+    manager = ConfigManager(str(config_file))
+    assert manager.config.download_folder == "dl"
+
+    store = StateStore(":memory:")
+    assert store.import_subscriptions(manager.legacy_subscriptions) == 1
+    assert store.list_subscriptions(enabled_only=True) == []
+    assert store.get_subscription("https://yt/c/a")["title"] == "A"
+
+def test_count_new_entries():
+    entries = [{"id": "c"}, {"id": "b"}, {"id": "a"}]
+    assert count_new_entries(entries, "b") == 1
+    assert count_new_entries(entries, None) == 3
+    assert count_new_entries(entries, "gone") == 3
@@ -0,0 +1,41 @@
+import os
+import pytest
+from unittest.mock import patch
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+QtWidgets = pytest.importorskip("PyQt6.QtWidgets")
+
+from src.config_manager import ConfigManager
+from src.state_store import StateStore
+from src.subscription_tab import SubscriptionTab
+from src import theme
+
+@pytest.fixture
+def tab(tmp_path):
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    store = StateStore(":memory:")
+    for i in range(3):
+        store.add_subscription(f"https://yt/c/{i}", f"Channel {i}")
+    with patch.object(SubscriptionTab, "start_background_check"):
+        widget = SubscriptionTab(ConfigManager(str(tmp_path / "config.json")), store, theme.palette(True))
+    yield widget
+    widget.deleteLater()
+
+def test_check_updates_only_that_row(tab):
+    item, row = tab._rows["https://yt/c/1"]
+    with patch.object(tab, "load_subscriptions") as reload:
+        tab.update_last_check("https://yt/c/1", 2)
+        reload.assert_not_called()
+
+    assert tab._rows["https://yt/c/1"][1] is row
+    assert "2 new" in row.lbl_status.text()
+    assert tab.store.get_subscription("https://yt/c/1")["last_check"] == row.last_check
+
+def test_remove_deletes_single_row(tab):
+    keep = tab._rows["https://yt/c/2"][1]
+    tab.remove_subscription("https://yt/c/0")
+
+    assert tab.list_widget.count() == 2
+    assert "https://yt/c/0" not in tab._rows
+    assert tab._rows["https://yt/c/2"][1] is keep
+    assert not tab.store.has_subscription("https://yt/c/0")
@@ -0,0 +1,15 @@
+from src import theme
+
+def test_stylesheet_is_built_once_per_theme():
+    assert theme.stylesheet(True) is theme.stylesheet(True)
+    assert theme.stylesheet(True) != theme.stylesheet(False)
+
+def test_stylesheet_substitutes_palette():
+    sheet = theme.stylesheet(True)
+    assert theme.DARK['accent'] in sheet
+    assert "$" not in sheet
+
+def test_palette_returns_copy():
+    colors = theme.palette(False)
+    colors['accent'] = '#000000'
+    assert theme.LIGHT['accent'] != '#000000'
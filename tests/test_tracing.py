@@ -0,0 +1,71 @@
+import json
+from src import tracing
+from src.tracing import JobTrace, JsonFileExporter
+
+def simulate_video(trace, files=("v.f137.mp4", "v.f140.m4a")):
+    trace.enter("extraction")
+    trace.stage("pre_process")
+    trace.stage("video")
+    trace.stage("before_dl")
+    for name in files:
+        trace.progress_hook({'status': 'downloading', 'filename': name, 'downloaded_bytes': 10})
+        trace.progress_hook({'status': 'finished', 'filename': name, 'total_bytes': 100, 'fragment_count': 4})
+    for pp in ("Merger", "FFmpegMetadata"):
+        trace.postprocessor_hook({'status': 'started', 'postprocessor': pp})
+        trace.postprocessor_hook({'status': 'finished', 'postprocessor': pp})
+    trace.stage("after_video")
+
+def test_phases_and_children():
+    trace = JobTrace(attributes={'url': 'https://a.com'})
+    with trace.phase("cookies"):
+        pass
+    simulate_video(trace)
+    summary = trace.finish()
+
+    assert list(summary["phases"]) == ["cookies", "extraction", "format_selection", "preparation",
+                                       "transfer", "postprocessing"]
+    assert set(summary["postprocessors"]) == {"Merger", "FFmpegMetadata"}
+
+    by_name = {}
+    for span in trace.spans:
+        by_name.setdefault(span.name, []).append(span)
+    transfer = by_name["transfer"][0]
+    assert [s.parent_id for s in by_name["fetch"]] == [transfer.span_id] * 2
+    assert by_name["fetch"][0].attributes["fragments"] == 4
+    # The extraction opened after the last video is dropped: nothing followed it
+    assert len(by_name["extraction"]) == 1
+    assert all(s.end_ns >= s.start_ns for s in trace.spans)
+
+def test_playlist_phases_are_summed():
+    trace = JobTrace()
+    simulate_video(trace, files=("a.mp4",))
+    simulate_video(trace, files=("b.mp4",))
+    trace.finish()
+    assert len([s for s in trace.spans if s.name == "transfer"]) == 2
+    assert len([s for s in trace.spans if s.name == "fetch"]) == 2
+
+def test_otlp_json_export(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    tracing.set_exporter(JsonFileExporter(str(path)))
+    try:
+        trace = JobTrace(attributes={'url': 'https://a.com', 'job_id': 'abc'})
+        simulate_video(trace)
+        trace.finish(error=RuntimeError("boom"))
+    finally:
+        tracing.set_exporter(None)
+
+    doc = json.loads(path.read_text().splitlines()[0])
+    resource = doc["resourceSpans"][0]
+    assert resource["resource"]["attributes"][0] == {"key": "service.name", "value": {"stringValue": "ultratube"}}
+    spans = resource["scopeSpans"][0]["spans"]
+    root = spans[0]
+    assert root["name"] == "download" and "parentSpanId" not in root
+    assert root["status"] == {"code": tracing.STATUS_ERROR, "message": "boom"}
+    assert {s["traceId"] for s in spans} == {trace.trace_id}
+    assert all(len(s["spanId"]) == 16 for s in spans)
+    assert int(root["endTimeUnixNano"]) >= int(root["startTimeUnixNano"])
+
+def test_format_summary():
+    text = tracing.format_summary({"phases": {"transfer": 9.84, "postprocessing": 2.0},
+                                   "postprocessors": {"Merger": 1.9}})
+    assert text == "transfer 9.8s · postprocessing 2.0s (Merger 1.9s)"
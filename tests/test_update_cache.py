@@ -0,0 +1,36 @@
+import json
+import time
+from src.update_cache import UpdateCache
+from src import http_session
+
+def test_update_cache_roundtrip(tmp_path):
+    cache = UpdateCache(str(tmp_path / "update_cache.json"), ttl=3600)
+    assert cache.load() is None
+
+    cache.save({"version": "1.2.0", "url": "https://example.com"})
+    assert cache.load()["version"] == "1.2.0"
+
+def test_update_cache_expires(tmp_path):
+    cache_file = tmp_path / "update_cache.json"
+    cache_file.write_text(json.dumps({"checked_at": time.time() - 7200, "release": {"version": "1.2.0"}}))
+
+    assert UpdateCache(str(cache_file), ttl=3600).load() is None
+    assert UpdateCache(str(cache_file), ttl=86400).load()["version"] == "1.2.0"
+
+def test_failed_check_is_cached_briefly(tmp_path):
+    cache_file = tmp_path / "update_cache.json"
+    cache = UpdateCache(str(cache_file), ttl=86400, failure_ttl=600)
+    cache.save_failure()
+    assert cache.load() == {}
+
+    data = json.loads(cache_file.read_text())
+    data["checked_at"] -= 700
+    cache_file.write_text(json.dumps(data))
+    assert cache.load() is None
+
+def test_shared_session_is_reused():
+    first = http_session.get_session()
+    assert http_session.get_session() is first
+    http_session.close_session()
+    assert http_session.get_session() is not first
+    http_session.close_session()